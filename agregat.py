@@ -0,0 +1,161 @@
+"""
+Region-level poverty indicators over classified households.
+
+For per-capita spend y and poverty line z of each household, the
+Foster–Greer–Thorbecke measures are
+    P0 = share of people with y < z                  (headcount)
+    P1 = mean of max(0, (z - y) / z)                  (poverty gap)
+    P2 = mean of max(0, (z - y) / z) ** 2             (severity)
+together with the share of people in each STATUS_LABELS class. Shares are
+of persons: a household counts ``jumlah_anggota`` people, multiplied by
+its survey weight (``bobot``) for the ``_tertimbang`` columns.
+
+``AkumulatorKemiskinan`` keeps additive sums per kode_wilayah, so batches
+can be streamed chunk by chunk (or accumulated on several processes and
+merged) and the indicators are only divided out at the end. Kabupaten/kota
+sums roll up exactly to their provinsi (kode // 100 * 100, the header rows
+``_parse_api_response`` skips).
+"""
+import numpy as np
+import pandas as pd
+
+from engine import STATUS_LABELS
+
+# Additive sums kept per region code, in column order of the accumulator
+_KOLOM_STATUS = ["proporsi_" + label.lower().replace(" ", "_") for label in STATUS_LABELS]
+_JUMLAH = (
+    ["n_rumah_tangga", "n_individu", "populasi_tertimbang",
+     "P0", "P1", "P2", "P0_tertimbang", "P1_tertimbang", "P2_tertimbang"]
+    + _KOLOM_STATUS
+    + [kolom + "_tertimbang" for kolom in _KOLOM_STATUS]
+)
+_POS = {nama: i for i, nama in enumerate(_JUMLAH)}
+_N_STATUS = len(STATUS_LABELS)
+
+# Sums divided by n_individu / populasi_tertimbang in the result
+_RASIO = ["P0", "P1", "P2"] + _KOLOM_STATUS
+_RASIO_TERTIMBANG = [kolom + "_tertimbang" for kolom in _RASIO]
+
+KOLOM_HASIL = (
+    ["tingkat", "kode_wilayah", "nama_wilayah", "n_rumah_tangga", "n_individu", "populasi_tertimbang"]
+    + _RASIO + _RASIO_TERTIMBANG
+)
+
+
+class AkumulatorKemiskinan:
+    """
+    Incremental per-region sums for FGT measures and class shares.
+
+    Feed it with ``tambah`` (arrays) or ``tambah_hasil`` (a ``classify_frame``
+    result); households without a known poverty line are skipped. Merge
+    accumulators from other processes with ``gabung`` and read the
+    indicators with ``hasil``.
+    """
+
+    def __init__(self):
+        self._jumlah = np.zeros((len(_JUMLAH), 0))
+
+    def _kapasitas(self, kode_max: int):
+        if kode_max >= self._jumlah.shape[1]:
+            tambahan = np.zeros((len(_JUMLAH), kode_max + 1 - self._jumlah.shape[1]))
+            self._jumlah = np.hstack([self._jumlah, tambahan])
+
+    def tambah(self, kode_wilayah, perkapita, garis_kemiskinan, jumlah_anggota, status_idx, bobot=None):
+        """
+        Add households from columnar arrays (one element per household).
+        ``status_idx`` is the position in STATUS_LABELS, -1 when unknown;
+        ``bobot`` defaults to 1.
+        """
+        kode = np.asarray(kode_wilayah, dtype=np.int64)
+        y = np.asarray(perkapita, dtype=np.float64)
+        z = np.asarray(garis_kemiskinan, dtype=np.float64)
+        orang = np.asarray(jumlah_anggota, dtype=np.float64)
+        status = np.asarray(status_idx, dtype=np.int64)
+        w = np.ones(len(kode)) if bobot is None else np.asarray(bobot, dtype=np.float64)
+
+        valid = (status >= 0) & (z > 0) & (kode >= 0)
+        if not valid.all():
+            kode, y, z, orang, status, w = (a[valid] for a in (kode, y, z, orang, status, w))
+        if not len(kode):
+            return
+        self._kapasitas(int(kode.max()))
+        minlength = self._jumlah.shape[1]
+
+        gap = np.clip((z - y) / z, 0.0, None)
+        miskin = (y < z).astype(np.float64)
+        orang_w = orang * w
+        kolom = np.empty((len(_JUMLAH), len(kode)))
+        kolom[_POS["n_rumah_tangga"]] = 1.0
+        kolom[_POS["n_individu"]] = orang
+        kolom[_POS["populasi_tertimbang"]] = orang_w
+        for nama, nilai in (("P0", miskin), ("P1", gap), ("P2", gap * gap)):
+            kolom[_POS[nama]] = orang * nilai
+            kolom[_POS[nama + "_tertimbang"]] = orang_w * nilai
+        satu_status = np.arange(_N_STATUS)[:, None] == status
+        awal = _POS[_KOLOM_STATUS[0]]
+        kolom[awal:awal + _N_STATUS] = satu_status * orang
+        kolom[awal + _N_STATUS:awal + 2 * _N_STATUS] = satu_status * orang_w
+
+        for i in range(len(_JUMLAH)):
+            self._jumlah[i] += np.bincount(kode, weights=kolom[i], minlength=minlength)
+
+    def tambah_hasil(self, result: pd.DataFrame, bobot=None):
+        """Add a ``classify_frame`` / ``classify_arrays`` result (one row per household)."""
+        self.tambah(*kolom_hasil(result, bobot))
+
+    def gabung(self, other: "AkumulatorKemiskinan") -> "AkumulatorKemiskinan":
+        """Add the sums of ``other`` into this accumulator."""
+        self._kapasitas(other._jumlah.shape[1] - 1)
+        self._jumlah[:, :other._jumlah.shape[1]] += other._jumlah
+        return self
+
+    def hasil(self, nama_wilayah: dict | None = None, provinsi: bool = True) -> pd.DataFrame:
+        """
+        Indicators per kabupaten/kota, followed by their provinsi roll-up
+        when ``provinsi`` is set. ``nama_wilayah`` maps kode → name.
+        """
+        kode = np.flatnonzero(self._jumlah[_POS["n_rumah_tangga"]])
+        bagian = [_indikator("kabupaten", kode, self._jumlah[:, kode])]
+        if provinsi and len(kode):
+            kode_prov, posisi = np.unique(kode // 100 * 100, return_inverse=True)
+            jumlah_prov = np.stack([
+                np.bincount(posisi, weights=baris, minlength=len(kode_prov)) for baris in self._jumlah[:, kode]
+            ])
+            bagian.append(_indikator("provinsi", kode_prov, jumlah_prov))
+        df = pd.concat(bagian, ignore_index=True)
+        df["nama_wilayah"] = df["kode_wilayah"].map(nama_wilayah or {})
+        return df[KOLOM_HASIL]
+
+
+def _indikator(tingkat: str, kode: np.ndarray, jumlah: np.ndarray) -> pd.DataFrame:
+    """Divide the summed columns by persons (weighted or not) for one level."""
+    kolom = {
+        "tingkat": tingkat,
+        "kode_wilayah": kode,
+        "n_rumah_tangga": jumlah[_POS["n_rumah_tangga"]].astype(np.int64),
+        "n_individu": jumlah[_POS["n_individu"]].astype(np.int64),
+        "populasi_tertimbang": jumlah[_POS["populasi_tertimbang"]],
+    }
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for nama in _RASIO:
+            kolom[nama] = jumlah[_POS[nama]] / jumlah[_POS["n_individu"]]
+        for nama in _RASIO_TERTIMBANG:
+            kolom[nama] = jumlah[_POS[nama]] / jumlah[_POS["populasi_tertimbang"]]
+    return pd.DataFrame(kolom)
+
+
+def kolom_hasil(result: pd.DataFrame, bobot=None) -> tuple:
+    """The ``tambah`` arguments of a ``classify_frame`` result, e.g. to send them between processes."""
+    return (
+        result["kode_wilayah"].to_numpy(),
+        result["pengeluaran_perkapita"].to_numpy(),
+        result["garis_kemiskinan"].to_numpy(),
+        result["jumlah_anggota"].to_numpy(),
+        result["status"].cat.codes.to_numpy(),
+        bobot,
+    )
+
+
+def bobot_rumah_tangga(df: pd.DataFrame, kolom: str) -> np.ndarray:
+    """Per-household weight from ``kolom``, in first-appearance order of id_rt like ``classify_frame``."""
+    return df.groupby("id_rt", sort=False)[kolom].first().to_numpy(dtype=np.float64)
@@ -0,0 +1,339 @@
+"""
+JSON HTTP API for the classifier, without the Streamlit UI (standard library only).
+
+Endpoints:
+    GET  /health
+    GET  /garis-kemiskinan                          all regions of the current table
+    GET  /garis-kemiskinan?wilayah=..|kode=..[&tahun=2024]
+    GET  /metrics                                   Prometheus text (with GK_METRICS=1)
+    POST /klasifikasi                               one household → results dict
+    POST /klasifikasi/batch                         {"rumah_tangga": [...]} → {"hasil": [...]}
+    POST /infographic[?format=png]                  one household → image bytes
+
+Household body:
+    {"wilayah": "Kota Banda Aceh"  or  "kode_wilayah": 1171,
+     "tahun": 2024,                       optional, multi-year table
+     "garis_kemiskinan": 600000,          optional, overrides the lookup
+     "anggota_data": [{"hubungan": "Kepala Rumah Tangga", "umur": 40,
+                       "pendidikan": "SMA", "pekerjaan": "Petani"}, ...],
+     "pengeluaran_data": [{"rentang": "Bulanan", "kategori": "Makanan",
+                           "nilai": 1500000}, ...]}
+
+Poverty lines come from a ``PovertyLineRefresher`` snapshot, so requests
+never wait on the BPS API.
+
+Usage:
+    python api.py [--host 127.0.0.1] [--port 8000]
+"""
+import argparse
+import json
+import logging
+import math
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import metrics
+from data_loader import PovertyLineRefresher
+from engine import RENTANG_OPTIONS, klasifikasi_rumah_tangga, parse_currency
+from infographic import EXPORT_FORMATS, infographic_bytes
+
+API_MAX_BODY = int(os.getenv("GK_API_MAX_BODY", str(10 * 1024 * 1024)))
+API_MAX_BATCH = int(os.getenv("GK_API_MAX_BATCH", "10000"))
+
+logger = logging.getLogger(__name__)
+
+
+class ApiError(Exception):
+    """Request error reported to the client as ``{"error": message}`` with ``status``."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class KlasifikasiService:
+    """Request-independent logic: poverty-line lookup and classification on a snapshot."""
+
+    def __init__(self, refresher: PovertyLineRefresher):
+        self.refresher = refresher
+        self._nama_by_kode = {}
+        self._nama_for = None   # snapshot the reverse index was built for
+
+    def _nama_wilayah(self, snapshot, kode: int) -> str | None:
+        if self._nama_for is not snapshot:
+            self._nama_by_kode = {k: n for n, k in snapshot.index.kode_by_nama.items()}
+            self._nama_for = snapshot
+        return self._nama_by_kode.get(kode)
+
+    def garis(self, wilayah: str | None = None, kode: int | None = None, tahun: int | None = None) -> dict:
+        """Poverty line of one region as {wilayah, kode_wilayah, tahun, garis_kemiskinan}."""
+        snapshot = self.refresher.snapshot()
+        index = snapshot.index
+        if kode is None and wilayah is not None:
+            kode = index.kode_by_nama.get(wilayah)
+        if wilayah is None and kode is not None:
+            wilayah = self._nama_wilayah(snapshot, kode)
+        if wilayah is None or wilayah not in index.garis_by_nama:
+            raise ApiError(404, f"Wilayah tidak ditemukan: {wilayah or kode}")
+
+        if tahun is not None:
+            if kode is None:
+                raise ApiError(404, f"Data multi-tahun tidak tersedia untuk {wilayah}")
+            nilai = snapshot.tahunan.get(kode, tahun)
+            if nilai is None:
+                raise ApiError(404, f"Garis kemiskinan {wilayah} tahun {tahun} tidak tersedia")
+        else:
+            nilai = index.garis_by_nama[wilayah]
+        return {"wilayah": wilayah, "kode_wilayah": kode, "tahun": tahun, "garis_kemiskinan": nilai}
+
+    def daftar_garis(self) -> dict:
+        snapshot = self.refresher.snapshot()
+        index = snapshot.index
+        return {
+            "sumber": snapshot.status["source"],
+            "last_update": snapshot.status["last_update"],
+            "tahun_tersedia": snapshot.tahunan.tahun_tersedia(),
+            "wilayah": [
+                {"wilayah": nama, "kode_wilayah": index.kode_by_nama.get(nama),
+                 "garis_kemiskinan": index.garis_by_nama[nama]}
+                for nama in index.nama
+            ],
+        }
+
+    def klasifikasi(self, body: dict) -> dict:
+        """Results dict for one household body, as computed by the app on submit."""
+        if not isinstance(body, dict):
+            raise ApiError(400, "Data rumah tangga harus berupa objek JSON")
+        anggota_data = _anggota_data(body.get("anggota_data"))
+        pengeluaran_data = _pengeluaran_data(body.get("pengeluaran_data"))
+        tahun = _int_or_none(body.get("tahun"), "tahun")
+
+        if body.get("garis_kemiskinan") is not None:
+            garis = _angka(body["garis_kemiskinan"], "garis_kemiskinan")
+            wilayah = body.get("wilayah")
+        else:
+            lookup = self.garis(body.get("wilayah"), _int_or_none(body.get("kode_wilayah"), "kode_wilayah"), tahun)
+            garis, wilayah = lookup["garis_kemiskinan"], lookup["wilayah"]
+
+        with metrics.timer("gk_klasifikasi_seconds", sumber="api"):
+            results = klasifikasi_rumah_tangga(anggota_data, pengeluaran_data, garis, selected_wilayah=wilayah)
+        results["tahun"] = tahun
+        return results
+
+
+def _int_or_none(value, field: str) -> int | None:
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"{field} harus berupa bilangan bulat") from None
+
+
+def _angka(value, field: str) -> float:
+    """Non-negative finite amount, like the UI's ``min_value=0`` inputs; strings use ``parse_currency``."""
+    if isinstance(value, str):
+        return parse_currency(value)
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        if not math.isfinite(value) or value < 0:
+            raise ApiError(400, f"{field} harus berupa angka tidak negatif")
+        return value
+    raise ApiError(400, f"{field} harus berupa angka")
+
+
+def _umur(value, field: str) -> int:
+    """Age as a non-negative whole number (integer or numeric string)."""
+    if isinstance(value, bool):
+        raise ApiError(400, f"{field} harus berupa bilangan bulat tidak negatif")
+    try:
+        umur = int(value) if not isinstance(value, float) or value.is_integer() else None
+    except (TypeError, ValueError, OverflowError):
+        umur = None
+    if umur is None or umur < 0:
+        raise ApiError(400, f"{field} harus berupa bilangan bulat tidak negatif")
+    return umur
+
+
+def _anggota_data(anggota) -> list[dict]:
+    if not isinstance(anggota, list) or not anggota:
+        raise ApiError(400, "anggota_data harus berupa list berisi minimal satu anggota")
+    rows = []
+    for i, a in enumerate(anggota):
+        if not isinstance(a, dict):
+            raise ApiError(400, "Setiap anggota harus berupa objek JSON")
+        rows.append({
+            "hubungan": a.get("hubungan", ""),
+            "umur": _umur(a.get("umur", 0), f"anggota_data[{i}].umur"),
+            "pendidikan": a.get("pendidikan", ""),
+            "pekerjaan": a.get("pekerjaan", ""),
+        })
+    return rows
+
+
+def _pengeluaran_data(pengeluaran) -> list[dict]:
+    if not isinstance(pengeluaran, list):
+        raise ApiError(400, "pengeluaran_data harus berupa list")
+    rows = []
+    for i, p in enumerate(pengeluaran):
+        if not isinstance(p, dict):
+            raise ApiError(400, f"pengeluaran_data[{i}] harus berupa objek JSON")
+        rentang = p.get("rentang", "Bulanan")
+        if rentang not in RENTANG_OPTIONS:
+            raise ApiError(400, f"pengeluaran_data[{i}].rentang harus salah satu dari {RENTANG_OPTIONS}")
+        rows.append({
+            "rentang": rentang,
+            "kategori": p.get("kategori", ""),
+            "nilai": _angka(p.get("nilai", 0), f"pengeluaran_data[{i}].nilai"),
+        })
+    return rows
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"    # keep-alive, so clients reuse connections
+    disable_nagle_algorithm = True   # small responses go out without the 40 ms delayed-ACK stall
+    server_version = "CekKemiskinanAPI"
+    service: KlasifikasiService      # set by make_server
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send(self, status: int, body: bytes, content_type: str):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if self.close_connection:
+            self.send_header("Connection", "close")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+        self._send(status, body, "application/json; charset=utf-8")
+
+    def _read_json(self):
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise ApiError(400, "Content-Length tidak valid")
+        if length > API_MAX_BODY:
+            raise ApiError(413, f"Body melebihi {API_MAX_BODY} byte")
+        self._body_read = True
+        try:
+            return json.loads(self.rfile.read(length) or b"null")
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise ApiError(400, f"JSON tidak valid: {e}") from None
+
+    def _dispatch(self, handlers: dict):
+        url = urlsplit(self.path)
+        handler = handlers.get(url.path.rstrip("/") or "/")
+        self._body_read = False
+        try:
+            if handler is None:
+                raise ApiError(404, f"Endpoint tidak dikenal: {url.path}")
+            handler(self, {k: v[-1] for k, v in parse_qs(url.query).items()})
+        except ApiError as e:
+            self._tutup_jika_body_tersisa()
+            self._send_json(e.status, {"error": str(e)})
+        except Exception:
+            logger.exception("Gagal memproses %s %s", self.command, self.path)
+            self._tutup_jika_body_tersisa()
+            self._send_json(500, {"error": "Kesalahan internal server"})
+
+    def _tutup_jika_body_tersisa(self):
+        # An unread request body would be parsed as the next keep-alive request
+        if not self._body_read and self.headers.get("Content-Length", "0") not in ("", "0"):
+            self.close_connection = True
+
+    # ---------- GET ----------
+    def _health(self, query):
+        status = self.service.refresher.snapshot().status
+        self._send_json(200, {"status": "ok", "sumber": status["source"], "last_update": status["last_update"]})
+
+    def _garis_kemiskinan(self, query):
+        if "wilayah" not in query and "kode" not in query:
+            self._send_json(200, self.service.daftar_garis())
+            return
+        self._send_json(200, self.service.garis(
+            query.get("wilayah"),
+            _int_or_none(query.get("kode"), "kode"),
+            _int_or_none(query.get("tahun"), "tahun"),
+        ))
+
+    def _metrics(self, query):
+        self._send(200, metrics.render_text().encode("utf-8"), metrics.CONTENT_TYPE)
+
+    # ---------- POST ----------
+    def _klasifikasi(self, query):
+        self._send_json(200, self.service.klasifikasi(self._read_json()))
+
+    def _klasifikasi_batch(self, query):
+        body = self._read_json()
+        rumah_tangga = body.get("rumah_tangga") if isinstance(body, dict) else None
+        if not isinstance(rumah_tangga, list):
+            raise ApiError(400, "Body harus berupa {\"rumah_tangga\": [...]}")
+        if len(rumah_tangga) > API_MAX_BATCH:
+            raise ApiError(413, f"Maksimal {API_MAX_BATCH} rumah tangga per permintaan")
+        hasil = []
+        for i, rt in enumerate(rumah_tangga):
+            try:
+                hasil.append(self.service.klasifikasi(rt))
+            except ApiError as e:
+                raise ApiError(e.status, f"rumah_tangga[{i}]: {e}") from None
+        self._send_json(200, {"hasil": hasil})
+
+    def _infographic(self, query):
+        fmt = query.get("format", "png")
+        if fmt not in EXPORT_FORMATS:
+            raise ApiError(400, f"format harus salah satu dari {list(EXPORT_FORMATS)}")
+        results = self.service.klasifikasi(self._read_json())
+        if not results["selected_wilayah"]:
+            results["selected_wilayah"] = "-"
+        self._send(200, infographic_bytes(results, fmt), EXPORT_FORMATS[fmt][1])
+
+    def do_GET(self):
+        self._dispatch({
+            "/health": ApiHandler._health,
+            "/garis-kemiskinan": ApiHandler._garis_kemiskinan,
+            "/metrics": ApiHandler._metrics,
+        })
+
+    def do_POST(self):
+        self._dispatch({
+            "/klasifikasi": ApiHandler._klasifikasi,
+            "/klasifikasi/batch": ApiHandler._klasifikasi_batch,
+            "/infographic": ApiHandler._infographic,
+        })
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8000,
+                refresher: PovertyLineRefresher | None = None) -> ThreadingHTTPServer:
+    """Build the HTTP server (not started); ``port=0`` picks a free port."""
+    service = KlasifikasiService(refresher or PovertyLineRefresher().start())
+    handler = type("BoundApiHandler", (ApiHandler,), {"service": service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP API JSON untuk klasifikasi status ekonomi rumah tangga.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    server = make_server(args.host, args.port)
+    logger.info("Mendengarkan di http://%s:%d", *server.server_address[:2])
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Vectorized batch classifier.
+
+Computes the same figures as ``engine.klasifikasi_rumah_tangga`` for many
+households at once from columnar NumPy arrays, so survey extracts with
+millions of households can be classified in a single pass.
+"""
+import os
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from engine import RENTANG_OPTIONS, STATUS_LADDER, STATUS_LABELS
+
+# Integer codes for rentang, in the order of RENTANG_OPTIONS
+RENTANG_KODE = {rentang: kode for kode, rentang in enumerate(RENTANG_OPTIONS)}
+BULANAN = RENTANG_KODE["Bulanan"]
+MINGGUAN = RENTANG_KODE["Mingguan"]
+TAHUNAN = RENTANG_KODE["Tahunan"]
+
+# Threshold multipliers (1x, 1.5x, 3.5x, 17x) and per-status colours
+STATUS_MULTIPLIERS = np.array([batas for batas, _, _ in STATUS_LADDER if batas is not None])
+STATUS_COLORS = np.array([color for _, _, color in STATUS_LADDER], dtype=object)
+
+
+def encode_rentang(rentang) -> np.ndarray:
+    """Convert rentang labels (or already-encoded ints) to int8 codes."""
+    rentang = np.asarray(rentang)
+    if rentang.dtype.kind in "iu":
+        return rentang.astype(np.int8, copy=False)
+    codes = pd.Categorical(rentang, categories=RENTANG_OPTIONS).codes
+    if (codes < 0).any():
+        unknown = sorted(set(rentang[codes < 0].tolist()))
+        raise ValueError(f"Rentang tidak dikenal: {unknown}")
+    return codes.astype(np.int8, copy=False)
+
+
+def build_garis_lookup(garis_ref) -> np.ndarray:
+    """
+    Build a dense index array mapping region code → garis kemiskinan.
+    ``garis_ref`` is a dict or Series keyed by integer region code.
+    Missing codes map to NaN.
+    """
+    ref = pd.Series(garis_ref, dtype="float64")
+    kode = ref.index.to_numpy(dtype=np.int64)
+    lookup = np.full(int(kode.max()) + 1 if len(kode) else 1, np.nan)
+    lookup[kode] = ref.to_numpy()
+    return lookup
+
+
+def lookup_garis(kode_wilayah, lookup: np.ndarray) -> np.ndarray:
+    """Map region codes to poverty lines through a dense lookup array."""
+    kode = np.asarray(kode_wilayah, dtype=np.int64)
+    valid = (kode >= 0) & (kode < len(lookup))
+    garis = np.full(len(kode), np.nan)
+    garis[valid] = lookup[kode[valid]]
+    return garis
+
+
+def classify_arrays(
+    rumah_tangga,
+    nilai,
+    rentang,
+    jumlah_anggota,
+    garis_kemiskinan,
+) -> pd.DataFrame:
+    """
+    Classify households from columnar arrays.
+
+    Expense-level arrays (one element per expense line):
+        rumah_tangga  household position 0..n-1 the line belongs to
+        nilai         expense value
+        rentang       rentang label or code from RENTANG_KODE
+    Household-level arrays (one element per household):
+        jumlah_anggota    household size
+        garis_kemiskinan  poverty line for the household's region
+
+    Returns one row per household with the same figures as the scalar
+    engine. Thresholds are compared as ``perkapita < k * garis`` rather than
+    on ``rasio`` so boundary cases classify identically. Households whose
+    poverty line is unknown (NaN) get a missing status.
+    """
+    rumah_tangga = np.asarray(rumah_tangga, dtype=np.int64)
+    nilai = np.asarray(nilai, dtype=np.float64)
+    rentang = encode_rentang(rentang)
+    jumlah_anggota = np.asarray(jumlah_anggota, dtype=np.int64)
+    garis = np.asarray(garis_kemiskinan, dtype=np.float64)
+    n = len(jumlah_anggota)
+
+    # Sum per household and rentang in one bincount over a combined key
+    key = rumah_tangga * len(RENTANG_OPTIONS) + rentang
+    totals = np.bincount(key, weights=nilai, minlength=n * len(RENTANG_OPTIONS))
+    totals = totals.reshape(n, len(RENTANG_OPTIONS))
+    total_mingguan = totals[:, MINGGUAN]
+    total_bulanan = totals[:, BULANAN]
+    total_tahunan = totals[:, TAHUNAN]
+
+    # Convert all to monthly
+    bulanan_dari_mingguan = total_mingguan * 30 / 7
+    bulanan_dari_tahunan = total_tahunan / 12
+    total_pengeluaran = bulanan_dari_mingguan + total_bulanan + bulanan_dari_tahunan
+
+    # Calculate per capita
+    with np.errstate(divide="ignore", invalid="ignore"):
+        perkapita = np.where(jumlah_anggota > 0, total_pengeluaran / jumlah_anggota, 0.0)
+        rasio = np.where(garis > 0, perkapita / garis, 0.0)
+
+    # Status index = number of thresholds the household reaches
+    status_idx = (perkapita[:, None] >= garis[:, None] * STATUS_MULTIPLIERS).sum(axis=1)
+    status_idx = np.where(np.isnan(garis), -1, status_idx)
+    known = status_idx >= 0
+
+    color = np.full(n, None, dtype=object)
+    color[known] = STATUS_COLORS[status_idx[known]]
+    rasio = np.where(known, rasio, np.nan)
+
+    return pd.DataFrame({
+        'total_mingguan': total_mingguan,
+        'total_bulanan': total_bulanan,
+        'total_tahunan': total_tahunan,
+        'bulanan_dari_mingguan': bulanan_dari_mingguan,
+        'bulanan_dari_tahunan': bulanan_dari_tahunan,
+        'total_pengeluaran': total_pengeluaran,
+        'jumlah_anggota': jumlah_anggota,
+        'garis_kemiskinan': garis,
+        'pengeluaran_perkapita': perkapita,
+        'status': pd.Categorical.from_codes(status_idx, categories=STATUS_LABELS),
+        'color': color,
+        'rasio': rasio,
+    })
+
+
+def classify_frame(df: pd.DataFrame, garis_ref) -> pd.DataFrame:
+    """
+    Classify a long-format expense frame, one row per expense line, with
+    columns id_rt, kode_wilayah, jumlah_anggota, rentang and nilai.
+    ``garis_ref`` maps integer region code → garis kemiskinan, or is a
+    dense lookup array from ``build_garis_lookup`` (reuse it across chunks).
+    Returns one row per id_rt in order of first appearance.
+    """
+    lookup = garis_ref if isinstance(garis_ref, np.ndarray) else build_garis_lookup(garis_ref)
+    rumah_tangga, id_rt = pd.factorize(df["id_rt"], sort=False)
+    first = np.unique(rumah_tangga, return_index=True)[1]
+    kode_wilayah = df["kode_wilayah"].to_numpy()[first]
+
+    result = classify_arrays(
+        rumah_tangga,
+        df["nilai"].to_numpy(),
+        df["rentang"].to_numpy(),
+        df["jumlah_anggota"].to_numpy()[first],
+        lookup_garis(kode_wilayah, lookup),
+    )
+    result.insert(0, "id_rt", id_rt)
+    result.insert(1, "kode_wilayah", kode_wilayah)
+    return result
+
+
+# ---------- Multi-process execution ----------
+# Poverty-line lookup installed once per worker process by the pool initializer,
+# so tasks only carry their slice of the input.
+_worker_lookup = None
+
+
+def _init_worker(lookup: np.ndarray):
+    global _worker_lookup
+    _worker_lookup = lookup
+
+
+def _frame(df: pd.DataFrame) -> pd.DataFrame:
+    return df
+
+
+def frame_task(df: pd.DataFrame) -> tuple:
+    """Task for ``ParallelClassifier.classify_tasks`` that ships an in-memory frame."""
+    return _frame, (df,)
+
+
+def _classify_read(reader, args, finish=None):
+    """Worker task: read a range with ``reader(*args)``, classify it locally, then ``finish``."""
+    df = reader(*args)
+    result = classify_frame(df, _worker_lookup)
+    return len(df), finish(df, result) if finish is not None else result
+
+
+def household_ranges(id_rt, parts: int) -> list[tuple[int, int]]:
+    """
+    Split row positions 0..n into at most ``parts`` contiguous ranges of about
+    equal size, moving each cut forward to the next household boundary.
+    Assumes the rows of one household are contiguous; only the rows around
+    each cut are inspected.
+    """
+    id_rt = np.asarray(id_rt)
+    n = len(id_rt)
+    cuts = [0]
+    for i in range(1, parts):
+        cut = max(n * i // parts, cuts[-1])
+        while 0 < cut < n and id_rt[cut] == id_rt[cut - 1]:
+            cut += 1
+        if cut >= n:
+            break
+        if cut > cuts[-1]:
+            cuts.append(cut)
+    cuts.append(n)
+    return [(start, stop) for start, stop in zip(cuts, cuts[1:]) if stop > start]
+
+
+class ParallelClassifier:
+    """
+    Process-pool wrapper around ``classify_frame``.
+
+    Work is split into contiguous row ranges on household boundaries and
+    every worker reads (or unpickles), factorizes and classifies its own
+    range, so the parent only hands out ranges and collects the outputs in
+    range order. Rows of one household must be contiguous (as ``batch_cli``
+    requires); the result is then identical to a serial ``classify_frame``.
+    Use as a context manager, or call ``close()`` when done.
+    """
+
+    def __init__(self, garis_ref, workers: int | None = None):
+        from concurrent.futures import ProcessPoolExecutor
+
+        lookup = garis_ref if isinstance(garis_ref, np.ndarray) else build_garis_lookup(garis_ref)
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(lookup,),
+        )
+
+    def classify(self, df: pd.DataFrame) -> pd.DataFrame:
+        ranges = household_ranges(df["id_rt"].to_numpy(), self.workers)
+        if not ranges:
+            return classify_frame(df, np.full(1, np.nan))
+        tasks = (frame_task(df.iloc[start:stop]) for start, stop in ranges)
+        return pd.concat([result for _, result in self.classify_tasks(tasks)], ignore_index=True)
+
+    def classify_tasks(self, tasks, finish=None):
+        """
+        Classify ``(reader, args)`` tasks on the pool and yield
+        ``(rows_read, result)`` in task order. ``reader(*args)`` runs in the
+        worker and returns one household-complete frame, so readers that
+        load their own file range keep parsing off the parent process.
+        ``finish(df, result)``, a picklable callable, also runs in the worker
+        and its return value replaces ``result`` (e.g. formatted output).
+        Up to two tasks per worker are kept in flight.
+        """
+        pending = deque()
+        for reader, args in tasks:
+            pending.append(self._pool.submit(_classify_read, reader, args, finish))
+            if len(pending) >= 2 * self.workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    def close(self):
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def classify_frame_parallel(df: pd.DataFrame, garis_ref, workers: int | None = None) -> pd.DataFrame:
+    """One-shot parallel ``classify_frame`` using a temporary process pool."""
+    with ParallelClassifier(garis_ref, workers) as classifier:
+        return classifier.classify(df)
@@ -0,0 +1,320 @@
+"""
+Command-line batch classification.
+
+Streams a long-format household expense file (CSV or Parquet, one row per
+expense line) in chunks, joins each chunk to the poverty lines from
+``data_loader.load_data()`` and writes one output row per household
+incrementally, so memory stays flat regardless of input size.
+
+Required input columns:
+    id_rt           household identifier (rows of one household must be contiguous)
+    kode_wilayah    BPS kabupaten/kota code, e.g. 1101
+    jumlah_anggota  household size
+    rentang         Bulanan | Mingguan | Tahunan
+    nilai           expense value in Rupiah
+
+With ``--agregat`` the region indicators of ``agregat.py`` (FGT P0/P1/P2
+and class shares per kabupaten/kota and provinsi) are accumulated chunk by
+chunk and written at the end; ``--bobot`` names an optional survey-weight
+column (first row of each household).
+
+Usage:
+    python batch_cli.py input.csv output.csv [--chunksize 500000] [--workers 0] [--tahun 2024]
+                        [--agregat agregat.csv] [--bobot bobot]
+"""
+import argparse
+import csv
+import functools
+import io
+import os
+import sys
+import time
+
+import pandas as pd
+
+import data_loader
+from agregat import AkumulatorKemiskinan, bobot_rumah_tangga, kolom_hasil
+from batch import ParallelClassifier, build_garis_lookup, classify_frame, frame_task, household_ranges
+
+INPUT_COLUMNS = ["id_rt", "kode_wilayah", "jumlah_anggota", "rentang", "nilai"]
+CSV_DTYPE = {"id_rt": str, "rentang": str}
+OUTPUT_COLUMNS = [
+    "id_rt", "kode_wilayah", "jumlah_anggota", "total_pengeluaran",
+    "pengeluaran_perkapita", "garis_kemiskinan", "rasio", "status",
+]
+
+
+def _is_parquet(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in (".parquet", ".pq")
+
+
+def iter_chunks(path: str, chunksize: int, columns: list[str] = INPUT_COLUMNS):
+    """Yield DataFrame chunks of at most ``chunksize`` rows from CSV or Parquet."""
+    if _is_parquet(path):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            sys.exit("Membaca Parquet membutuhkan pyarrow: pip install pyarrow")
+        parquet_file = pq.ParquetFile(path)
+        for record_batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            yield record_batch.to_pandas()
+    else:
+        yield from pd.read_csv(
+            path,
+            usecols=columns,
+            dtype=CSV_DTYPE,
+            chunksize=chunksize,
+        )
+
+
+def iter_complete_households(chunks):
+    """
+    Re-cut chunks on household boundaries.
+    The rows of the last household in each chunk are held back and prepended
+    to the next chunk, so a household split across chunks is classified once.
+    """
+    carry = None
+    for chunk in chunks:
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        if chunk.empty:
+            continue
+        last_id = chunk["id_rt"].iat[-1]
+        tail = (chunk["id_rt"] == last_id).to_numpy()
+        # Only hold back the trailing run of the last id
+        tail_start = len(chunk) - tail[::-1].argmin() if not tail.all() else 0
+        carry = chunk.iloc[tail_start:]
+        if tail_start:
+            yield chunk.iloc[:tail_start]
+    if carry is not None and not carry.empty:
+        yield carry
+
+
+def _csv_id(line: bytes, kolom: int):
+    return next(csv.reader([line.decode()]))[kolom]
+
+
+def csv_ranges(path: str, chunksize: int, parts: int = 1):
+    """
+    Cut a CSV file into byte ranges of about ``chunksize`` rows (and at least
+    ``parts`` ranges) that start on a line and on a household boundary.
+    Returns ``(header, ranges)``. Only the header, a sample of lines and the
+    lines around each cut are read; rows must not contain quoted newlines.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header_line = f.readline()
+        header = next(csv.reader([header_line.decode()]))
+        kolom = header.index("id_rt")
+        data_start = f.tell()
+        sample = f.readlines(1 << 16)
+        row_bytes = sum(map(len, sample)) / max(len(sample), 1) or 1
+        step = max(int(min(chunksize * row_bytes, (size - data_start) / max(parts, 1))), 1)
+
+        cuts = [data_start]
+        while True:
+            f.seek(cuts[-1] + step)
+            f.readline()  # finish the partial line
+            line = f.readline()
+            if not line:
+                break
+            id_prev = _csv_id(line, kolom)
+            while True:
+                pos = f.tell()
+                line = f.readline()
+                if not line or _csv_id(line, kolom) != id_prev:
+                    break
+            if not line:
+                break
+            cuts.append(pos)
+    cuts.append(size)
+    return header, [(start, stop) for start, stop in zip(cuts, cuts[1:]) if stop > start]
+
+
+def read_csv_range(path: str, start: int, stop: int, header: list[str], columns: list[str]) -> pd.DataFrame:
+    """Parse bytes ``start:stop`` of a CSV file; runs in the batch worker processes."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(stop - start)
+    return pd.read_csv(io.BytesIO(data), header=None, names=header, usecols=columns, dtype=CSV_DTYPE)
+
+
+def parallel_tasks(path: str, chunksize: int, columns: list[str], workers: int):
+    """
+    ``(reader, args)`` tasks for ``ParallelClassifier.classify_tasks``.
+    CSV workers read and parse their own byte range; Parquet batches (already
+    decoded by multithreaded pyarrow) are cut into household ranges.
+    """
+    if not _is_parquet(path):
+        header, ranges = csv_ranges(path, chunksize, workers)
+        missing = set(columns) - set(header)
+        if missing:
+            sys.exit(f"Kolom tidak ditemukan di {path}: {sorted(missing)}")
+        for start, stop in ranges:
+            yield read_csv_range, (path, start, stop, header, columns)
+        return
+    for chunk in iter_complete_households(iter_chunks(path, chunksize, columns)):
+        for start, stop in household_ranges(chunk["id_rt"].to_numpy(), workers):
+            yield frame_task(chunk.iloc[start:stop])
+
+
+class _Writer:
+    """Incremental CSV or Parquet writer."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.parquet = _is_parquet(path)
+        self._pq_writer = None
+        self._header = True
+
+    def write(self, df: pd.DataFrame | str):
+        """Append a frame, or CSV rows already formatted without header."""
+        if isinstance(df, str):
+            with open(self.path, "w" if self._header else "a", newline="") as f:
+                if self._header:
+                    f.write(",".join(OUTPUT_COLUMNS) + "\n")
+                f.write(df)
+            self._header = False
+        elif self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if self._pq_writer is None:
+                self._pq_writer = pq.ParquetWriter(self.path, table.schema)
+            self._pq_writer.write_table(table)
+        else:
+            df.to_csv(self.path, mode="w" if self._header else "a", header=self._header, index=False)
+            self._header = False
+
+    def close(self):
+        if self._pq_writer is not None:
+            self._pq_writer.close()
+
+
+def _siapkan_output(df: pd.DataFrame, result: pd.DataFrame, csv_output: bool, agregat: bool, bobot: str | None):
+    """
+    Turn a classified chunk into what the parent process needs: the output
+    rows (already formatted when writing CSV) and, with ``agregat``, the
+    arrays for ``AkumulatorKemiskinan.tambah``. Runs in the batch workers.
+    """
+    agregat_args = None
+    if agregat:
+        agregat_args = kolom_hasil(result, bobot_rumah_tangga(df, bobot) if bobot else None)
+    result["status"] = result["status"].astype(object)
+    output = result[OUTPUT_COLUMNS]
+    if csv_output:
+        output = output.to_csv(header=False, index=False)
+    return len(result), output, agregat_args
+
+
+def _classify_serial(path: str, chunksize: int, columns: list[str], lookup, finish):
+    """Yield ``(rows_read, finish(chunk, result))`` per chunk, like ``ParallelClassifier.classify_tasks``."""
+    for chunk in iter_complete_households(iter_chunks(path, chunksize, columns)):
+        yield len(chunk), finish(chunk, classify_frame(chunk, lookup))
+
+
+def _load_lookup(tahun: int | None, quiet: bool):
+    """Dense code → line lookup, from load_data() or the multi-year store for ``tahun``."""
+    if tahun is not None:
+        store = data_loader.load_garis_tahunan()
+        if tahun not in store.tahun_tersedia():
+            sys.exit(f"Garis kemiskinan tahun {tahun} tidak tersedia (tersedia: {store.tahun_tersedia()})")
+        lookup = store.lookup_array(tahun)
+        if not quiet:
+            print(f"Garis kemiskinan: tahun {tahun}, {len(store)} wilayah", file=sys.stderr)
+        return lookup
+
+    wilayah_data, fetch_status = data_loader.load_data()
+    if "kode_wilayah" not in wilayah_data.columns:
+        sys.exit(f"Data garis kemiskinan ({fetch_status['source']}) tidak memiliki kode_wilayah")
+    if not quiet:
+        print(
+            f"Garis kemiskinan: sumber {fetch_status['source']}, {len(wilayah_data)} wilayah",
+            file=sys.stderr,
+        )
+    return build_garis_lookup(wilayah_data.set_index("kode_wilayah")["garis_kemiskinan"])
+
+
+def run(
+    input_path: str,
+    output_path: str,
+    chunksize: int,
+    quiet: bool = False,
+    workers: int = 1,
+    tahun: int | None = None,
+    agregat_path: str | None = None,
+    bobot: str | None = None,
+) -> int:
+    """
+    Classify ``input_path`` into ``output_path``. Returns the number of households written.
+    With ``workers`` > 1 the input is cut into household ranges that the workers of a
+    process pool read (CSV) and classify; the parent only writes the results in order.
+    ``tahun`` selects a year from the multi-year store instead of the current table.
+    ``agregat_path`` also writes region indicators, weighted by the ``bobot`` column if given.
+    """
+    lookup = _load_lookup(tahun, quiet)
+    akumulator = AkumulatorKemiskinan() if agregat_path else None
+    columns = INPUT_COLUMNS + [bobot] if bobot else INPUT_COLUMNS
+
+    parallel = ParallelClassifier(lookup, workers) if workers > 1 else None
+    writer = _Writer(output_path)
+    rows_read = households = 0
+    t0 = time.perf_counter()
+    try:
+        finish = functools.partial(
+            _siapkan_output, csv_output=not writer.parquet, agregat=akumulator is not None, bobot=bobot
+        )
+        if parallel is not None:
+            hasil = parallel.classify_tasks(parallel_tasks(input_path, chunksize, columns, workers), finish)
+        else:
+            hasil = _classify_serial(input_path, chunksize, columns, lookup, finish)
+        for n_baris, (n_rt, output, agregat_args) in hasil:
+            if agregat_args is not None:
+                akumulator.tambah(*agregat_args)
+            writer.write(output)
+            rows_read += n_baris
+            households += n_rt
+            if not quiet:
+                elapsed = time.perf_counter() - t0
+                print(
+                    f"{rows_read:,} baris, {households:,} rumah tangga, "
+                    f"{rows_read / elapsed:,.0f} baris/detik",
+                    file=sys.stderr,
+                )
+    finally:
+        writer.close()
+        if parallel is not None:
+            parallel.close()
+    if akumulator is not None:
+        _Writer(agregat_path).write(akumulator.hasil(data_loader.load_nama_wilayah()))
+    return households
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Klasifikasi status ekonomi rumah tangga secara batch (CSV/Parquet)."
+    )
+    parser.add_argument("input", help="file pengeluaran (.csv atau .parquet)")
+    parser.add_argument("output", help="file hasil (.csv atau .parquet)")
+    parser.add_argument("--chunksize", type=int, default=500_000, help="baris per chunk")
+    parser.add_argument(
+        "-j", "--workers", type=int, default=1,
+        help="jumlah proses paralel (0 = semua core); tiap proses membaca dan mengklasifikasikan rentang barisnya sendiri",
+    )
+    parser.add_argument("--tahun", type=int, help="tahun garis kemiskinan (default: tahun terbaru dari API/lokal)")
+    parser.add_argument("--agregat", help="tulis indikator kemiskinan per kabupaten/kota dan provinsi (.csv/.parquet)")
+    parser.add_argument("--bobot", help="kolom bobot survei untuk indikator tertimbang")
+    parser.add_argument("-q", "--quiet", action="store_true", help="tanpa laporan progres")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    workers = args.workers or os.cpu_count() or 1
+    households = run(
+        args.input, args.output, args.chunksize, args.quiet, workers, args.tahun, args.agregat, args.bobot
+    )
+    if not args.quiet:
+        print(f"Selesai: {households:,} rumah tangga dalam {time.perf_counter() - t0:.1f} detik", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
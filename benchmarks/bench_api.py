@@ -0,0 +1,93 @@
+"""
+Latency benchmark for the JSON HTTP API.
+
+Usage:
+    python benchmarks/bench_api.py [--requests 2000] [--batch 500]
+
+Starts ``api.make_server`` on a free local port in a background thread and
+sends sequential requests over one keep-alive connection: single-household
+``POST /klasifikasi``, ``GET /garis-kemiskinan`` lookups and one batch
+request. Reports p50/p99 latency per endpoint.
+"""
+import argparse
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from api import make_server  # noqa: E402
+from data_loader import PovertyLineRefresher  # noqa: E402
+
+
+def household(i: int, wilayah: str) -> dict:
+    return {
+        "wilayah": wilayah,
+        "anggota_data": [{"hubungan": "Kepala Rumah Tangga", "umur": 40}, {"hubungan": "Anak", "umur": 9}],
+        "pengeluaran_data": [
+            {"rentang": "Bulanan", "kategori": "Makanan", "nilai": 1_000_000 + i},
+            {"rentang": "Mingguan", "kategori": "Transportasi", "nilai": 70_000},
+            {"rentang": "Tahunan", "kategori": "Pendidikan", "nilai": 2_400_000},
+        ],
+    }
+
+
+def percentiles(times: list[float]) -> str:
+    times = sorted(times)
+    p50 = times[len(times) // 2]
+    p99 = times[min(len(times) - 1, int(len(times) * 0.99))]
+    return f"p50 {p50 * 1000:6.2f} ms  p99 {p99 * 1000:6.2f} ms  max {times[-1] * 1000:6.2f} ms"
+
+
+def request(conn, method: str, path: str, body=None) -> tuple[float, bytes]:
+    payload = json.dumps(body).encode() if body is not None else None
+    headers = {"Content-Type": "application/json"} if payload else {}
+    t0 = time.perf_counter()
+    conn.request(method, path, body=payload, headers=headers)
+    response = conn.getresponse()
+    data = response.read()
+    elapsed = time.perf_counter() - t0
+    if response.status != 200:
+        sys.exit(f"{method} {path}: HTTP {response.status} {data[:200]!r}")
+    return elapsed, data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+
+    refresher = PovertyLineRefresher()     # no background thread: a fixed snapshot
+    server = make_server("127.0.0.1", 0, refresher)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    conn = http.client.HTTPConnection(*server.server_address[:2])
+
+    wilayah = refresher.snapshot().index.nama
+    for i in range(50):   # warm-up
+        request(conn, "POST", "/klasifikasi", household(i, wilayah[i % len(wilayah)]))
+
+    klasifikasi = [
+        request(conn, "POST", "/klasifikasi", household(i, wilayah[i % len(wilayah)]))[0]
+        for i in range(args.requests)
+    ]
+    garis = [
+        request(conn, "GET", "/garis-kemiskinan?kode="
+                + str(refresher.snapshot().index.kode_by_nama.get(wilayah[i % len(wilayah)], "")))[0]
+        for i in range(args.requests)
+    ]
+    batch_body = {"rumah_tangga": [household(i, wilayah[i % len(wilayah)]) for i in range(args.batch)]}
+    batch = [request(conn, "POST", "/klasifikasi/batch", batch_body)[0] for _ in range(20)]
+
+    print(f"POST /klasifikasi        ({args.requests} req): {percentiles(klasifikasi)}")
+    print(f"GET  /garis-kemiskinan   ({args.requests} req): {percentiles(garis)}")
+    print(f"POST /klasifikasi/batch  (20 × {args.batch} rt): {percentiles(batch)}  "
+          f"{args.batch / sorted(batch)[len(batch) // 2]:,.0f} rt/s")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Benchmark the vectorized batch classifier against the scalar engine.
+
+Usage:
+    python benchmarks/bench_batch.py [--households 1000000] [--lines 7] [--workers 32]
+
+Generates a synthetic survey extract, checks that the batch output matches
+``engine.klasifikasi_rumah_tangga`` on a sample, and reports rows/second.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pandas as pd  # noqa: E402
+
+from batch import (  # noqa: E402
+    ParallelClassifier,
+    build_garis_lookup,
+    classify_arrays,
+    lookup_garis,
+)
+from engine import RENTANG_OPTIONS, klasifikasi_rumah_tangga  # noqa: E402
+
+
+def make_households(n_households: int, lines_per_household: int, seed: int = 0):
+    """Build synthetic columnar arrays for n households."""
+    rng = np.random.default_rng(seed)
+    garis_ref = {kode: int(rng.integers(350_000, 1_000_000)) for kode in range(1101, 1101 + 500)}
+    kode_ref = np.array(list(garis_ref))
+
+    n_lines = n_households * lines_per_household
+    rumah_tangga = np.repeat(np.arange(n_households), lines_per_household)
+    nilai = rng.integers(0, 3_000_000, n_lines)
+    rentang = rng.integers(0, len(RENTANG_OPTIONS), n_lines).astype(np.int8)
+    jumlah_anggota = rng.integers(1, 9, n_households)
+    kode_wilayah = rng.choice(kode_ref, n_households)
+    return garis_ref, rumah_tangga, nilai, rentang, jumlah_anggota, kode_wilayah
+
+
+def run_scalar(garis, nilai, rentang, jumlah_anggota, lines_per_household: int, sample: int):
+    """Classify the first ``sample`` households with the scalar engine."""
+    results = []
+    for i in range(sample):
+        start = i * lines_per_household
+        stop = start + lines_per_household
+        pengeluaran_data = [
+            {"rentang": RENTANG_OPTIONS[r], "kategori": "", "nilai": int(v)}
+            for r, v in zip(rentang[start:stop], nilai[start:stop])
+        ]
+        anggota_data = [{}] * int(jumlah_anggota[i])
+        results.append(klasifikasi_rumah_tangga(anggota_data, pengeluaran_data, garis[i]))
+    return results
+
+
+def check_against_engine(result, expected: list[dict]):
+    """Assert the batch output equals the scalar results row for row."""
+    for col in ("total_pengeluaran", "pengeluaran_perkapita", "rasio", "status"):
+        got = result[col].iloc[: len(expected)].tolist()
+        want = [e[col] for e in expected]
+        assert got == want, f"mismatch in {col}"
+
+
+def bench_workers(args, rumah_tangga, nilai, rentang, jumlah_anggota, kode_wilayah):
+    """
+    Time the batch_cli CSV pipeline (read, classify, format) serially and on
+    the process pool, where workers read their own byte ranges. Parent CPU
+    time is reported separately: it is the serial part that bounds scaling,
+    and wall-clock speedup only shows on a machine with that many cores.
+    """
+    import functools
+    import tempfile
+
+    from batch_cli import _classify_serial, _siapkan_output, parallel_tasks
+
+    df = pd.DataFrame({
+        "id_rt": rumah_tangga,
+        "kode_wilayah": np.repeat(kode_wilayah, args.lines),
+        "jumlah_anggota": np.repeat(jumlah_anggota, args.lines),
+        "rentang": np.array(RENTANG_OPTIONS)[rentang],
+        "nilai": nilai,
+    })
+    lookup = np.full(10_000, 500_000.0)
+    columns = list(df.columns)
+    finish = functools.partial(_siapkan_output, csv_output=True, agregat=False, bobot=None)
+    chunksize = args.lines * 100_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "input.csv")
+        df.to_csv(path, index=False)
+
+        def timed(hasil):
+            wall, cpu = time.perf_counter(), time.process_time()
+            output = "".join(text for _, (_, text, _) in hasil)
+            return output, time.perf_counter() - wall, time.process_time() - cpu
+
+        serial, serial_s, _ = timed(_classify_serial(path, chunksize, columns, lookup, finish))
+        with ParallelClassifier(lookup, args.workers) as classifier:
+            classifier.classify(df.iloc[: args.lines * 1000])  # warm up the workers
+            tasks = parallel_tasks(path, chunksize, columns, args.workers)
+            parallel, parallel_s, parent_s = timed(classifier.classify_tasks(tasks, finish))
+    assert serial == parallel, "parallel output differs from serial"
+
+    print(f"cores available      : {os.cpu_count()}")
+    print(f"CSV pipeline serial  : {serial_s:.3f} s  →  {args.households / serial_s:,.0f} households/s")
+    print(f"parallel ({args.workers} workers) : {parallel_s:.3f} s  →  {args.households / parallel_s:,.0f} households/s"
+          f"  (speedup {serial_s / parallel_s:.2f}x, parent CPU {parent_s:.3f} s"
+          f" = {parent_s / serial_s:.1%} of serial)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--households", type=int, default=1_000_000)
+    parser.add_argument("--lines", type=int, default=7, help="expense lines per household")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scalar-sample", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, default=0,
+                        help="also time the batch_cli CSV pipeline on a process pool with N workers")
+    args = parser.parse_args()
+
+    garis_ref, rumah_tangga, nilai, rentang, jumlah_anggota, kode_wilayah = make_households(
+        args.households, args.lines
+    )
+    lookup = build_garis_lookup(garis_ref)
+
+    best = float("inf")
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        garis = lookup_garis(kode_wilayah, lookup)
+        result = classify_arrays(rumah_tangga, nilai, rentang, jumlah_anggota, garis)
+        best = min(best, time.perf_counter() - t0)
+
+    sample = min(args.scalar_sample, args.households)
+    t0 = time.perf_counter()
+    expected = run_scalar(garis, nilai, rentang, jumlah_anggota, args.lines, sample)
+    scalar = time.perf_counter() - t0
+    check_against_engine(result, expected)
+
+    print(f"households           : {args.households:,} ({args.households * args.lines:,} expense lines)")
+    print(f"batch (best of {args.repeat})    : {best:.3f} s  →  {args.households / best:,.0f} households/s")
+    print(f"scalar engine sample : {sample:,} households in {scalar:.3f} s  →  {sample / scalar:,.0f} households/s")
+    print("batch output matches scalar engine on sample")
+
+    if args.workers:
+        bench_workers(args, rumah_tangga, nilai, rentang, jumlah_anggota, kode_wilayah)
+
+if __name__ == "__main__":
+    main()
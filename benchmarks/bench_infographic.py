@@ -0,0 +1,102 @@
+"""
+Benchmark: full figure rebuild vs static template + per-render overlay,
+and render time / byte size per export format.
+
+Usage:
+    python benchmarks/bench_infographic.py [--renders 20] [--anggota 4] [--formats png,svg]
+
+Renders a sequence of distinct results (the image cache never hits) with
+``generate_infographic_full`` and ``generate_infographic`` and reports
+per-render latency in three scenarios for the template:
+  rumah tangga baru   members and expenses differ every render (no layer hits)
+  ubah pengeluaran    same members, other expense values (member table cached)
+  ganti wilayah       same household, other wilayah and poverty line
+                      (status box, pie and member table cached)
+The first template render, which draws the static layer, is timed
+separately. Then every format in ``EXPORT_FORMATS`` is rendered and its
+median latency and output size reported.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from engine import klasifikasi_rumah_tangga  # noqa: E402
+from infographic import (  # noqa: E402
+    EXPORT_FORMATS,
+    generate_infographic,
+    generate_infographic_full,
+)
+
+KATEGORI = ["Makanan", "Listrik", "Pendidikan", "Transportasi", "Kesehatan", "Pakaian"]
+
+
+def make_results(i: int, n_anggota: int, anggota_i: int = 0, pengeluaran_i: int | None = None) -> dict:
+    """Household ``i``; ``anggota_i`` / ``pengeluaran_i`` pick the members and expenses separately."""
+    pengeluaran_i = i if pengeluaran_i is None else pengeluaran_i
+    anggota = [
+        {"hubungan": "Kepala Rumah Tangga" if j == 0 else "Anak", "umur": 40 - j * 7 + anggota_i,
+         "pendidikan": "SMA", "pekerjaan": "Petani" if j == 0 else ""}
+        for j in range(n_anggota)
+    ]
+    pengeluaran = [
+        {"kategori": k, "nilai": 100_000 * (j + 1) + 5_000 * pengeluaran_i, "rentang": "Bulanan"}
+        for j, k in enumerate(KATEGORI)
+    ]
+    return klasifikasi_rumah_tangga(anggota, pengeluaran, 600_000 + 1_000 * i, f"Wilayah {i}")
+
+
+def timed(fn, results_list, *args) -> tuple[list[float], list[int]]:
+    times, sizes = [], []
+    for results in results_list:
+        t0 = time.perf_counter()
+        data = fn(results, *args).getvalue()
+        times.append(time.perf_counter() - t0)
+        sizes.append(len(data))
+    return times, sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--renders", type=int, default=20)
+    parser.add_argument("--anggota", type=int, default=4)
+    parser.add_argument("--formats", default=",".join(EXPORT_FORMATS),
+                        help="daftar format dipisah koma")
+    args = parser.parse_args()
+
+    results_list = [make_results(i, args.anggota) for i in range(args.renders + 1)]
+    scenarios = {
+        "rumah tangga baru": [make_results(i, args.anggota, anggota_i=i) for i in range(1, args.renders + 1)],
+        "ubah pengeluaran": results_list[1:],
+        "ganti wilayah": [make_results(i, args.anggota, pengeluaran_i=0) for i in range(1, args.renders + 1)],
+    }
+
+    # Warm fonts and pyplot once so neither side pays it
+    generate_infographic_full(results_list[0])
+
+    full, _ = timed(generate_infographic_full, results_list[1:])
+    first = timed(generate_infographic, results_list[:1])[0][0]
+
+    print(f"{args.renders} render, {args.anggota} anggota")
+    print(f"  full rebuild      : median {statistics.median(full) * 1000:7.1f} ms  "
+          f"min {min(full) * 1000:7.1f} ms")
+    print(f"  template (1st)    : {first * 1000:7.1f} ms  (static layer + overlay)")
+    for name, scenario in scenarios.items():
+        template, _ = timed(generate_infographic, scenario)
+        print(f"  {name:<18}: median {statistics.median(template) * 1000:7.1f} ms  "
+              f"min {min(template) * 1000:7.1f} ms  "
+              f"speedup {statistics.median(full) / statistics.median(template):.1f}x")
+
+    print("per format")
+    for fmt in args.formats.split(","):
+        generate_infographic(results_list[0], fmt)   # builds the template for this dpi
+        times, sizes = timed(generate_infographic, results_list[1:], fmt)
+        print(f"  {fmt:<12}: median {statistics.median(times) * 1000:7.1f} ms  "
+              f"{statistics.median(sizes) / 1024:8.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Micro-benchmark: the previous per-row parser vs ``_parse_api_response`` and
+the vectorized ``parse_datacontent`` it is built on.
+
+Usage:
+    python benchmarks/bench_parse.py [--vars 20] [--years 11] [--repeat 5]
+
+Times the parsers on the bundled ``Garis Kemiskinan.json``, and the
+per-row parser against ``parse_datacontent`` on a synthetic multi-variable,
+multi-year dump built from it. The per-row parser only reads one var/tahun
+combination per call, so it is called once per combination there.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from data_loader import (  # noqa: E402
+    LOCAL_JSON_PATH,
+    _parse_api_response,
+    parse_datacontent,
+)
+
+
+def make_dump(base: dict, n_vars: int, n_years: int) -> dict:
+    """Replicate the bundled dump across ``n_vars`` variables and ``n_years`` years."""
+    var0 = base["var"][0]["val"]
+    tahun0 = base["tahun"][0]["val"]
+    variables = [{**base["var"][0], "val": var0 + i} for i in range(n_vars)]
+    years = [{"val": tahun0 - i, "label": str(tahun0 - i + 1900)} for i in range(n_years)]
+    datacontent = {}
+    for region in base["vervar"]:
+        for var in variables:
+            for tahun in years:
+                key = f"{region['val']}{var['val']}0{tahun['val']}0"
+                datacontent[key] = 500_000 + region["val"] + tahun["val"]
+    return {**base, "var": variables, "tahun": years, "datacontent": datacontent}
+
+
+def best_of(repeat: int, fn, *args) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def parse_per_row(api_data: dict) -> pd.DataFrame:
+    """The previous ``_parse_api_response``: one dict lookup per vervar row."""
+    suffix = "".join(str(api_data[field][0]["val"]) for field in ("var", "turvar", "tahun", "turtahun"))
+    datacontent = api_data["datacontent"]
+    rows = []
+    for region in api_data["vervar"]:
+        label = region["label"]
+        if label.startswith("<b>"):
+            continue
+        key = str(region["val"]) + suffix
+        if key in datacontent:
+            rows.append({"kode_wilayah": int(region["val"]), "nama_wilayah": label,
+                         "garis_kemiskinan": datacontent[key]})
+    return pd.DataFrame(rows)
+
+
+def per_combination(parse):
+    """Parse every var/tahun combination of a dump with a single-combination parser."""
+    def run(dump: dict):
+        for var in dump["var"]:
+            for tahun in dump["tahun"]:
+                parse({**dump, "var": [var], "tahun": [tahun]})
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vars", type=int, default=20)
+    parser.add_argument("--years", type=int, default=11)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with open(LOCAL_JSON_PATH, "r", encoding="utf-8-sig") as f:
+        base = json.load(f)
+    dump = make_dump(base, args.vars, args.years)
+
+    cells = len(base["datacontent"])
+    t_row = best_of(args.repeat, parse_per_row, base)
+    print(f"Garis Kemiskinan.json ({cells:,} cells)")
+    print(f"  per-row (sebelumnya): {t_row * 1000:9.2f} ms  ({cells / t_row:,.0f} cells/s)")
+    for label, fn in (("_parse_api_response ", _parse_api_response), ("parse_datacontent   ", parse_datacontent)):
+        t = best_of(args.repeat, fn, base)
+        print(f"  {label}: {t * 1000:9.2f} ms  ({cells / t:,.0f} cells/s)  speedup {t_row / t:.1f}x")
+
+    # Every combination of the synthetic dump: per-row once per combination, vectorized in one call
+    cells = len(dump["datacontent"])
+    t_row = best_of(args.repeat, per_combination(parse_per_row), dump)
+    t_bulk = best_of(args.repeat, parse_datacontent, dump)
+    print(f"synthetic {args.vars} var × {args.years} tahun ({cells:,} cells)")
+    print(f"  per-row (sebelumnya): {t_row * 1000:9.2f} ms  ({cells / t_row:,.0f} cells/s)")
+    print(f"  parse_datacontent   : {t_bulk * 1000:9.2f} ms  ({cells / t_bulk:,.0f} cells/s)"
+          f"  speedup {t_row / t_bulk:.1f}x")
+
+if __name__ == "__main__":
+    main()
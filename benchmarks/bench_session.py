@@ -0,0 +1,143 @@
+"""
+Per-session footprint of the stored result, and per-rerun table cost.
+
+Usage:
+    python benchmarks/bench_session.py [--sessions 2000] [--anggota 4] [--pengeluaran 8]
+
+Memory: builds the result of ``--sessions`` households the way a form
+submission does (fresh input dicts each time), keeps only what the session
+would keep and reports the retained bytes per session with tracemalloc:
+  dict       ``klasifikasi_rumah_tangga`` results dict (previous session state)
+  compact    ``HasilKlasifikasi`` (slots, array-backed rows, no formatted strings)
+Rerun: time to produce the expense display table on a rerun, rebuilding it
+with DataFrame.apply (previous app code) vs ``HasilKlasifikasi.tabel_pengeluaran``,
+which formats the table once with the vectorized ``engine.rincian_bulanan``
+and then serves reruns (and sessions with the same rows) from a shared
+cache; the first render (cache miss) is timed too, as is one submission.
+Use ``--pengeluaran 500`` for large households.
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import engine  # noqa: E402
+from engine import (  # noqa: E402
+    KOLOM_TABEL_PENGELUARAN,
+    RENTANG_OPTIONS,
+    HasilKlasifikasi,
+    format_currency,
+    klasifikasi_rumah_tangga,
+)
+
+
+def form_input(rng: random.Random, n_anggota: int, n_pengeluaran: int):
+    anggota = [
+        {"hubungan": "Anak", "umur": rng.randint(1, 80), "pendidikan": "SMA/Sederajat",
+         "pekerjaan": f"Pekerjaan {rng.randint(0, 99)}"}
+        for _ in range(n_anggota)
+    ]
+    pengeluaran = [
+        {"rentang": rng.choice(RENTANG_OPTIONS), "kategori": f"Kategori {j}",
+         "nilai": rng.randint(1, 200) * 5_000}
+        for j in range(n_pengeluaran)
+    ]
+    return anggota, pengeluaran
+
+
+def dict_result(anggota, pengeluaran):
+    results = klasifikasi_rumah_tangga(anggota, pengeluaran, 600_000, "Kota Banda Aceh")
+    results["tahun"] = 2025
+    return results
+
+
+def compact_result(anggota, pengeluaran):
+    return HasilKlasifikasi.dari_input(anggota, pengeluaran, 600_000, "Kota Banda Aceh", 2025)
+
+
+def retained_bytes(build, args) -> float:
+    rng = random.Random(0)
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    sessions = [build(*form_input(rng, args.anggota, args.pengeluaran)) for _ in range(args.sessions)]
+    gc.collect()
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del sessions
+    return retained / args.sessions
+
+
+def table_from_dict(results) -> pd.DataFrame:
+    """The expense table as the app built it on every rerun before the compact result."""
+    df = pd.DataFrame(results["pengeluaran_data"])
+    df = df[df["nilai"] > 0]
+    df["nilai_bulanan"] = df.apply(
+        lambda row: row["nilai"] * 30 / 7 if row["rentang"] == "Mingguan" else
+                   (row["nilai"] / 12 if row["rentang"] == "Tahunan" else row["nilai"]),
+        axis=1,
+    )
+    # stable sort: ties keep input order, as in the compact table
+    df = df.sort_values("nilai_bulanan", ascending=False, kind="stable").reset_index(drop=True)
+    total = results["total_pengeluaran"]
+    df["persentase"] = df["nilai_bulanan"].apply(lambda x: f"{(x / total * 100):.1f}%" if total > 0 else "0.0%")
+    df["nilai_fmt"] = df["nilai"].apply(lambda x: f"Rp {format_currency(x)}")
+    df["nilai_bulanan_fmt"] = df["nilai_bulanan"].apply(lambda x: f"Rp {format_currency(x)}")
+    out = df[["rentang", "kategori", "persentase", "nilai_bulanan_fmt"]].copy()
+    out.columns = ["Rentang", "Kategori", "Persentase", "Nilai Bulanan"]
+    return out
+
+
+def table_from_compact(hasil) -> pd.DataFrame:
+    tabel = hasil.tabel_pengeluaran
+    labels = ["Rentang", "Kategori", "Persentase", "Nilai Bulanan"]
+    return pd.DataFrame({label: tabel[KOLOM_TABEL_PENGELUARAN[label]] for label in labels})
+
+
+def table_first_render(hasil) -> pd.DataFrame:
+    engine._tabel_bersama.cache_clear()
+    return table_from_compact(hasil)
+
+
+def per_call(fn, arg, repeat: int = 200) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn(arg)
+    return (time.perf_counter() - t0) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--anggota", type=int, default=4)
+    parser.add_argument("--pengeluaran", type=int, default=8)
+    args = parser.parse_args()
+
+    mem_dict = retained_bytes(dict_result, args)
+    mem_compact = retained_bytes(compact_result, args)
+    print(f"{args.sessions} sesi, {args.anggota} anggota, {args.pengeluaran} pengeluaran")
+    print(f"  memori per sesi  dict    : {mem_dict:8,.0f} B")
+    print(f"  memori per sesi  compact : {mem_compact:8,.0f} B  ({mem_compact / mem_dict:.0%})")
+
+    anggota, pengeluaran = form_input(random.Random(1), args.anggota, args.pengeluaran)
+    old = dict_result(anggota, pengeluaran)
+    new = compact_result(anggota, pengeluaran)
+    assert table_from_dict(old).equals(table_from_compact(new)), "tabel berbeda"
+    t_old, t_new = per_call(table_from_dict, old), per_call(table_from_compact, new)
+    t_first = per_call(table_first_render, new)
+    print(f"  tabel per rerun  dict    : {t_old * 1000:8.3f} ms")
+    print(f"  tabel per rerun  compact : {t_new * 1000:8.3f} ms  (speedup {t_old / t_new:.0f}x)")
+    print(f"  tabel render pertama     : {t_first * 1000:8.3f} ms  (cache miss)")
+    t_submit = per_call(lambda p: HasilKlasifikasi.dari_input(anggota, p, 600_000), pengeluaran)
+    print(f"  hasil per submit compact : {t_submit * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Cold-start benchmark: module import time, first paint of the app, first infographic.
+
+Usage:
+    python benchmarks/bench_startup.py [--repeat 5]
+
+Every measurement runs in a fresh interpreter so nothing is cached in
+``sys.modules``:
+  import          importing engine, data_loader, infographic and render_pool
+  first paint     ``AppTest.from_file("app.py").run()`` (Streamlit itself pre-imported)
+  infographic     first ``generate_infographic`` after that run, which loads
+                  the plotting stack and draws the template
+The poverty-line cache is seeded once into a temporary directory, so no
+run touches the network.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+IMPORT_SCRIPT = """
+import json, sys, time
+t0 = time.perf_counter()
+import engine, data_loader, infographic, render_pool
+print(json.dumps({"import": time.perf_counter() - t0, "matplotlib": "matplotlib" in sys.modules}))
+"""
+
+APP_SCRIPT = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+t0 = time.perf_counter()
+at = AppTest.from_file("app.py", default_timeout=120)
+at.run()
+first_paint = time.perf_counter() - t0
+assert not at.exception, at.exception
+matplotlib = "matplotlib" in sys.modules
+from engine import klasifikasi_rumah_tangga
+from infographic import generate_infographic
+results = klasifikasi_rumah_tangga(
+    [{"hubungan": "Kepala Rumah Tangga", "umur": 40, "pendidikan": "SMA", "pekerjaan": ""}],
+    [{"rentang": "Bulanan", "kategori": "Makanan", "nilai": 900000}],
+    600000, "Wilayah",
+)
+t0 = time.perf_counter()
+generate_infographic(results)
+print(json.dumps({"first_paint": first_paint, "matplotlib": matplotlib,
+                  "infographic": time.perf_counter() - t0}))
+"""
+
+
+def run(script: str, env: dict) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", script], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    env = {**os.environ, "GK_CACHE_DIR": tempfile.mkdtemp(prefix="gk-bench-"), "BPS_API_KEY": ""}
+    run(IMPORT_SCRIPT, env)   # seeds the cache directory and the OS page cache
+
+    imports = [run(IMPORT_SCRIPT, env) for _ in range(args.repeat)]
+    apps = [run(APP_SCRIPT, env) for _ in range(args.repeat)]
+
+    def ms(rows, key):
+        return f"median {statistics.median(r[key] for r in rows) * 1000:7.1f} ms"
+
+    print(f"import modules : {ms(imports, 'import')}  matplotlib loaded: {imports[0]['matplotlib']}")
+    print(f"first paint    : {ms(apps, 'first_paint')}  matplotlib loaded: {apps[0]['matplotlib']}")
+    print(f"1st infographic: {ms(apps, 'infographic')}")
+
+
+if __name__ == "__main__":
+    main()
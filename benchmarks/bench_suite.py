@@ -0,0 +1,219 @@
+"""
+Reproducible benchmark suite: loading, classification, table building and rendering.
+
+Usage:
+    python benchmarks/bench_suite.py [--sizes 1x7,4x8,8x50,20x500] [--formats png]
+                                     [--repeat 7] [--output hasil.json]
+                                     [--compare baseline.json] [--threshold 0.15]
+
+Runs fully offline on synthetic households (``AxP``: A anggota, P expense
+lines, seeded) and the bundled ``Garis Kemiskinan.json``:
+  load.parse_api_response        ``_parse_api_response`` on the bundled dump
+  klasifikasi.scalar[AxP]        ``klasifikasi_rumah_tangga`` (scalar path)
+  klasifikasi.hasil[AxP]         ``HasilKlasifikasi.dari_input`` (full recompute)
+  klasifikasi.inkremental[AxP]   ``ModelRumahTangga``: one row edited, then ``status``
+  klasifikasi.ubah[AxP]          ``ModelRumahTangga``: one row edited, then ``hasil``
+  klasifikasi.garis[AxP]         ``ModelRumahTangga``: poverty line switched, then ``hasil``
+  tabel.rincian[AxP]             Rincian Pengeluaran table as the app shows it
+  infographic.<format>[AxP]      ``generate_infographic`` after warm-up
+Every benchmark reports the min and median of ``--repeat`` samples; each
+sample loops the call until it takes at least ``--min-time`` seconds.
+``--output`` writes the results as JSON. ``--compare`` loads a saved JSON,
+prints the ratio per benchmark and exits with status 1 when a median is
+more than ``--threshold`` slower than the baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+# Offline: no BPS API key, no metrics endpoint
+os.environ["BPS_API_KEY"] = ""
+os.environ.pop("GK_METRICS", None)
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from data_loader import LOCAL_JSON_PATH, _parse_api_response  # noqa: E402
+from engine import (  # noqa: E402
+    KOLOM_TABEL_PENGELUARAN,
+    RENTANG_OPTIONS,
+    HasilKlasifikasi,
+    ModelRumahTangga,
+    _tabel_pengeluaran,
+    klasifikasi_rumah_tangga,
+)
+
+SEED = 20250101
+GARIS_KEMISKINAN = 600_000
+KATEGORI = ["Makanan", "Listrik", "Pendidikan", "Transportasi", "Kesehatan", "Pakaian", "Sewa", "Pulsa"]
+
+
+def make_household(n_anggota: int, n_pengeluaran: int, seed: int = SEED) -> tuple[list[dict], list[dict]]:
+    """Synthetic form input; the same sizes and seed always give the same household."""
+    rng = random.Random(f"{seed}-{n_anggota}-{n_pengeluaran}")
+    anggota = [
+        {"hubungan": "Saya" if j == 0 else "Anak", "umur": rng.randint(1, 80),
+         "pendidikan": "SMA/Sederajat", "pekerjaan": "Petani" if j == 0 else ""}
+        for j in range(n_anggota)
+    ]
+    pengeluaran = [
+        {"rentang": rng.choice(RENTANG_OPTIONS), "kategori": f"{KATEGORI[j % len(KATEGORI)]} {j}",
+         "nilai": rng.randint(0, 400) * 5_000}
+        for j in range(n_pengeluaran)
+    ]
+    return anggota, pengeluaran
+
+
+def tabel_rincian(hasil: HasilKlasifikasi) -> pd.DataFrame:
+    """The Rincian Pengeluaran table with every column toggled on, formatted from the stored rows."""
+    tabel = _tabel_pengeluaran(hasil.rentang, hasil.kategori, hasil.nilai, hasil.total_pengeluaran)
+    return pd.DataFrame({label: tabel[field] for label, field in KOLOM_TABEL_PENGELUARAN.items()})
+
+
+def measure(fn, repeat: int, min_time: float) -> dict:
+    """Min/median seconds per call over ``repeat`` samples of ``loops`` calls each."""
+    loops = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= min_time or loops >= 1_000_000:
+            break
+        loops *= 10 if elapsed < min_time / 10 else 2
+    samples = [elapsed / loops]
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        samples.append((time.perf_counter() - t0) / loops)
+    return {"min_s": min(samples), "median_s": statistics.median(samples), "loops": loops, "repeat": repeat}
+
+
+def parse_sizes(spec: str) -> list[tuple[int, int]]:
+    sizes = []
+    for part in spec.split(","):
+        anggota, _, pengeluaran = part.strip().lower().partition("x")
+        sizes.append((int(anggota), int(pengeluaran)))
+    return sizes
+
+
+def run(args) -> dict:
+    benchmarks = {}
+
+    def bench(name: str, fn):
+        benchmarks[name] = measure(fn, args.repeat, args.min_time)
+        print(f"  {name:<40} {benchmarks[name]['median_s'] * 1000:10.3f} ms", flush=True)
+
+    with open(LOCAL_JSON_PATH, "r", encoding="utf-8-sig") as f:
+        dump = json.load(f)
+    bench("load.parse_api_response", lambda: _parse_api_response(dump))
+
+    formats = [fmt for fmt in args.formats.split(",") if fmt]
+    if formats:
+        from infographic import generate_infographic, warm_up
+        warm_up()
+
+    for n_anggota, n_pengeluaran in parse_sizes(args.sizes):
+        case = f"{n_anggota}x{n_pengeluaran}"
+        anggota, pengeluaran = make_household(n_anggota, n_pengeluaran)
+        hasil = HasilKlasifikasi.dari_input(anggota, pengeluaran, GARIS_KEMISKINAN, "Kota Banda Aceh", 2025)
+        bench(f"klasifikasi.scalar[{case}]",
+              lambda: klasifikasi_rumah_tangga(anggota, pengeluaran, GARIS_KEMISKINAN, "Kota Banda Aceh"))
+        bench(f"klasifikasi.hasil[{case}]",
+              lambda: HasilKlasifikasi.dari_input(anggota, pengeluaran, GARIS_KEMISKINAN, "Kota Banda Aceh", 2025))
+        model = ModelRumahTangga(GARIS_KEMISKINAN)
+        model.sinkronkan(pengeluaran)
+        model.set_anggota(anggota)
+        edit = iter(range(1 << 62))
+
+        def ubah_baris():
+            j = next(edit)
+            p = pengeluaran[j % n_pengeluaran]
+            model.set_baris(j % n_pengeluaran, p["rentang"], p["kategori"], p["nilai"] + 5_000 * (j // n_pengeluaran & 1))
+            return model.status()
+
+        def ubah_hasil():
+            ubah_baris()
+            return model.hasil("Kota Banda Aceh", 2025)
+
+        def ganti_garis():
+            model.set_garis(GARIS_KEMISKINAN + 1_000 * (next(edit) & 1))
+            return model.hasil("Kota Banda Aceh", 2025)
+
+        bench(f"klasifikasi.inkremental[{case}]", ubah_baris)
+        bench(f"klasifikasi.ubah[{case}]", ubah_hasil)
+        bench(f"klasifikasi.garis[{case}]", ganti_garis)
+        bench(f"tabel.rincian[{case}]", lambda: tabel_rincian(hasil))
+        results = hasil.to_dict()
+        for fmt in formats:
+            bench(f"infographic.{fmt}[{case}]", lambda: generate_infographic(results, fmt))
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "seed": SEED,
+            "sizes": args.sizes,
+            "formats": args.formats,
+        },
+        "benchmarks": benchmarks,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Print current vs baseline medians; return the names that regressed."""
+    regressions = []
+    print(f"\nvs baseline {baseline['meta'].get('timestamp', '?')} (ambang +{threshold:.0%})")
+    for name, hasil in current["benchmarks"].items():
+        lama = baseline["benchmarks"].get(name)
+        if lama is None:
+            print(f"  {name:<40} {'baru':>10}")
+            continue
+        rasio = hasil["median_s"] / lama["median_s"]
+        tanda = ""
+        if rasio > 1 + threshold:
+            tanda = "  REGRESI"
+            regressions.append(name)
+        print(f"  {name:<40} {rasio:9.2f}x{tanda}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", default="1x7,4x8,8x50,20x500",
+                        help="ukuran rumah tangga anggota x baris pengeluaran, dipisah koma")
+    parser.add_argument("--formats", default="png", help="format infographic, dipisah koma (kosong: lewati)")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.05, help="detik minimum per sampel")
+    parser.add_argument("--output", help="tulis hasil ke file JSON")
+    parser.add_argument("--compare", help="file JSON baseline hasil --output sebelumnya")
+    parser.add_argument("--threshold", type=float, default=0.15, help="batas perlambatan median, mis. 0.15 = 15%%")
+    args = parser.parse_args()
+
+    print("benchmark (median per panggilan)")
+    current = run(args)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"\nhasil ditulis ke {args.output}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(current, baseline, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
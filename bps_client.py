@@ -0,0 +1,265 @@
+"""
+Async BPS Web API client.
+
+Fetches several (var, tahun) tables concurrently over one pooled HTTP
+session, retries transient failures with exponential backoff, and stops
+calling the API through a circuit breaker after repeated failures so
+callers fall back to the cache or the local JSON immediately. Every call is
+timed for latency metrics.
+
+The event loop drives the calls; each HTTP request runs on a bounded thread
+pool around a shared ``requests.Session``, so no async HTTP library is needed.
+"""
+import asyncio
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying; other 4xx responses fail at once
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class CircuitOpen(RuntimeError):
+    """Raised instead of calling the API while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Opens after ``failure_threshold`` consecutive calls that failed with a
+    network error, timeout or retryable HTTP status. While open,
+    calls are rejected until ``reset_timeout`` has passed; then one trial
+    call is let through (half-open) and its outcome closes or re-opens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+
+class LatencyStats:
+    """Latency and outcome of the most recent ``window`` calls."""
+
+    def __init__(self, window: int = 1000):
+        self._calls = deque(maxlen=window)   # (latency s, attempts, ok)
+        self._lock = threading.Lock()
+        self.total = 0
+        self.errors = 0
+
+    def record(self, latency: float, attempts: int, ok: bool):
+        with self._lock:
+            self._calls.append((latency, attempts, ok))
+            self.total += 1
+            self.errors += not ok
+
+    def summary(self) -> dict:
+        with self._lock:
+            calls = list(self._calls)
+        latencies = sorted(c[0] for c in calls)
+
+        def pct(q):
+            return latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000 if latencies else None
+
+        return {
+            "calls": self.total,
+            "errors": self.errors,
+            "retries": sum(c[1] - 1 for c in calls),
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "max_ms": latencies[-1] * 1000 if latencies else None,
+        }
+
+
+class BpsClient:
+    """
+    Pooled, retrying BPS API client.
+
+    ``fetch`` and ``fetch_many`` are coroutines; ``get`` is a blocking
+    wrapper for synchronous callers. A fetch returns ``(api_data, etag)``,
+    or ``(None, etag)`` when the server answers 304 to ``If-None-Match``.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        max_connections: int = 8,
+        timeout: float = 10.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        backoff_max: float = 8.0,
+        breaker: CircuitBreaker | None = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.stats = LatencyStats()
+        self.max_connections = max_connections
+        # requests is imported here, not at module level: processes that only
+        # serve the cached table never pay for it
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix="bps-http")
+
+    def url(self, var: int, tahun: int) -> str:
+        return f"{self.base_url}/var/{var}/th/{tahun}/key/{self.api_key}"
+
+    def _delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter for retry number ``attempt`` (0-based)."""
+        return min(self.backoff_max, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+    def _request(self, var: int, tahun: int, etag: str | None) -> tuple[dict | None, str | None]:
+        """One blocking HTTP attempt. Raises on network, HTTP or API-status errors."""
+        headers = {"If-None-Match": etag} if etag else {}
+        resp = self._session.get(self.url(var, tahun), headers=headers, timeout=self.timeout)
+        if resp.status_code == 304:
+            return None, etag
+        resp.raise_for_status()
+        api_data = resp.json()
+        if api_data.get("status") != "OK":
+            raise RuntimeError(f"API status: {api_data.get('status')}")
+        return api_data, resp.headers.get("ETag")
+
+    @staticmethod
+    def _retryable(error: Exception) -> bool:
+        import requests
+
+        if isinstance(error, requests.HTTPError):
+            return error.response is not None and error.response.status_code in RETRY_STATUS
+        return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+    def _reject(self) -> CircuitOpen:
+        metrics.inc("gk_bps_requests_total", outcome="circuit_open")
+        return CircuitOpen(f"API BPS dilewati setelah {self.breaker.failures} kegagalan beruntun")
+
+    async def _fetch(self, var: int, tahun: int, etag: str | None) -> tuple[dict | None, str | None]:
+        """Fetch one table with retries, timed; the caller records the outcome on the breaker."""
+        loop = asyncio.get_running_loop()
+        t0 = time.perf_counter()
+        attempt = 0
+        while True:
+            try:
+                result = await loop.run_in_executor(self._executor, self._request, var, tahun, etag)
+            except Exception as e:
+                if attempt < self.retries and self._retryable(e):
+                    metrics.inc("gk_bps_retries_total")
+                    await asyncio.sleep(self._delay(attempt))
+                    attempt += 1
+                    continue
+                latency = time.perf_counter() - t0
+                self.stats.record(latency, attempt + 1, ok=False)
+                metrics.inc("gk_bps_requests_total", outcome="error")
+                metrics.observe("gk_bps_request_seconds", latency)
+                logger.warning("BPS var %s th %s gagal setelah %d percobaan (%.0f ms): %s",
+                               var, tahun, attempt + 1, latency * 1000, e)
+                raise
+            latency = time.perf_counter() - t0
+            self.stats.record(latency, attempt + 1, ok=True)
+            metrics.inc("gk_bps_requests_total", outcome="ok")
+            metrics.observe("gk_bps_request_seconds", latency)
+            logger.debug("BPS var %s th %s: %.0f ms, %d percobaan", var, tahun, latency * 1000, attempt + 1)
+            return result
+
+    async def fetch(self, var: int, tahun: int, etag: str | None = None) -> tuple[dict | None, str | None]:
+        """Fetch one table, retrying transient errors. Raises CircuitOpen without calling the API."""
+        if not self.api_key:
+            raise RuntimeError("API key tidak ditemukan di .env")
+        if not self.breaker.allow():
+            raise self._reject()
+        try:
+            result = await self._fetch(var, tahun, etag)
+        except Exception as e:
+            if self._retryable(e):
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()   # the API answered; the request itself was bad
+            raise
+        self.breaker.record_success()
+        return result
+
+    async def fetch_many(self, keys: list[tuple[int, int, str | None]]) -> list:
+        """
+        Fetch every (var, tahun, etag) concurrently, at most ``max_connections``
+        at a time. Returns results in input order, with the exception in
+        place of a failed fetch.
+
+        The batch counts as one call for the circuit breaker: it is let
+        through (or rejected) as a whole, and records one failure when any
+        fetch failed transiently, so a succeeding key cannot reset the
+        failures of the others.
+        """
+        if not self.api_key:
+            return [RuntimeError("API key tidak ditemukan di .env") for _ in keys]
+        if not self.breaker.allow():
+            return [self._reject() for _ in keys]
+        results = await asyncio.gather(*(self._fetch(*key) for key in keys), return_exceptions=True)
+        if any(isinstance(r, Exception) and self._retryable(r) for r in results):
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return results
+
+    def get(self, var: int, tahun: int, etag: str | None = None) -> tuple[dict | None, str | None]:
+        """Blocking ``fetch`` for callers without an event loop."""
+        return asyncio.run(self.fetch(var, tahun, etag))
+
+    def get_many(self, keys: list[tuple[int, int, str | None]]) -> list:
+        """Blocking ``fetch_many`` for callers without an event loop."""
+        return asyncio.run(self.fetch_many(keys))
+
+    def metrics(self) -> dict:
+        return {**self.stats.summary(), "circuit": self.breaker.state}
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        self._session.close()
@@ -0,0 +1,706 @@
+"""
+Poverty-line data loading (BPS API with local JSON fallback).
+
+Kept free of Streamlit so the CLI and batch jobs can share the exact same
+loader as the app; ``app.py`` reads the tables from the snapshot of one
+``PovertyLineRefresher`` per process (held with ``st.cache_resource``).
+
+The parsed table is persisted in an on-disk cache shared by every process on
+the host. ``load_data`` serves it immediately and revalidates it against the
+API in a background thread once it is older than ``CACHE_MAX_AGE``.
+"""
+import itertools
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from typing import NamedTuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, atomic replace still applies
+    fcntl = None
+
+import numpy as np
+import pandas as pd
+from dotenv import load_dotenv
+
+import metrics
+from bps_client import BpsClient, CircuitBreaker
+from garis_tahunan import TAHUN_OFFSET, GarisKemiskinanTahunan
+
+# Load environment variables
+load_dotenv()
+
+BPS_API_KEY = os.getenv("BPS_API_KEY", "")
+
+BPS_VAR = 624     # Garis Kemiskinan Menurut Kabupaten/Kota
+BPS_TAHUN = 125   # kode tahun BPS (125 → 2025), tahun default aplikasi
+
+
+def _parse_tahun_list(spec: str) -> list[int]:
+    """Parse "2015-2025" or "2023,2024,2025" into BPS year codes."""
+    tahun = set()
+    for part in spec.split(","):
+        awal, _, akhir = part.strip().partition("-")
+        tahun.update(range(int(awal), int(akhir or awal) + 1))
+    return sorted(t - TAHUN_OFFSET for t in tahun)
+
+
+# Years kept in the multi-year store (always includes BPS_TAHUN)
+BPS_TAHUN_LIST = sorted(set(_parse_tahun_list(os.getenv("GK_TAHUN", "2015-2025"))) | {BPS_TAHUN})
+
+BPS_API_BASE = os.getenv(
+    "GK_BPS_API_BASE", "https://webapi.bps.go.id/v1/api/list/model/data/lang/ind/domain/0000"
+)
+BPS_MAX_CONNECTIONS = int(os.getenv("GK_BPS_MAX_CONNECTIONS", "8"))
+BPS_RETRIES = int(os.getenv("GK_BPS_RETRIES", "3"))
+BPS_BREAKER_FAILURES = int(os.getenv("GK_BPS_BREAKER_FAILURES", "5"))    # failed calls before the circuit opens
+BPS_BREAKER_RESET = float(os.getenv("GK_BPS_BREAKER_RESET", "300"))     # seconds before a trial call
+
+
+def _api_url(var: int = BPS_VAR, tahun: int = BPS_TAHUN) -> str:
+    return f"{BPS_API_BASE}/var/{var}/th/{tahun}"
+
+
+BPS_API_URL = _api_url()
+
+_BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LOCAL_JSON_PATH = os.path.join(_BASE_DIR, "Garis Kemiskinan.json")
+
+# Persistent cache of the parsed table, shared by all replicas on the host
+CACHE_DIR = os.getenv("GK_CACHE_DIR") or os.path.join(_BASE_DIR, ".cache")
+CACHE_MAX_AGE = int(os.getenv("GK_CACHE_MAX_AGE", "3600"))  # seconds between revalidations
+GARIS_TAHUNAN_PATH = os.path.join(CACHE_DIR, f"garis_kemiskinan_var{BPS_VAR}_tahunan.npy")
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_api_response(api_data: dict) -> pd.DataFrame:
+    """Parse raw BPS API JSON into DataFrame with kode_wilayah, nama_wilayah & garis_kemiskinan."""
+    # Kabupaten/kota only: provinsi headers are wrapped in <b>...</b>
+    return _garis_per_wilayah(api_data, provinsi=False)
+
+
+def parse_provinsi(api_data: dict) -> pd.DataFrame:
+    """
+    Provinsi header rows that ``_parse_api_response`` skips: kode_wilayah
+    (e.g. 1100), nama_wilayah without the <b> tags, and garis_kemiskinan
+    (NaN when the dump has no value for the provinsi).
+    """
+    df = _garis_per_wilayah(api_data, provinsi=True)
+    df["nama_wilayah"] = df["nama_wilayah"].str.removeprefix("<b>").str.removesuffix("</b>").str.strip()
+    return df
+
+
+def _garis_per_wilayah(api_data: dict, provinsi: bool) -> pd.DataFrame:
+    """
+    The provinsi or kabupaten/kota rows of ``vervar`` in dump order, with
+    the value of the dump's first var/turvar/tahun/turtahun combination.
+    Provinsi without a ``datacontent`` cell get NaN; kabupaten/kota without
+    one are left out.
+    """
+    columns, nilai = _datacontent_columns(api_data)
+    pilih = np.ones(len(nilai), dtype=bool)
+    for field in DATACONTENT_FIELDS[1:]:
+        pilih &= columns[field] == int(api_data[field][0]["val"])
+    kode_sel = columns["kode_wilayah"][pilih]
+    nilai_sel = nilai[pilih]
+
+    regions = [r for r in api_data["vervar"] if str(r["label"]).startswith("<b>") == provinsi]
+    kode = np.fromiter((r["val"] for r in regions), dtype=np.int64, count=len(regions))
+    urut = np.argsort(kode_sel)
+    posisi = np.searchsorted(kode_sel, kode, sorter=urut).clip(max=max(len(urut) - 1, 0))
+    ada = (kode_sel[urut[posisi]] == kode) if len(urut) else np.zeros(len(kode), dtype=bool)
+    nama = [r["label"] for r in regions]
+    if ada.all():
+        garis = nilai_sel[urut[posisi]]
+    elif provinsi:
+        garis = np.full(len(kode), np.nan)
+        garis[ada] = nilai_sel[urut[posisi[ada]]]
+    else:
+        kode, posisi = kode[ada], posisi[ada]
+        nama = [n for n, a in zip(nama, ada.tolist()) if a]
+        garis = nilai_sel[urut[posisi]]
+    return pd.DataFrame({"kode_wilayah": kode, "nama_wilayah": nama, "garis_kemiskinan": garis})
+
+
+def load_nama_wilayah() -> dict[int, str]:
+    """Kabupaten/kota and provinsi names by region code, from the bundled local JSON."""
+    try:
+        with open(LOCAL_JSON_PATH, "r", encoding="utf-8-sig") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not (isinstance(data, dict) and "vervar" in data and "datacontent" in data):
+        return {}
+    tables = pd.concat([_parse_api_response(data), parse_provinsi(data)], ignore_index=True)
+    return dict(zip(tables["kode_wilayah"].tolist(), tables["nama_wilayah"].tolist()))
+
+
+DATACONTENT_FIELDS = ["kode_wilayah", "var", "turvar", "tahun", "turtahun"]
+
+
+def parse_datacontent(api_data: dict) -> pd.DataFrame:
+    """
+    Decode every ``datacontent`` cell of a BPS dump in one vectorized step.
+
+    Keys are the concatenation {vervar}{var}{turvar}{tahun}{turtahun}. When
+    each component has a fixed digit width (as in BPS metadata) the keys are
+    parsed once to int64 and split with integer division; otherwise the keys
+    are matched against the metadata combinations one suffix at a time.
+    Returns typed columns kode_wilayah, var, turvar, tahun (BPS year code),
+    turtahun and nilai, including provinsi rows. ``nilai`` is int64 when
+    every value is an integer and float64 otherwise, as pandas infers it.
+    """
+    columns, nilai = _datacontent_columns(api_data)
+    df = pd.DataFrame({field: columns[field].astype(np.int32) for field in DATACONTENT_FIELDS})
+    df["nilai"] = nilai
+    return df
+
+
+def _datacontent_columns(api_data: dict) -> tuple[dict[str, np.ndarray], np.ndarray]:
+    """Key components (int64 arrays by field) and values of ``datacontent``, unwrapped."""
+    datacontent = api_data["datacontent"]
+    n = len(datacontent)
+    nilai = np.array(list(datacontent.values()))
+    if nilai.dtype.kind not in "iu":
+        nilai = nilai.astype(np.float64)
+    metadata = [api_data[field] for field in ("vervar", "var", "turvar", "tahun", "turtahun")]
+    widths = [{len(str(item["val"])) for item in items} for items in metadata]
+    fixed = all(len(w) == 1 for w in widths)
+    widths = [max(w) for w in widths]
+
+    if fixed and sum(widths) <= 18:
+        keys = np.fromiter(map(int, datacontent), dtype=np.int64, count=n)
+        columns = {}
+        for field, width in zip(reversed(DATACONTENT_FIELDS), reversed(widths)):
+            keys, columns[field] = np.divmod(keys, 10 ** width)
+        if (keys != 0).any():
+            raise ValueError("Kunci datacontent tidak sesuai dengan metadata")
+    else:
+        columns = _split_keys_by_suffix(list(datacontent), metadata)
+    return columns, nilai
+
+
+def _split_keys_by_suffix(keys: list[str], metadata: list[list[dict]]) -> dict[str, np.ndarray]:
+    """Slow path for variable-width key components: match each metadata suffix."""
+    key_arr = np.array(keys, dtype=np.str_)
+    columns = {field: np.full(len(keys), -1, dtype=np.int64) for field in DATACONTENT_FIELDS}
+    vervar, var, turvar, tahun, turtahun = metadata
+    for v, tv, th, tt in itertools.product(var, turvar, tahun, turtahun):
+        suffix = f"{v['val']}{tv['val']}{th['val']}{tt['val']}"
+        match = np.char.endswith(key_arr, suffix) & (columns["var"] < 0)
+        if not match.any():
+            continue
+        columns["kode_wilayah"][match] = [int(k[: -len(suffix)]) for k in key_arr[match]]
+        columns["var"][match] = v["val"]
+        columns["turvar"][match] = tv["val"]
+        columns["tahun"][match] = th["val"]
+        columns["turtahun"][match] = tt["val"]
+    if (columns["var"] < 0).any():
+        raise ValueError("Kunci datacontent tidak sesuai dengan metadata")
+    return columns
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> BpsClient:
+    """Process-wide BPS client (one connection pool, circuit breaker and latency stats)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = BpsClient(
+                BPS_API_BASE, BPS_API_KEY,
+                max_connections=BPS_MAX_CONNECTIONS,
+                retries=BPS_RETRIES,
+                breaker=CircuitBreaker(BPS_BREAKER_FAILURES, BPS_BREAKER_RESET),
+            )
+        return _client
+
+
+def _request_api(
+    etag: str | None = None,
+    var: int = BPS_VAR,
+    tahun: int = BPS_TAHUN,
+) -> tuple[dict | None, str | None]:
+    """
+    Conditional GET against the BPS API.
+    Returns (api_data, etag), or (None, etag) when the server answers 304.
+    Raises on network, HTTP or API-status errors, and ``CircuitOpen`` while
+    the API is being skipped after repeated failures.
+    """
+    return get_client().get(var, tahun, etag)
+
+
+def _fetch_from_api() -> tuple[pd.DataFrame | None, str | None]:
+    """
+    Fetch data from BPS API.
+    Returns (DataFrame, last_update_str) on success, or (None, error_msg) on failure.
+    """
+    try:
+        api_data, _ = _request_api()
+        df = _parse_api_response(api_data)
+        last_update = api_data.get("last_update", "N/A")
+        return df, last_update
+    except Exception as e:
+        return None, str(e)
+
+
+def _load_from_local_json() -> pd.DataFrame | None:
+    """Load fallback data from local Garis Kemiskinan.json (new API-format or old flat list)."""
+    try:
+        with open(LOCAL_JSON_PATH, 'r', encoding='utf-8-sig') as f:
+            data = json.load(f)
+
+        # New format (raw API dump with vervar + datacontent)
+        if isinstance(data, dict) and "vervar" in data and "datacontent" in data:
+            return _parse_api_response(data)
+
+        # Old flat-list format: [{"nama_wilayah": ..., "garis_kemiskinan": ...}, ...]
+        if isinstance(data, list):
+            return pd.DataFrame(data)
+
+        return None
+    except Exception:
+        return None
+
+
+# ---------- Persistent disk cache ----------
+def _cache_path(var: int = BPS_VAR, tahun: int = BPS_TAHUN) -> str:
+    return os.path.join(CACHE_DIR, f"garis_kemiskinan_var{var}_th{tahun}.json")
+
+
+@contextmanager
+def _cache_lock(path: str, blocking: bool = True):
+    """
+    Inter-process lock next to the cache file. Yields False when ``blocking``
+    is off and another process already holds it.
+    """
+    if fcntl is None:
+        yield True
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".lock", "a") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _read_cache(path: str) -> dict | None:
+    """Read a cache entry; returns its metadata plus the table under "df"."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+        entry["df"] = pd.DataFrame(entry.pop("data"), columns=entry.pop("columns"))
+        return entry
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _mtime_ns(path: str) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _stat_cache(path: str) -> tuple[int, int] | None:
+    """(mtime_ns, ctime_ns) of a cache file: the table's age, and any rewrite including metadata-only ones."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_ctime_ns
+
+
+def _write_cache(path: str, df: pd.DataFrame, *, mtime_ns: int | None = None, **meta) -> dict:
+    """
+    Atomically replace the cache entry so readers never see a partial file.
+    ``mtime_ns`` keeps the previous modification time when only metadata
+    changed, so mtime pollers (``PovertyLineRefresher``, the multi-year
+    store) see the table as unchanged.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    entry = {**meta, "columns": df.columns.tolist(), "data": df.values.tolist()}
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.chmod(tmp_path, 0o644)
+        if mtime_ns is not None:
+            os.utime(tmp_path, ns=(mtime_ns, mtime_ns))
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    entry.pop("data")
+    entry.pop("columns")
+    entry["df"] = df
+    return entry
+
+
+def revalidate_many(
+    keys: list[tuple[int, int]],
+    max_age: float = CACHE_MAX_AGE,
+) -> dict[tuple[int, int], dict | None]:
+    """
+    Revalidate the cache entries of several (var, tahun) keys against the BPS
+    API once they are older than ``max_age``; the due entries are fetched
+    concurrently.
+
+    Sends the stored ETag, and keeps the cached table when the server answers
+    304 or reports the same ``last_update``. Only one process on the host
+    revalidates an entry at a time; entries locked by another process map to
+    None. Failures are recorded in the entry and retried after ``max_age``.
+    """
+    results = {}
+    with ExitStack() as stack:
+        due = {}
+        for var, tahun in keys:
+            path = _cache_path(var, tahun)
+            if not stack.enter_context(_cache_lock(path, blocking=False)):
+                results[(var, tahun)] = None
+                continue
+            cached = _read_cache(path)
+            now = time.time()
+            if cached is not None and now - cached["checked_at"] < max_age:
+                results[(var, tahun)] = cached  # another replica just refreshed it
+                continue
+            meta = {k: v for k, v in (cached or {}).items() if k != "df"}
+            meta.update(var=var, tahun=tahun, checked_at=now)
+            due[(var, tahun)] = (path, cached, meta)
+
+        if due:
+            responses = get_client().get_many(
+                [(var, tahun, meta.get("etag")) for (var, tahun), (_, _, meta) in due.items()]
+            )
+            for key, response in zip(due, responses):
+                results[key] = _apply_response(*due[key], response)
+    return results
+
+
+def _apply_response(path: str, cached: dict | None, meta: dict, response) -> dict | None:
+    """
+    Write the outcome of one revalidation fetch (result tuple or exception)
+    to the cache. A failed or unchanged revalidation only updates the
+    metadata and keeps the file's mtime.
+    """
+    if isinstance(response, Exception):
+        if cached is None:
+            return None
+        return _write_cache(path, cached["df"], mtime_ns=_mtime_ns(path), **{**meta, "error": str(response)})
+    api_data, etag = response
+
+    unchanged = api_data is None or (
+        meta.get("source") == "API" and api_data.get("last_update") == meta.get("last_update")
+    )
+    if unchanged and cached is not None:
+        return _write_cache(path, cached["df"], mtime_ns=_mtime_ns(path), **{**meta, "etag": etag, "error": None})
+
+    df = _parse_api_response(api_data)
+    if df.empty:
+        return cached
+    return _write_cache(
+        path, df, **{
+            **meta,
+            "source": "API",
+            "last_update": api_data.get("last_update", "N/A"),
+            "etag": etag,
+            "fetched_at": meta["checked_at"],
+            "error": None,
+        }
+    )
+
+
+def revalidate_cache(
+    var: int = BPS_VAR,
+    tahun: int = BPS_TAHUN,
+    max_age: float = CACHE_MAX_AGE,
+) -> dict | None:
+    """Revalidate one cache entry; see ``revalidate_many``."""
+    return revalidate_many([(var, tahun)], max_age)[(var, tahun)]
+
+
+_revalidating = set()
+_revalidating_lock = threading.Lock()
+
+
+def _revalidate_in_background(var: int = BPS_VAR, tahun: int = BPS_TAHUN):
+    """Start at most one revalidation thread per cache entry in this process."""
+    with _revalidating_lock:
+        if (var, tahun) in _revalidating:
+            return
+        _revalidating.add((var, tahun))
+
+    def _run():
+        try:
+            revalidate_cache(var, tahun)
+        finally:
+            with _revalidating_lock:
+                _revalidating.discard((var, tahun))
+
+    threading.Thread(target=_run, name="gk-cache-revalidate", daemon=True).start()
+
+
+def _seed_cache(path: str) -> dict | None:
+    """Seed an empty cache from the bundled local JSON (due for revalidation at once)."""
+    df_local = _load_from_local_json()
+    if df_local is None or df_local.empty:
+        return None
+    with _cache_lock(path):
+        existing = _read_cache(path)
+        if existing is not None:
+            return existing
+        return _write_cache(
+            path, df_local,
+            var=BPS_VAR, tahun=BPS_TAHUN, source="lokal", last_update=None,
+            etag=None, fetched_at=time.time(), checked_at=0,
+            error="belum divalidasi ke API BPS",
+        )
+
+
+def load_data(background: bool = True) -> tuple[pd.DataFrame, dict]:
+    """
+    Master loader: serve the disk cache (seeded from local JSON, or fetched
+    from the API when there is neither), revalidate it against the API when
+    stale, and fall back to dummy data.
+    With ``background`` off, a stale entry is revalidated before returning.
+    Returns (DataFrame, status_info_dict).
+    status_info = {
+        "source": "API" | "lokal" | "dummy",
+        "last_update": str | None,
+        "error": str | None,
+        "fetched_at": float | None,  # epoch seconds the table was obtained
+        "checked_at": float | None   # epoch seconds of the last API revalidation
+    }
+    """
+    with metrics.timer("gk_load_data_seconds") as t:
+        df, status = _load_data(background)
+        t.labels["source"] = status["source"]
+    return df, status
+
+
+def _load_data(background: bool) -> tuple[pd.DataFrame, dict]:
+    path = _cache_path()
+    cached = _read_cache(path) or _seed_cache(path)
+
+    if cached is None:
+        # No cache and no local seed: fetch synchronously
+        df_api, api_info = _fetch_from_api()
+        if df_api is None or df_api.empty:
+            return _dummy_data(api_info)
+        now = time.time()
+        cached = _write_cache(
+            path, df_api,
+            var=BPS_VAR, tahun=BPS_TAHUN, source="API", last_update=api_info,
+            etag=None, fetched_at=now, checked_at=now, error=None,
+        )
+    elif time.time() - cached["checked_at"] >= CACHE_MAX_AGE:
+        if background:
+            _revalidate_in_background()
+        else:
+            cached = revalidate_cache() or cached
+
+    return cached["df"], _status_info(cached)
+
+
+def _status_info(cached: dict) -> dict:
+    """The ``load_data`` status of a cache entry."""
+    return {key: cached[key] for key in ("source", "last_update", "error", "fetched_at", "checked_at")}
+
+
+def _dummy_data(api_error: str | None) -> tuple[pd.DataFrame, dict]:
+    """Last resort: dummy data."""
+    df_dummy = pd.DataFrame({
+        'nama_wilayah': ['JAKARTA', 'BANDUNG', 'SURABAYA', 'MEDAN', 'MAKASSAR'],
+        'garis_kemiskinan': [800000, 750000, 720000, 680000, 700000]
+    })
+    return df_dummy, {
+        "source": "dummy",
+        "last_update": None,
+        "error": api_error,
+        "fetched_at": None,
+        "checked_at": None,
+    }
+
+
+class RegionIndex(NamedTuple):
+    """Precomputed lookups over a loaded poverty-line table."""
+    nama: list[str]                   # ordered region names (selectbox options)
+    posisi: dict[str, int]            # nama_wilayah → position in ``nama``
+    garis_by_nama: dict[str, float]   # nama_wilayah → garis_kemiskinan
+    garis_by_kode: dict[int, float]   # kode_wilayah → garis_kemiskinan (empty if no codes)
+    kode_by_nama: dict[str, int]      # nama_wilayah → kode_wilayah (empty if no codes)
+
+
+def build_region_index(wilayah_data: pd.DataFrame) -> RegionIndex:
+    """Build O(1) region lookups once per data load."""
+    nama = wilayah_data["nama_wilayah"].tolist()
+    garis = wilayah_data["garis_kemiskinan"].tolist()
+    kode = wilayah_data["kode_wilayah"].tolist() if "kode_wilayah" in wilayah_data.columns else []
+    return RegionIndex(
+        nama=nama,
+        posisi={n: i for i, n in enumerate(nama)},
+        garis_by_nama=dict(zip(nama, garis)),
+        garis_by_kode=dict(zip(kode, garis)),
+        kode_by_nama=dict(zip(nama, kode)),
+    )
+
+
+# ---------- Multi-year store ----------
+def build_garis_tahunan(tahun_list: list[int] = BPS_TAHUN_LIST) -> GarisKemiskinanTahunan:
+    """
+    Assemble the region × year store from the per-year disk caches (no
+    network) and save it as a memory-mappable ``.npy`` at GARIS_TAHUNAN_PATH.
+    """
+    tables = {}
+    for tahun in tahun_list:
+        cached = _read_cache(_cache_path(BPS_VAR, tahun))
+        if cached is not None:
+            tables[tahun + TAHUN_OFFSET] = cached["df"]
+    store = GarisKemiskinanTahunan.from_tables(tables)
+    if len(store):
+        store.save(GARIS_TAHUNAN_PATH)
+    return store
+
+
+def _garis_tahunan_usang(tahun_list: list[int] = BPS_TAHUN_LIST) -> bool:
+    """True when a per-year cache was written after the saved store; OSError when there is no store."""
+    disimpan = os.stat(GARIS_TAHUNAN_PATH).st_mtime_ns
+    for tahun in tahun_list:
+        try:
+            if os.stat(_cache_path(BPS_VAR, tahun)).st_mtime_ns > disimpan:
+                return True
+        except OSError:
+            continue
+    return False
+
+
+def load_garis_tahunan() -> GarisKemiskinanTahunan:
+    """Open the saved multi-year store, rebuilding it from the disk caches if absent or older than them."""
+    try:
+        if not _garis_tahunan_usang():
+            return GarisKemiskinanTahunan.load(GARIS_TAHUNAN_PATH)
+    except (OSError, ValueError):
+        load_data()  # make sure the default year is cached
+    return build_garis_tahunan()
+
+
+# ---------- Background refresher (stale-while-revalidate) ----------
+class Snapshot(NamedTuple):
+    """Immutable, last-good view of the poverty-line table."""
+    wilayah_data: pd.DataFrame
+    status: dict
+    index: RegionIndex
+    tahunan: GarisKemiskinanTahunan   # all cached years, region × year
+
+
+def _mtimes(stand: dict) -> dict:
+    return {tahun: st and st[0] for tahun, st in stand.items()}
+
+
+class PovertyLineRefresher:
+    """
+    Keeps an in-memory snapshot of the poverty-line tables fresh from a daemon thread.
+
+    The thread revalidates the disk cache of every year in ``tahun_list``
+    ahead of expiry (at ``refresh_ahead`` of ``CACHE_MAX_AGE``) and polls the
+    cache files so updates written by other replicas are picked up. A poll
+    only stats the files: a year is read again when its file was rewritten
+    or its last known check is due. Readers
+    call ``snapshot()``, which never touches the network; the snapshot
+    reference is swapped atomically, and a failed refresh keeps the last
+    good one.
+    """
+
+    def __init__(
+        self,
+        poll_interval: float = 30.0,
+        refresh_ahead: float = 0.8,
+        tahun_list: list[int] = BPS_TAHUN_LIST,
+    ):
+        self.poll_interval = poll_interval
+        self.max_age = CACHE_MAX_AGE * refresh_ahead
+        self.tahun_list = tahun_list
+        self._stand = {}       # tahun → _stat_cache of the file when last read
+        self._checked_at = {}  # tahun → checked_at of that read
+        self._percobaan = {}   # tahun → time of last fetch attempt for years not cached yet
+        self._stop = threading.Event()
+        self._thread = None
+        self._snapshot = self._load()
+
+    def _stat(self) -> dict[int, tuple[int, int] | None]:
+        return {tahun: _stat_cache(_cache_path(BPS_VAR, tahun)) for tahun in self.tahun_list}
+
+    def _load(self) -> Snapshot:
+        wilayah_data, status = load_data()
+        self._stand = self._stat()
+        return Snapshot(
+            wilayah_data, status, build_region_index(wilayah_data),
+            build_garis_tahunan(self.tahun_list),
+        )
+
+    def snapshot(self) -> Snapshot:
+        return self._snapshot
+
+    def refresh(self):
+        """Revalidate years that are due and reload the snapshot when any cache file changed."""
+        if self._snapshot.status["source"] == "dummy":
+            self._snapshot = self._load()
+            return
+        now = time.time()
+        stand = self._stat()
+        keys = []
+        for tahun in self.tahun_list:
+            if stand[tahun] is None:
+                if tahun != BPS_TAHUN:
+                    # Not cached yet: retry at most once per max_age
+                    if now - self._percobaan.get(tahun, 0) < self.max_age:
+                        continue
+                    self._percobaan[tahun] = now
+            elif stand[tahun] == self._stand.get(tahun) and now - self._checked_at.get(tahun, 0) < self.max_age:
+                continue  # file untouched since it was last read and not due yet
+            keys.append((BPS_VAR, tahun))
+        entries = revalidate_many(keys, max_age=self.max_age) if keys else {}
+        for (_, tahun), entry in entries.items():
+            if entry is not None:
+                self._checked_at[tahun] = entry["checked_at"]
+        stand = self._stat()
+        if _mtimes(stand) != _mtimes(self._stand):
+            self._snapshot = self._load()
+            return
+        if stand.get(BPS_TAHUN) != self._stand.get(BPS_TAHUN):
+            # Metadata-only rewrite (unchanged or failed revalidation): the
+            # table stays, the status banner follows the entry
+            entry = entries.get((BPS_VAR, BPS_TAHUN)) or _read_cache(_cache_path())
+            if entry is not None and _status_info(entry) != self._snapshot.status:
+                self._snapshot = self._snapshot._replace(status=_status_info(entry))
+        self._stand = stand
+
+    def _run(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Gagal memperbarui data garis kemiskinan")
+
+    def start(self) -> "PovertyLineRefresher":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="gk-refresher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
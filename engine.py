@@ -0,0 +1,424 @@
+"""
+Headless classification engine for Cek Kemiskinan Berdasarkan Pengeluaran.
+
+All of the economic math used by the Streamlit app lives here so it can be
+imported by batch jobs and services without importing Streamlit.
+"""
+import re
+from array import array
+from dataclasses import dataclass
+from fractions import Fraction
+from functools import lru_cache
+
+import numpy as np
+
+# Rentang waktu yang didukung pada input pengeluaran
+RENTANG_OPTIONS = ["Bulanan", "Mingguan", "Tahunan"]
+
+# Tangga klasifikasi: (batas atas dalam kelipatan garis kemiskinan, status, warna).
+# Baris terakhir tidak punya batas atas (≥ 17x).
+STATUS_LADDER = [
+    (1.0,  "Miskin",                "red"),
+    (1.5,  "Rentan Miskin",         "orange"),
+    (3.5,  "Menuju Kelas Menengah", "blue"),
+    (17.0, "Kelas Menengah",        "green"),
+    (None, "Kelas Atas",            "purple"),
+]
+
+STATUS_LABELS = [status for _, status, _ in STATUS_LADDER]
+
+_RENTANG_KODE = {rentang: kode for kode, rentang in enumerate(RENTANG_OPTIONS)}
+
+
+def kode_rentang(rentang: str) -> int:
+    """Index into RENTANG_OPTIONS; an unknown rentang counts as Bulanan, as in the expense table."""
+    return _RENTANG_KODE.get(rentang, 0)
+
+# Konversi ke bulanan per rentang (urutan RENTANG_OPTIONS) sebagai pembilang/penyebut,
+# sehingga nilai * pembilang / penyebut sama persis dengan ``hitung_total_pengeluaran``
+_BULANAN_PEMBILANG = np.array([1.0, 30.0, 1.0])
+_BULANAN_PENYEBUT = np.array([1.0, 7.0, 12.0])
+
+
+# Custom functions for formatting and parsing
+def format_currency(number):
+    """Format number to currency string with thousand separator"""
+    return f"{number:,.0f}".replace(",", ".")
+
+def format_currency_array(numbers) -> list[str]:
+    """``format_currency`` over a whole column, with one separator replace for all values."""
+    if len(numbers) == 0:
+        return []
+    return "\n".join([f"{x:,.0f}" for x in np.asarray(numbers, dtype=float).tolist()]).replace(",", ".").split("\n")
+
+def parse_currency(currency_string):
+    """Parse currency string with thousand separator to float"""
+    if not currency_string:
+        return 0
+    # Remove all non-numeric characters except decimal point
+    numeric_string = re.sub(r'[^\d.]', '', currency_string.replace(".", "").replace(",", "."))
+    try:
+        return float(numeric_string)
+    except ValueError:
+        return 0
+
+
+def hitung_total_pengeluaran(pengeluaran_data: list[dict]) -> dict:
+    """Sum expenses per rentang and normalise them to a monthly total."""
+    total_mingguan = sum([p["nilai"] for p in pengeluaran_data if p["rentang"] == "Mingguan"])
+    total_bulanan = sum([p["nilai"] for p in pengeluaran_data if p["rentang"] == "Bulanan"])
+    total_tahunan = sum([p["nilai"] for p in pengeluaran_data if p["rentang"] == "Tahunan"])
+
+    # Convert all to monthly
+    bulanan_dari_mingguan = total_mingguan * 30 / 7
+    bulanan_dari_tahunan = total_tahunan / 12
+
+    return {
+        'total_mingguan': total_mingguan,
+        'total_bulanan': total_bulanan,
+        'total_tahunan': total_tahunan,
+        'bulanan_dari_mingguan': bulanan_dari_mingguan,
+        'bulanan_dari_tahunan': bulanan_dari_tahunan,
+        'total_pengeluaran': bulanan_dari_mingguan + total_bulanan + bulanan_dari_tahunan,
+    }
+
+
+def tentukan_status(pengeluaran_perkapita: float, garis_kemiskinan: float) -> tuple[str, str, float]:
+    """
+    Classify per-capita spend against a poverty line.
+    Returns (status, color, rasio).
+    """
+    rasio = pengeluaran_perkapita / garis_kemiskinan if garis_kemiskinan > 0 else 0
+    for batas, status, color in STATUS_LADDER:
+        if batas is None or pengeluaran_perkapita < batas * garis_kemiskinan:
+            return status, color, rasio
+
+
+def klasifikasi_rumah_tangga(
+    anggota_data: list[dict],
+    pengeluaran_data: list[dict],
+    garis_kemiskinan: float,
+    selected_wilayah: str | None = None,
+) -> dict:
+    """
+    Compute the full results dict for one household, exactly as shown by the app.
+    """
+    totals = hitung_total_pengeluaran(pengeluaran_data)
+
+    # Calculate per capita
+    jumlah_anggota = len(anggota_data)
+    pengeluaran_perkapita = totals['total_pengeluaran'] / jumlah_anggota if jumlah_anggota > 0 else 0
+
+    # Determine economic status based on garis kemiskinan
+    status, color, rasio = tentukan_status(pengeluaran_perkapita, garis_kemiskinan)
+
+    return {
+        'selected_wilayah': selected_wilayah,
+        'garis_kemiskinan': garis_kemiskinan,
+        'anggota_data': anggota_data,
+        'pengeluaran_data': pengeluaran_data,
+        **totals,
+        'jumlah_anggota': jumlah_anggota,
+        'pengeluaran_perkapita': pengeluaran_perkapita,
+        'status': status,
+        'color': color,
+        'rasio': rasio
+    }
+
+
+# ---------- Compact per-session result ----------
+# Kolom tabel rincian pengeluaran: label tampilan → field tabel_pengeluaran
+KOLOM_TABEL_PENGELUARAN = {
+    "Rentang": "rentang",
+    "Kategori": "kategori",
+    "Persentase": "persentase",
+    "Nilai": "nilai",
+    "Nilai Bulanan": "nilai_bulanan",
+}
+
+
+@dataclass(frozen=True, slots=True)
+class HasilKlasifikasi:
+    """
+    Compact result of one household, as kept in a Streamlit session.
+
+    Expense rows are stored column-wise in typed arrays (rentang as an index
+    into RENTANG_OPTIONS) and members as tuples; no formatted strings are
+    kept per session. ``tabel_pengeluaran`` formats the expense table on
+    render through a process-wide cache, so reruns and sessions with the
+    same rows reuse one table. ``to_dict`` gives the same dict as
+    ``klasifikasi_rumah_tangga``.
+    """
+    selected_wilayah: str | None
+    garis_kemiskinan: float
+    tahun: int | None
+    anggota: tuple[tuple, ...]     # (hubungan, umur, pendidikan, pekerjaan)
+    rentang: array                 # int8 codes
+    kategori: tuple[str, ...]
+    nilai: array                   # float64
+    total_pengeluaran: float
+    pengeluaran_perkapita: float
+    status: str
+    color: str
+    rasio: float
+
+    @classmethod
+    def dari_input(
+        cls,
+        anggota_data: list[dict],
+        pengeluaran_data: list[dict],
+        garis_kemiskinan: float,
+        selected_wilayah: str | None = None,
+        tahun: int | None = None,
+    ) -> "HasilKlasifikasi":
+        """Classify one household from the form input (same math as ``klasifikasi_rumah_tangga``)."""
+        rentang = array("b", (kode_rentang(p["rentang"]) for p in pengeluaran_data))
+        if any(p["rentang"] != RENTANG_OPTIONS[r] for p, r in zip(pengeluaran_data, rentang)):
+            pengeluaran_data = [{**p, "rentang": RENTANG_OPTIONS[r]} for p, r in zip(pengeluaran_data, rentang)]
+        hasil = klasifikasi_rumah_tangga(anggota_data, pengeluaran_data, garis_kemiskinan, selected_wilayah)
+        nilai = array("d", (p["nilai"] for p in pengeluaran_data))
+        kategori = tuple(p["kategori"] for p in pengeluaran_data)
+        return cls(
+            selected_wilayah=selected_wilayah,
+            garis_kemiskinan=garis_kemiskinan,
+            tahun=tahun,
+            anggota=tuple(
+                (a["hubungan"], a["umur"], a["pendidikan"], a["pekerjaan"]) for a in anggota_data
+            ),
+            rentang=rentang,
+            kategori=kategori,
+            nilai=nilai,
+            total_pengeluaran=hasil["total_pengeluaran"],
+            pengeluaran_perkapita=hasil["pengeluaran_perkapita"],
+            status=hasil["status"],
+            color=hasil["color"],
+            rasio=hasil["rasio"],
+        )
+
+    @property
+    def tabel_pengeluaran(self) -> dict[str, tuple[str, ...]]:
+        """Formatted expense table, field → column (shared cached value: do not modify)."""
+        return _tabel_bersama(self.rentang.tobytes(), self.kategori, self.nilai.tobytes(), self.total_pengeluaran)
+
+    @property
+    def jumlah_anggota(self) -> int:
+        return len(self.anggota)
+
+    @property
+    def anggota_data(self) -> list[dict]:
+        return [
+            {"hubungan": h, "umur": u, "pendidikan": p, "pekerjaan": k}
+            for h, u, p, k in self.anggota
+        ]
+
+    @property
+    def pengeluaran_data(self) -> list[dict]:
+        return [
+            {"rentang": RENTANG_OPTIONS[r], "kategori": k, "nilai": n}
+            for r, k, n in zip(self.rentang, self.kategori, self.nilai)
+        ]
+
+    def to_dict(self) -> dict:
+        """Full results dict, for the infographic renderer and other dict consumers."""
+        hasil = klasifikasi_rumah_tangga(
+            self.anggota_data, self.pengeluaran_data, self.garis_kemiskinan, self.selected_wilayah
+        )
+        hasil["tahun"] = self.tahun
+        return hasil
+
+
+def kolom_pengeluaran(pengeluaran_data: list[dict]) -> tuple[np.ndarray, list[str], np.ndarray]:
+    """Expense dicts as columns: (rentang index into RENTANG_OPTIONS, kategori, nilai)."""
+    rentang = np.fromiter(
+        (kode_rentang(p["rentang"]) for p in pengeluaran_data), dtype=np.int8, count=len(pengeluaran_data)
+    )
+    nilai = np.fromiter((p["nilai"] for p in pengeluaran_data), dtype=float, count=len(pengeluaran_data))
+    return rentang, [p["kategori"] for p in pengeluaran_data], nilai
+
+
+def rincian_bulanan(rentang, nilai) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Monthly breakdown of expense rows, shared by the results table and the
+    infographic. Returns (baris, bulanan): indices of the rows with nilai > 0,
+    sorted by monthly value (descending, ties in input order), and their
+    monthly values.
+    """
+    kode = np.asarray(rentang, dtype=np.intp)
+    nilai = np.asarray(nilai, dtype=float)
+    bulanan = nilai * _BULANAN_PEMBILANG[kode] / _BULANAN_PENYEBUT[kode]
+    baris = np.flatnonzero(nilai > 0)
+    baris = baris[np.argsort(-bulanan[baris], kind="stable")]
+    return baris, bulanan[baris]
+
+
+def _tabel_pengeluaran(rentang, kategori, nilai, total: float) -> dict[str, tuple[str, ...]]:
+    """
+    Formatted expense table: rows with nilai > 0, sorted by monthly value
+    (descending, ties in input order), with the share of the monthly total.
+    """
+    baris, bulanan = rincian_bulanan(rentang, nilai)
+    if total > 0:
+        persentase = tuple(f"{p:.1f}%" for p in (bulanan / total * 100).tolist())
+    else:
+        persentase = ("0.0%",) * len(baris)
+    kode = np.asarray(rentang, dtype=np.intp)[baris].tolist()
+    return {
+        "rentang": tuple(RENTANG_OPTIONS[r] for r in kode),
+        "kategori": tuple(kategori[i] for i in baris.tolist()),
+        "persentase": persentase,
+        "nilai": tuple("Rp " + s for s in format_currency_array(np.asarray(nilai, dtype=float)[baris])),
+        "nilai_bulanan": tuple("Rp " + s for s in format_currency_array(bulanan)),
+    }
+
+
+# Formatted tables of recently rendered results, shared by all sessions
+TABEL_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=TABEL_CACHE_SIZE)
+def _tabel_bersama(rentang: bytes, kategori: tuple[str, ...], nilai: bytes, total: float) -> dict:
+    return _tabel_pengeluaran(np.frombuffer(rentang, dtype=np.int8), kategori, np.frombuffer(nilai), total)
+
+
+# ---------- Incremental what-if model ----------
+class ModelRumahTangga:
+    """
+    One household kept up to date edit by edit, for what-if exploration.
+
+    A single expense row edit adjusts the running totals per rentang in O(1)
+    and only marks the status and the row snapshot stale; nothing is
+    formatted, as the expense table is built on render
+    (``HasilKlasifikasi.tabel_pengeluaran``). A new member list or poverty
+    line (wilayah switch) only drops the status, which recomputes ``rasio``
+    from the kept totals. Running totals are exact (integers, or fractions
+    once a value is not whole), so repeated edits leave no rounding residue;
+    whole-Rupiah values give exactly the totals of
+    ``hitung_total_pengeluaran``, and ``hasil`` returns the same
+    ``HasilKlasifikasi`` as ``HasilKlasifikasi.dari_input``. An unknown
+    rentang counts as Bulanan (``kode_rentang``).
+    """
+
+    def __init__(self, garis_kemiskinan: float = 0.0):
+        self._rentang = array("b")
+        self._kategori = []
+        self._nilai = []
+        self._total_rentang = [0] * len(RENTANG_OPTIONS)
+        self._anggota = ()
+        self.garis_kemiskinan = garis_kemiskinan
+        self._baris = None                 # (rentang, kategori, nilai) snapshot for hasil
+        self._status = None                # (status, color, rasio)
+
+    def __len__(self) -> int:
+        return len(self._nilai)
+
+    # ---------- updates ----------
+    def _geser(self, i: int, tanda: int):
+        """Add (``tanda`` 1) or remove (-1) row ``i`` from the running totals."""
+        kode, nilai = self._rentang[i], self._nilai[i]
+        total = self._total_rentang[kode] + tanda * (nilai if isinstance(nilai, int) else Fraction(nilai))
+        if isinstance(total, Fraction) and total.denominator == 1:
+            total = int(total)
+        self._total_rentang[kode] = total
+
+    def set_baris(self, i: int, rentang: str, kategori: str, nilai) -> bool:
+        """Set expense row ``i`` (``i == len(self)`` appends). Returns False when nothing changed."""
+        kode = kode_rentang(rentang)
+        if nilai == int(nilai):
+            nilai = int(nilai)   # integer totals stay exact under repeated edits
+        if i == len(self._nilai):
+            self._rentang.append(kode)
+            self._kategori.append(kategori)
+            self._nilai.append(nilai)
+        else:
+            lama = (self._rentang[i], self._kategori[i], self._nilai[i])
+            if lama == (kode, kategori, nilai):
+                return False
+            self._geser(i, -1)
+            self._rentang[i], self._kategori[i], self._nilai[i] = kode, kategori, nilai
+        self._geser(i, 1)
+        self._baris = self._status = None
+        return True
+
+    def potong(self, jumlah_baris: int):
+        """Drop the rows from ``jumlah_baris`` on (a smaller expense count)."""
+        for i in range(len(self._nilai) - 1, jumlah_baris - 1, -1):
+            self._geser(i, -1)
+            self._baris = self._status = None
+        del self._rentang[jumlah_baris:], self._kategori[jumlah_baris:], self._nilai[jumlah_baris:]
+
+    def sinkronkan(self, pengeluaran_data: list[dict]) -> int:
+        """Apply a whole expense list, touching only rows that differ. Returns the rows changed."""
+        berubah = max(len(self._nilai) - len(pengeluaran_data), 0)
+        self.potong(len(pengeluaran_data))
+        for i, p in enumerate(pengeluaran_data):
+            berubah += self.set_baris(i, p["rentang"], p["kategori"], p["nilai"])
+        return berubah
+
+    def set_anggota(self, anggota_data: list[dict]):
+        anggota = tuple((a["hubungan"], a["umur"], a["pendidikan"], a["pekerjaan"]) for a in anggota_data)
+        if anggota != self._anggota:
+            if len(anggota) != len(self._anggota):
+                self._status = None
+            self._anggota = anggota
+
+    def set_garis(self, garis_kemiskinan: float):
+        if garis_kemiskinan != self.garis_kemiskinan:
+            self.garis_kemiskinan = garis_kemiskinan
+            self._status = None
+
+    # ---------- derived values ----------
+    def totals(self) -> dict:
+        """Same dict as ``hitung_total_pengeluaran``, from the running totals."""
+        total_bulanan, total_mingguan, total_tahunan = (
+            t if isinstance(t, int) else float(t)
+            for t in (self._total_rentang[_RENTANG_KODE[r]] for r in ("Bulanan", "Mingguan", "Tahunan"))
+        )
+        bulanan_dari_mingguan = total_mingguan * 30 / 7
+        bulanan_dari_tahunan = total_tahunan / 12
+        return {
+            'total_mingguan': total_mingguan,
+            'total_bulanan': total_bulanan,
+            'total_tahunan': total_tahunan,
+            'bulanan_dari_mingguan': bulanan_dari_mingguan,
+            'bulanan_dari_tahunan': bulanan_dari_tahunan,
+            'total_pengeluaran': bulanan_dari_mingguan + total_bulanan + bulanan_dari_tahunan,
+        }
+
+    @property
+    def total_pengeluaran(self) -> float:
+        return self.totals()["total_pengeluaran"]
+
+    @property
+    def pengeluaran_perkapita(self) -> float:
+        jumlah_anggota = len(self._anggota)
+        return self.total_pengeluaran / jumlah_anggota if jumlah_anggota > 0 else 0
+
+    def status(self) -> tuple[str, str, float]:
+        """(status, color, rasio), recomputed only after a change to the totals, members or line."""
+        if self._status is None:
+            self._status = tentukan_status(self.pengeluaran_perkapita, self.garis_kemiskinan)
+        return self._status
+
+    def _kolom(self):
+        if self._baris is None:
+            self._baris = (array("b", self._rentang), tuple(self._kategori), array("d", self._nilai))
+        return self._baris
+
+    def hasil(self, selected_wilayah: str | None = None, tahun: int | None = None) -> HasilKlasifikasi:
+        """Compact result of the current state; unchanged parts reuse their cached values."""
+        rentang, kategori, nilai = self._kolom()
+        status, color, rasio = self.status()
+        return HasilKlasifikasi(
+            selected_wilayah=selected_wilayah,
+            garis_kemiskinan=self.garis_kemiskinan,
+            tahun=tahun,
+            anggota=self._anggota,
+            rentang=rentang,
+            kategori=kategori,
+            nilai=nilai,
+            total_pengeluaran=self.total_pengeluaran,
+            pengeluaran_perkapita=self.pengeluaran_perkapita,
+            status=status,
+            color=color,
+            rasio=rasio,
+        )
@@ -0,0 +1,106 @@
+"""
+Multi-year poverty-line store: region code × year, held as int32 NumPy arrays.
+
+The whole table is saved as a single memory-mappable ``.npy`` file so batch
+jobs and app processes can open it without parsing or refetching anything.
+"""
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+TAHUN_OFFSET = 1900   # kode tahun BPS = tahun - 1900 (125 → 2025)
+MISSING = -1          # marker for a (region, year) without data
+
+
+class GarisKemiskinanTahunan:
+    """
+    Poverty lines for every (kode_wilayah, tahun) pair.
+
+    ``garis[i, j]`` is the line of region ``kode[i]`` in year ``tahun[j]``,
+    or ``MISSING``. Lookups go through a dense code → row array and a
+    year → column dict, so ``get`` is O(1).
+    """
+
+    def __init__(self, kode: np.ndarray, tahun: np.ndarray, garis: np.ndarray):
+        self.kode = np.asarray(kode, dtype=np.int32)
+        self.tahun = np.asarray(tahun, dtype=np.int32)
+        self.garis = garis
+        self._baris = np.full(int(self.kode.max()) + 1 if len(self.kode) else 1, -1, dtype=np.int32)
+        self._baris[self.kode] = np.arange(len(self.kode), dtype=np.int32)
+        self._kolom = {int(t): j for j, t in enumerate(self.tahun)}
+
+    @classmethod
+    def from_tables(cls, tables: dict[int, pd.DataFrame]) -> "GarisKemiskinanTahunan":
+        """Build from {tahun: DataFrame with kode_wilayah & garis_kemiskinan}."""
+        tables = {t: df for t, df in tables.items() if df is not None and "kode_wilayah" in df.columns}
+        tahun = np.array(sorted(tables), dtype=np.int32)
+        kode = np.unique(np.concatenate(
+            [df["kode_wilayah"].to_numpy(dtype=np.int32) for df in tables.values()]
+        )) if tables else np.empty(0, dtype=np.int32)
+        garis = np.full((len(kode), len(tahun)), MISSING, dtype=np.int32)
+        for j, t in enumerate(tahun):
+            df = tables[int(t)]
+            rows = np.searchsorted(kode, df["kode_wilayah"].to_numpy(dtype=np.int32))
+            garis[rows, j] = np.rint(df["garis_kemiskinan"].to_numpy(dtype=np.float64))
+        return cls(kode, tahun, garis)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "GarisKemiskinanTahunan":
+        """Open a store written by ``save`` (memory-mapped by default)."""
+        arr = np.load(path, mmap_mode="r" if mmap else None)
+        return cls(arr[1:, 0], arr[0, 1:], arr[1:, 1:])
+
+    def save(self, path: str):
+        """
+        Write one int32 matrix: row 0 holds the years, column 0 the region
+        codes. Replaced atomically so readers never see a partial file.
+        """
+        arr = np.zeros((len(self.kode) + 1, len(self.tahun) + 1), dtype=np.int32)
+        arr[0, 1:] = self.tahun
+        arr[1:, 0] = self.kode
+        arr[1:, 1:] = self.garis
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".npy")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, arr)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def __len__(self) -> int:
+        return len(self.kode)
+
+    def get(self, kode_wilayah: int, tahun: int) -> int | None:
+        """Poverty line for one region and year, or None when unavailable."""
+        j = self._kolom.get(tahun)
+        if j is None or not 0 <= kode_wilayah < len(self._baris):
+            return None
+        i = self._baris[kode_wilayah]
+        if i < 0:
+            return None
+        nilai = int(self.garis[i, j])
+        return None if nilai == MISSING else nilai
+
+    def tahun_tersedia(self, kode_wilayah: int | None = None) -> list[int]:
+        """Years with data, overall or for one region (newest first)."""
+        if kode_wilayah is None:
+            return sorted(self._kolom, reverse=True)
+        i = self._baris[kode_wilayah] if 0 <= kode_wilayah < len(self._baris) else -1
+        if i < 0:
+            return []
+        return sorted((int(t) for t, g in zip(self.tahun, self.garis[i]) if g != MISSING), reverse=True)
+
+    def lookup_array(self, tahun: int) -> np.ndarray:
+        """Dense code → line array for one year (NaN when missing), as used by ``batch``."""
+        lookup = np.full(len(self._baris), np.nan)
+        j = self._kolom.get(tahun)
+        if j is not None:
+            kolom = self.garis[:, j]
+            ada = kolom != MISSING
+            lookup[self.kode[ada]] = kolom[ada]
+        return lookup
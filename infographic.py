@@ -0,0 +1,830 @@
+"""
+Infographic rendering for analysis results (Matplotlib, Agg backend).
+
+``generate_infographic`` draws one 9×16 image. PNG variants (full, preview,
+palette) blit the per-result artists over a static layer rendered once per
+process, restoring the status box, pie and member table from bitmaps keyed
+by their content; SVG and PDF reuse one figure with the static layer through
+``write_infographic``. ``generate_infographic_full`` rebuilds the whole
+figure and is kept as the reference renderer. ``infographic_bytes`` adds a
+content-addressed LRU cache of the encoded bytes so identical results are
+served without re-rendering.
+"""
+import functools
+import hashlib
+import json
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from io import BytesIO
+
+import numpy as np
+
+import metrics
+from engine import format_currency, kolom_pengeluaran, rincian_bulanan
+
+# Matplotlib and Pillow are imported inside the rendering functions, so
+# importing this module (formats, cache, keys) stays cheap for sessions
+# that never render an infographic.
+
+
+@functools.cache
+def _pyplot():
+    """Select the Agg backend and import pyplot, once per process."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
+
+# ---------- Infographic generator ----------
+# Colour palette for pie chart slices
+PIE_COLORS = [
+    "#4E79A7", "#F28E2B", "#E15759", "#76B7B2", "#59A14F",
+    "#EDC948", "#B07AA1", "#FF9DA7", "#9C755F", "#BAB0AB",
+    "#6BAED6", "#FD8D3C", "#74C476", "#9E9AC8", "#D9D9D9",
+]
+
+# Status → hex colour mapping (matches the CSS colours used in the app)
+STATUS_COLORS = {
+    "Miskin":                "#E53935",   # red
+    "Rentan Miskin":         "#FB8C00",   # orange
+    "Menuju Kelas Menengah": "#1E88E5",   # blue
+    "Kelas Menengah":        "#43A047",   # green
+    "Kelas Atas":            "#8E24AA",   # purple
+}
+
+# ── palette helpers ──────────────────────────────────────────────────
+BG          = "#FFFFFF"
+CARD_BG     = "#F4F6F8"
+HEADER_BG   = "#1B2845"
+TEXT_DARK   = "#1B2845"
+TEXT_LIGHT  = "#FFFFFF"
+ACCENT      = "#4E79A7"
+FOOTER_URL  = "cekkemiskinanbypengeluaran.streamlit.app"
+
+DPI = 150
+PREVIEW_DPI = 60        # thumbnail / preview PNG
+PALETTE_COLORS = 64     # colours kept by the quantized PNG
+PNG_COMPRESS_LEVEL = 1  # zlib level for full-colour PNG: ~2x faster than 6 for ~20 % more bytes
+
+# Export format → (file extension, MIME type)
+EXPORT_FORMATS = {
+    "png":         ("png", "image/png"),          # 150 dpi, full colour
+    "png-preview": ("png", "image/png"),          # PREVIEW_DPI, for thumbnails
+    "png-palette": ("png", "image/png"),          # 150 dpi, PALETTE_COLORS-colour palette
+    "svg":         ("svg", "image/svg+xml"),
+    "pdf":         ("pdf", "application/pdf"),
+}
+
+# ── klasifikasi gauge geometry ───────────────────────────────────────
+# 5 zona: Miskin <1x | Rentan Miskin <1.5x | Menuju KM <3.5x | KM <17x | Kelas Atas ≥17x
+# Representasi visual: bar dibagi proportional berdasarkan lebar zona yang
+# "bermakna" sampai 20x (capped), pointer di posisi rasio saat ini.
+GAUGE_MAX   = 20.0                          # cap visual axis
+GAUGE_ZONES = [
+    ("Miskin",                1.0,  "#E53935"),
+    ("Rentan Miskin",         0.5,  "#FB8C00"),
+    ("Menuju Kelas Menengah", 2.0,  "#1E88E5"),
+    ("Kelas Menengah",       13.5,  "#43A047"),
+    ("Kelas Atas",            3.0,  "#8E24AA"),   # 17→20 = 3
+]
+BAR_LEFT    = 0.02
+BAR_RIGHT   = 0.98
+BAR_WIDTH   = BAR_RIGHT - BAR_LEFT
+BAR_Y       = 0.42          # vertical centre of the bar
+BAR_H       = 0.18          # height of the bar
+
+# ── metrik card geometry ─────────────────────────────────────────────
+CARD_W      = 0.28
+CARD_GAP    = (1 - CARD_W * 3) / 4
+
+
+def _pie_slices(results: dict) -> tuple[list[str], list[float]]:
+    """Monthly expense per kategori, sorted descending, slices < 3 % grouped as "Lainnya"."""
+    total_pengeluaran = results["total_pengeluaran"]
+
+    # ── pengeluaran → bulanan (sorted descending), shared with the results table ──
+    rentang, kategori, nilai = kolom_pengeluaran(results["pengeluaran_data"])
+    baris, bulanan = rincian_bulanan(rentang, nilai)
+
+    # group small slices (< 3 %) into "Lainnya"
+    if total_pengeluaran > 0:
+        besar = bulanan / total_pengeluaran * 100 >= 3
+    else:
+        besar = np.zeros(len(bulanan), dtype=bool)
+    labels = [kategori[i] or "—" for i in baris[besar].tolist()]
+    values = bulanan[besar].tolist()
+    lainnya = float(bulanan[~besar].sum())
+    if lainnya > 0:
+        labels.append("Lainnya")
+        values.append(lainnya)
+    return labels, values
+
+
+def _draw_static(fig) -> dict:
+    """
+    Draw everything that is identical for every result (layout, header band,
+    gauge, section titles, card backgrounds, footer URL). Returns the axes.
+    """
+    from matplotlib.patches import FancyBboxPatch
+
+    # GridSpec: 21 rows (was 18; +2 for gauge, +1 extra breathing room)
+    gs = fig.add_gridspec(
+        nrows=21, ncols=1,
+        left=0.06, right=0.94, top=0.96, bottom=0.04,
+        hspace=0.06
+    )
+
+    # ── 1. HEADER (rows 0-1) ─────────────────────────────────────────
+    ax_header = fig.add_subplot(gs[0:2, :])
+    ax_header.set_facecolor(HEADER_BG)
+    ax_header.set_xlim(0, 1)
+    ax_header.set_ylim(0, 1)
+    ax_header.axis("off")
+    ax_header.text(0.5, 0.62, "Hasil Analisis Status Ekonomi",
+                   ha="center", va="center", fontsize=24, fontweight="bold",
+                   color=TEXT_LIGHT, fontfamily="sans-serif")
+
+    # ── 2. STATUS BOX (rows 2-4) ─────────────────────────────────────
+    ax_status = fig.add_subplot(gs[2:5, :])
+    ax_status.set_facecolor(BG)
+    ax_status.set_xlim(0, 1)
+    ax_status.set_ylim(0, 1)
+    ax_status.axis("off")
+
+    # ── 3. KLASIFIKASI GAUGE (rows 5-6) ──────────────────────────────
+    ax_gauge = fig.add_subplot(gs[5:7, :])
+    ax_gauge.set_facecolor(BG)
+    ax_gauge.set_xlim(0, 1)
+    ax_gauge.set_ylim(0, 1)
+    ax_gauge.axis("off")
+
+    # Section label inside the axes
+    ax_gauge.text(0.0, 0.92, "Klasifikasi Status",
+                  ha="left", va="center", fontsize=16, fontweight="bold",
+                  color=TEXT_DARK, fontfamily="sans-serif")
+
+    # Draw coloured segments
+    x_cursor = BAR_LEFT
+    for name, width_units, color in GAUGE_ZONES:
+        seg_w = (width_units / GAUGE_MAX) * BAR_WIDTH
+        ax_gauge.add_patch(FancyBboxPatch(
+            (x_cursor, BAR_Y - BAR_H / 2), seg_w, BAR_H,
+            boxstyle="square,pad=0",
+            facecolor=color, edgecolor="white", linewidth=2
+        ))
+        x_cursor += seg_w
+
+    # Tick marks at the boundaries: 1x, 1.5x, 3.5x, 17x, 20x
+    for mult, label in [(1.0, "1x"), (1.5, "1.5x"), (3.5, "3.5x"), (17.0, "17x")]:
+        x_pos = BAR_LEFT + (mult / GAUGE_MAX) * BAR_WIDTH
+        ax_gauge.plot([x_pos, x_pos], [BAR_Y - BAR_H / 2 - 0.04,
+                                        BAR_Y - BAR_H / 2], color=TEXT_DARK, lw=1.5)
+        ax_gauge.text(x_pos, BAR_Y - BAR_H / 2 - 0.10, label,
+                      ha="center", va="top", fontsize=11, color=TEXT_DARK,
+                      fontfamily="sans-serif")
+
+    # Zone labels inside each segment
+    x_cursor = BAR_LEFT
+    for name, width_units, color in GAUGE_ZONES:
+        seg_w = (width_units / GAUGE_MAX) * BAR_WIDTH
+        # only label if segment is wide enough
+        if seg_w > 0.07:
+            ax_gauge.text(x_cursor + seg_w / 2, BAR_Y, name,
+                          ha="center", va="center", fontsize=8.5, fontweight="bold",
+                          color="white", fontfamily="sans-serif")
+        x_cursor += seg_w
+
+    # ── 4. METRIK BOXES (rows 7-9) ───────────────────────────────────
+    ax_metrics = fig.add_subplot(gs[7:10, :])
+    ax_metrics.set_facecolor(BG)
+    ax_metrics.set_xlim(0, 1)
+    ax_metrics.set_ylim(0, 1)
+    ax_metrics.axis("off")
+
+    static_labels = ["Total Pengeluaran\nBulanan", "Pengeluaran\nPer Kapita", None]
+    for idx, label in enumerate(static_labels):
+        x_left = CARD_GAP + idx * (CARD_W + CARD_GAP)
+        box = FancyBboxPatch((x_left, 0.1), CARD_W, 0.8,
+                             boxstyle="round,pad=0.015",
+                             facecolor=CARD_BG, edgecolor="none")
+        ax_metrics.add_patch(box)
+        if label is not None:
+            ax_metrics.text(x_left + CARD_W / 2, 0.72, label,
+                            ha="center", va="center", fontsize=12,
+                            color=ACCENT, fontweight="bold", fontfamily="sans-serif")
+
+    # ── 5. SECTION LABEL: Komposisi Pengeluaran ─────────────────────
+    ax_lbl1 = fig.add_subplot(gs[10, :])
+    ax_lbl1.axis("off")
+    ax_lbl1.text(0.0, 0.5, "Komposisi Pengeluaran Bulanan",
+                 ha="left", va="center", fontsize=18, fontweight="bold",
+                 color=TEXT_DARK, fontfamily="sans-serif")
+
+    # ── 6. PIE CHART (rows 11-15) ────────────────────────────────────
+    ax_pie = fig.add_subplot(gs[11:16, :])
+    ax_pie.set_facecolor(BG)
+
+    # ── 7. SECTION LABEL: Anggota Rumah Tangga ──────────────────────
+    ax_lbl2 = fig.add_subplot(gs[16, :])
+    ax_lbl2.axis("off")
+    ax_lbl2.text(0.0, 0.5, "Anggota Rumah Tangga",
+                 ha="left", va="center", fontsize=18, fontweight="bold",
+                 color=TEXT_DARK, fontfamily="sans-serif")
+
+    # ── 8. TABEL ANGGOTA (rows 17-19) ───────────────────────────────
+    ax_tbl = fig.add_subplot(gs[17:20, :])
+    ax_tbl.axis("off")
+    ax_tbl.set_facecolor(BG)
+
+    # ── 9. FOOTER (row 20) ───────────────────────────────────────────
+    ax_footer = fig.add_subplot(gs[20, :])
+    ax_footer.axis("off")
+    ax_footer.set_facecolor(BG)
+    ax_footer.text(0.5, 0.6, FOOTER_URL,
+                   ha="center", va="center", fontsize=13,
+                   color=ACCENT, fontweight="bold", fontfamily="sans-serif")
+
+    return {
+        "header": ax_header, "status": ax_status, "gauge": ax_gauge,
+        "metrics": ax_metrics, "pie": ax_pie, "tbl": ax_tbl, "footer": ax_footer,
+    }
+
+
+def _draw_status_box(ax_status, status: str) -> list:
+    """Coloured status box with its label and the status name (one look per status)."""
+    from matplotlib.patches import FancyBboxPatch
+
+    box = FancyBboxPatch((0.05, 0.08), 0.9, 0.84,
+                         boxstyle="round,pad=0.02",
+                         facecolor=STATUS_COLORS.get(status, "#888888"), edgecolor="none")
+    ax_status.add_patch(box)
+    return [
+        box,
+        ax_status.text(0.5, 0.68, "Status Ekonomi",
+                       ha="center", va="center", fontsize=16,
+                       color="white", alpha=0.85, fontfamily="sans-serif"),
+        ax_status.text(0.5, 0.42, status,
+                       ha="center", va="center", fontsize=32, fontweight="bold",
+                       color="white", fontfamily="sans-serif"),
+    ]
+
+
+ANGGOTA_COLUMNS = ["Hubungan", "Umur", "Pendidikan", "Pekerjaan"]
+
+
+def _anggota_cells(anggota_data: list[dict]) -> list[list[str]]:
+    return [
+        [a["hubungan"], str(a["umur"]), a["pendidikan"], a["pekerjaan"] or "—"]
+        for a in anggota_data
+    ]
+
+
+def _draw_anggota_table(ax_tbl, cell_data: list[list[str]]):
+    """Member table: dark header row, alternating row colours. Returns the Table artist."""
+    table = ax_tbl.table(
+        cellText=cell_data,
+        colLabels=ANGGOTA_COLUMNS,
+        loc="center",
+        cellLoc="center",
+    )
+    table.auto_set_font_size(False)
+    table.set_fontsize(12)
+    table.scale(1, 1.8)
+
+    # Style header row
+    for col_idx in range(len(ANGGOTA_COLUMNS)):
+        cell = table[0, col_idx]
+        cell.set_facecolor(HEADER_BG)
+        cell.set_text_props(color=TEXT_LIGHT, fontweight="bold")
+
+    # Style data rows — alternating
+    for row_idx in range(1, len(cell_data) + 1):
+        for col_idx in range(len(ANGGOTA_COLUMNS)):
+            cell = table[row_idx, col_idx]
+            cell.set_facecolor(CARD_BG if row_idx % 2 == 0 else BG)
+            cell.set_text_props(color=TEXT_DARK)
+            cell.set_edgecolor("#E0E0E0")
+    return table
+
+
+def _draw_pie(ax_pie, labels: list[str], values: list[float]) -> list:
+    """Donut of the monthly expense per kategori with its legend. Returns the artists."""
+    from matplotlib.patches import Patch
+
+    if values:
+        colors_slice = PIE_COLORS[: len(values)]
+        wedges, texts, autotexts = ax_pie.pie(
+            values,
+            labels=None,
+            autopct=lambda pct: f"{pct:.1f}%" if pct >= 3 else "",
+            colors=colors_slice,
+            startangle=90,
+            pctdistance=0.78,
+            wedgeprops=dict(edgecolor="white", linewidth=1.5, width=0.55),
+        )
+        artists = wedges + texts + autotexts
+        for at in autotexts:
+            at.set_fontsize(12)
+            at.set_fontweight("bold")
+            at.set_color("white")
+
+        legend_patches = [
+            Patch(facecolor=colors_slice[i], edgecolor="none", label=labels[i])
+            for i in range(len(labels))
+        ]
+        artists.append(ax_pie.legend(
+            handles=legend_patches,
+            loc="center left",
+            bbox_to_anchor=(1.02, 0.5),
+            fontsize=11,
+            frameon=False,
+            title="Kategori",
+            title_fontsize=12,
+        ))
+    else:
+        # Axes coordinates: an earlier pie() on a reused axes moved its data limits
+        artists = [ax_pie.text(0.5, 0.5, "Tidak ada data pengeluaran", transform=ax_pie.transAxes,
+                               ha="center", va="center", fontsize=15, color="#888888")]
+        ax_pie.axis("off")
+    return artists
+
+
+def _draw_dynamic(axes: dict, results: dict, layers=()) -> list:
+    """
+    Draw the per-result parts (wilayah, status box, pointer, metric values,
+    pie, member table, timestamp). Returns every artist it added. Sections
+    named in ``layers`` ("status", "pie", "table") are left out: the PNG
+    template restores them from cached bitmaps.
+    """
+    from matplotlib.patches import Polygon
+
+    # ── unpack results ───────────────────────────────────────────────
+    wilayah            = results["selected_wilayah"]
+    status             = results["status"]
+    rasio              = results["rasio"]
+    total_pengeluaran  = results["total_pengeluaran"]
+    pengeluaran_percap = results["pengeluaran_perkapita"]
+    garis_kemiskinan   = results["garis_kemiskinan"]
+    anggota_data       = results["anggota_data"]
+    labels, values     = _pie_slices(results)
+
+    artists = []
+
+    # ── 1. HEADER ────────────────────────────────────────────────────
+    artists.append(axes["header"].text(0.5, 0.22, wilayah,
+                                       ha="center", va="center", fontsize=17,
+                                       color="#A8C4D9", fontfamily="sans-serif"))
+
+    # ── 2. STATUS BOX ────────────────────────────────────────────────
+    ax_status = axes["status"]
+    if "status" not in layers:
+        artists.extend(_draw_status_box(ax_status, status))
+    artists.append(ax_status.text(0.5, 0.18, f"{rasio:.2f}x dari Garis Kemiskinan",
+                                  ha="center", va="center", fontsize=16,
+                                  color="white", alpha=0.90, fontfamily="sans-serif"))
+
+    # ── 3. GAUGE POINTER ─────────────────────────────────────────────
+    # Pointer triangle at current rasio (capped at GAUGE_MAX)
+    ax_gauge   = axes["gauge"]
+    ptr_ratio  = min(rasio, GAUGE_MAX)
+    ptr_x      = BAR_LEFT + (ptr_ratio / GAUGE_MAX) * BAR_WIDTH
+    tri_top    = BAR_Y + BAR_H / 2 + 0.02
+    tri_size   = 0.025
+    triangle   = Polygon([
+        [ptr_x, tri_top],
+        [ptr_x - tri_size, tri_top + tri_size * 1.2],
+        [ptr_x + tri_size, tri_top + tri_size * 1.2],
+    ], closed=True, facecolor=TEXT_DARK, edgecolor="none",
+       transform=ax_gauge.transAxes, clip_on=False)
+    ax_gauge.add_patch(triangle)
+    artists.append(triangle)
+
+    # Label above pointer
+    artists.append(ax_gauge.text(ptr_x, tri_top + tri_size * 1.5 + 0.02, f"{rasio:.2f}x",
+                                 ha="center", va="bottom", fontsize=13, fontweight="bold",
+                                 color=TEXT_DARK, fontfamily="sans-serif"))
+
+    # ── 4. METRIK VALUES ─────────────────────────────────────────────
+    ax_metrics = axes["metrics"]
+    metric_values = [
+        f"Rp {format_currency(total_pengeluaran)}",
+        f"Rp {format_currency(pengeluaran_percap)}",
+        f"Rp {format_currency(garis_kemiskinan)}",
+    ]
+    x_third = CARD_GAP + 2 * (CARD_W + CARD_GAP)
+    artists.append(ax_metrics.text(x_third + CARD_W / 2, 0.72, "Garis Kemiskinan\n" + wilayah,
+                                   ha="center", va="center", fontsize=12,
+                                   color=ACCENT, fontweight="bold", fontfamily="sans-serif"))
+    for idx, value in enumerate(metric_values):
+        x_left = CARD_GAP + idx * (CARD_W + CARD_GAP)
+        artists.append(ax_metrics.text(x_left + CARD_W / 2, 0.35, value,
+                                       ha="center", va="center", fontsize=15, fontweight="bold",
+                                       color=TEXT_DARK, fontfamily="sans-serif"))
+
+    # ── 6. PIE CHART ─────────────────────────────────────────────────
+    if "pie" not in layers:
+        artists.extend(_draw_pie(axes["pie"], labels, values))
+
+    # ── 8. TABEL ANGGOTA ─────────────────────────────────────────────
+    if "table" not in layers:
+        artists.append(_draw_anggota_table(axes["tbl"], _anggota_cells(anggota_data)))
+
+    # ── 9. FOOTER TIMESTAMP ──────────────────────────────────────────
+    artists.append(axes["footer"].text(0.5, 0.1,
+                                       f"Dihasilkan pada {datetime.now().strftime('%d %b %Y %H:%M')}",
+                                       ha="center", va="center", fontsize=11,
+                                       color="#999999", fontfamily="sans-serif"))
+    return artists
+
+
+def generate_infographic_full(results: dict, fmt: str = "png") -> BytesIO:
+    """
+    Render the infographic by building a complete new figure (reference
+    renderer, used by the benchmarks).
+    ``fmt`` is any format ``savefig`` accepts, e.g. "png", "svg" or "pdf".
+    """
+    return _generate_full(results, fmt, DPI)
+
+
+def _generate_full(results: dict, fmt: str, dpi: int, **savefig_kwargs) -> BytesIO:
+    plt = _pyplot()
+    fig = plt.figure(figsize=(9, 16), facecolor=BG)
+    fig.patch.set_facecolor(BG)
+    _draw_dynamic(_draw_static(fig), results)
+
+    buf = BytesIO()
+    fig.savefig(buf, format=fmt, dpi=dpi, bbox_inches="tight", facecolor=BG, **savefig_kwargs)
+    plt.close(fig)
+    buf.seek(0)
+    return buf
+
+
+def _full_rgb(results: dict, dpi: int) -> np.ndarray:
+    """RGB array of the reference renderer's PNG, for layouts the template cannot crop."""
+    from PIL import Image
+
+    buf = _generate_full(results, "png", dpi, pil_kwargs={"compress_level": 0})
+    return np.asarray(Image.open(buf).convert("RGB"))
+
+
+class _InfographicTemplate:
+    """
+    Static layer rendered once per process and kept as an Agg background
+    bitmap. The status box, the pie with its legend and the member table
+    are kept as smaller bitmaps too, keyed by what they show (LRU of
+    ``MAX_LAYERS`` each), so a re-render that only changes the wilayah,
+    poverty line or values restores them instead of drawing them again. A
+    new member list only draws the names over the cached table grid for
+    its row count. Each render restores the layers, draws the remaining
+    per-result artists on top and returns the crop ``bbox_inches="tight"``
+    would keep. Content that leaves the 9×16 canvas (a member table of
+    about 13 rows and up) is rendered by the reference renderer instead,
+    which grows the canvas to fit.
+    """
+
+    MAX_LAYERS = 8
+
+    def __init__(self, dpi: int = DPI):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.dpi = dpi
+        self.fig = Figure(figsize=(9, 16), dpi=dpi, facecolor=BG)
+        FigureCanvasAgg(self.fig)
+        self.axes = _draw_static(self.fig)
+        self.axes["pie"].axis("off")     # pie() turns the frame off anyway
+        self.fig.canvas.draw()
+        self.background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        renderer = self.fig.canvas.get_renderer()
+        self.static_bbox = self.fig.get_tightbbox(renderer).transformed(self.fig.dpi_scale_trans)
+        self.footer_url = self.axes["footer"].texts[0]
+        self._layers = {"status": OrderedDict(), "pie": OrderedDict(), "grid": OrderedDict(), "table": OrderedDict()}
+        self._cell_positions = {}   # row count → [[(x, y) display position of each cell text]]
+        self.lock = threading.Lock()
+
+    def _layer(self, section: str, key, draw, under=None):
+        """
+        (region, extent) of one section: ``draw()`` is drawn over the static
+        layer (and the ``under`` layer) once per ``key``, its pixels copied
+        and its artists removed.
+        """
+        from matplotlib.transforms import Bbox
+
+        cache = self._layers[section]
+        layer = cache.get(key)
+        if layer is not None:
+            cache.move_to_end(key)
+            return layer
+        canvas = self.fig.canvas
+        canvas.restore_region(self.background)
+        if under is not None:
+            canvas.restore_region(under[0])
+        artists = draw()
+        # pie() sets an equal aspect; normally applied when the axes is drawn
+        self.axes["pie"].apply_aspect()
+        for artist in artists:
+            self.fig.draw_artist(artist)
+        renderer = canvas.get_renderer()
+        extent = Bbox.union([artist.get_window_extent(renderer) for artist in artists]
+                            + ([under[1]] if under is not None else []))
+        # Pad for line widths and antialiasing outside the geometric extent
+        region = canvas.copy_from_bbox(Bbox.intersection(extent.padded(0.05 * self.dpi), self.fig.bbox))
+        for artist in artists:
+            artist.remove()
+        layer = cache[key] = (region, extent)
+        if len(cache) > self.MAX_LAYERS:
+            cache.popitem(last=False)
+        return layer
+
+    def _table_layer(self, cells: list[list[str]]):
+        """Member table for ``cells``: the names drawn over the grid of its row count."""
+        from matplotlib.transforms import IdentityTransform
+
+        rows = len(cells)
+        grid = []
+
+        def draw_grid():
+            grid.append(_draw_anggota_table(self.axes["tbl"], [[""] * len(ANGGOTA_COLUMNS)] * rows))
+            return grid
+
+        grid_layer = self._layer("grid", rows, draw_grid)
+        if grid:
+            # Where the cells put their texts, kept from the layout the draw just did
+            self._cell_positions[rows] = [
+                [tuple(text.get_transform().transform(text.get_position()))
+                 for text in (grid[0][row_idx, col_idx].get_text() for col_idx in range(len(ANGGOTA_COLUMNS)))]
+                for row_idx in range(1, rows + 1)
+            ]
+        positions = self._cell_positions[rows]
+
+        def draw_names():
+            return [
+                self.fig.text(x, y, value, transform=IdentityTransform(),
+                              ha="center", va="center", fontsize=12, color=TEXT_DARK)
+                for row, row_positions in zip(cells, positions)
+                for value, (x, y) in zip(row, row_positions)
+            ]
+
+        return self._layer("table", tuple(map(tuple, cells)), draw_names, under=grid_layer)
+
+    def render_rgb(self, results: dict) -> np.ndarray:
+        """Draw ``results`` over the cached layers and return a cropped RGB array."""
+        status = results["status"]
+        labels, values = _pie_slices(results)
+        cells = _anggota_cells(results["anggota_data"])
+        with self.lock:
+            canvas = self.fig.canvas
+            layers = {
+                "status": self._layer("status", status, lambda: _draw_status_box(self.axes["status"], status)),
+                "pie": self._layer("pie", (tuple(labels), tuple(values)),
+                                   lambda: _draw_pie(self.axes["pie"], labels, values)),
+            }
+            table = self._table_layer(cells)
+            # A large household's table reaches up into the pie, which must stay underneath it
+            if not table[1].padded(0.1 * self.dpi).overlaps(layers["pie"][1]):
+                layers["table"] = table
+
+            canvas.restore_region(self.background)
+            for region, _ in layers.values():
+                canvas.restore_region(region)
+            artists = _draw_dynamic(self.axes, results, layers)
+            try:
+                # ... and down over the footer URL, which is drawn after it
+                url_hidden = table[1].overlaps(self.footer_url.get_window_extent())
+                for artist in artists:
+                    if url_hidden and artist.axes is self.axes["footer"]:
+                        self.fig.draw_artist(self.footer_url)
+                        url_hidden = False
+                    self.fig.draw_artist(artist)
+                rgba = np.asarray(canvas.buffer_rgba())
+                crop = self._tight_slices(artists, [extent for _, extent in layers.values()])
+                if crop is not None:
+                    rows, cols = crop
+                    return rgba[rows, cols, :3].copy()
+            finally:
+                for artist in artists:
+                    artist.remove()
+        return _full_rgb(results, self.dpi)
+
+    def _tight_slices(self, artists: list, extents: list) -> tuple[slice, slice] | None:
+        """
+        Pixel rows/cols that ``bbox_inches="tight"`` would keep: the static
+        extent (measured once) joined with the cached layers and the other
+        dynamic artists, plus 0.1 inch. None when that box leaves the canvas.
+        """
+        from matplotlib.transforms import Bbox
+
+        renderer = self.fig.canvas.get_renderer()
+        extents = extents + [a.get_window_extent(renderer) for a in artists]
+        extents = [b for b in extents if b.width and np.isfinite(b.bounds).all()]
+        content = Bbox.union([self.static_bbox] + extents)
+        if not self.fig.bbox.contains(content.x0, content.y0) or not self.fig.bbox.contains(content.x1, content.y1):
+            return None
+        bbox = content.padded(0.1 * self.dpi)
+        width, height = int(self.fig.bbox.width), int(self.fig.bbox.height)
+        rows = slice(max(int(round(height - bbox.y1)), 0), min(int(round(height - bbox.y0)), height))
+        cols = slice(max(int(round(bbox.x0)), 0), min(int(round(bbox.x1)), width))
+        return rows, cols
+
+
+def _png_bytes(rgb: np.ndarray, dpi: int, level: int = PNG_COMPRESS_LEVEL) -> bytes:
+    """
+    Truecolour PNG with the Sub filter on every row. Pillow tries every
+    filter type per row, which costs more than zlib itself at low levels.
+    """
+    height, width, _ = rgb.shape
+    flat = rgb.reshape(height, width * 3)
+    raw = np.empty((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 0] = 1                                          # filter type: Sub
+    raw[:, 1:4] = flat[:, :3]
+    np.subtract(flat[:, 3:], flat[:, :-3], out=raw[:, 4:])  # wraps modulo 256, as PNG expects
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+    ppm = int(dpi / 0.0254 + 0.5)                          # pixels per metre, like Pillow
+    return b"".join([
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)),
+        chunk(b"pHYs", struct.pack(">IIB", ppm, ppm, 1)),
+        chunk(b"IDAT", zlib.compress(raw, level)),
+        chunk(b"IEND", b""),
+    ])
+
+
+_templates = {}   # dpi → _InfographicTemplate
+_template_lock = threading.Lock()
+
+
+def _get_template(dpi: int = DPI) -> _InfographicTemplate:
+    with _template_lock:
+        template = _templates.get(dpi)
+        if template is None:
+            template = _templates[dpi] = _InfographicTemplate(dpi)
+        return template
+
+
+class _VectorTemplate:
+    """
+    One figure holding the static layer, reused for every vector render: the
+    dynamic artists are added, the figure is saved, and they are removed again.
+    """
+
+    def __init__(self):
+        from matplotlib.figure import Figure
+
+        self.fig = Figure(figsize=(9, 16), dpi=DPI, facecolor=BG)
+        self.axes = _draw_static(self.fig)
+        self.lock = threading.Lock()
+
+    def save(self, results: dict, target, fmt: str):
+        with self.lock:
+            artists = _draw_dynamic(self.axes, results)
+            try:
+                self.fig.savefig(target, format=fmt, dpi=DPI, bbox_inches="tight", facecolor=BG)
+            finally:
+                for artist in artists:
+                    artist.remove()
+
+
+_vector_template = None
+
+
+def write_infographic(results: dict, target, fmt: str = "pdf"):
+    """
+    Save the infographic for ``results`` as SVG or PDF to ``target`` (path,
+    file object or an open ``PdfPages``, which receives one more page),
+    reusing a single figure across calls.
+    """
+    global _vector_template
+    with _template_lock:
+        if _vector_template is None:
+            _vector_template = _VectorTemplate()
+    _vector_template.save(results, target, fmt)
+
+
+def warm_up():
+    """Import the plotting stack and draw the default PNG template ahead of the first request."""
+    _pyplot()
+    _get_template(DPI)
+
+
+def generate_infographic(results: dict, fmt: str = "png") -> BytesIO:
+    """
+    Render a 9×16 portrait infographic in one of ``EXPORT_FORMATS`` and
+    return it in a BytesIO buffer. Raster formats use the template renderer,
+    SVG and PDF go through Matplotlib's vector backends.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Format tidak dikenal: {fmt!r} (pilihan: {', '.join(EXPORT_FORMATS)})")
+    buf = BytesIO()
+    with metrics.timer("gk_infographic_render_seconds", format=fmt):
+        if fmt in ("svg", "pdf"):
+            with metrics.timer("gk_infographic_savefig_seconds", format=fmt):
+                write_infographic(results, buf, fmt)
+        else:
+            dpi = PREVIEW_DPI if fmt == "png-preview" else DPI
+            rgb = _get_template(dpi).render_rgb(results)
+            with metrics.timer("gk_infographic_savefig_seconds", format=fmt):
+                if fmt == "png-palette":
+                    from PIL import Image
+
+                    # Trades encode time for size: ~3.5x smaller than "png". Median
+                    # cut keeps the pale card backgrounds that octree merges into
+                    # white and leaves the white background exact.
+                    image = Image.fromarray(rgb).quantize(PALETTE_COLORS, method=Image.Quantize.MEDIANCUT)
+                    image.save(buf, format="png", dpi=(dpi, dpi))
+                else:
+                    buf.write(_png_bytes(rgb, dpi))
+    metrics.observe("gk_infographic_bytes", buf.tell(), format=fmt)
+    buf.seek(0)
+    return buf
+
+
+# ---------- Content-addressed image cache ----------
+def results_key(results: dict, fmt: str = "png") -> str:
+    """
+    Stable hash of a results dict, suffixed with the export format. Every
+    key is part of the hash; the footer's generation time is not in the
+    dict, so a cached image keeps the time it was first rendered.
+    """
+    payload = json.dumps(results, sort_keys=True, default=str, ensure_ascii=False)
+    return f"{hashlib.sha256(payload.encode('utf-8')).hexdigest()}.{fmt}"
+
+
+class PngCache:
+    """
+    Thread-safe LRU of encoded images (PNG, SVG, PDF) capped by total size.
+    Concurrent requests for a key that is being rendered wait for that
+    render instead of starting their own.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._inflight = {}
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            png = self._data.get(key)
+            if png is not None:
+                self._data.move_to_end(key)
+            return png
+
+    def put(self, key: str, png: bytes):
+        if len(png) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._size -= len(self._data.pop(key))
+            self._data[key] = png
+            self._size += len(png)
+            while self._size > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._size -= len(evicted)
+
+    def get_or_render(self, key: str, render) -> bytes:
+        while True:
+            with self._lock:
+                png = self._data.get(key)
+                if png is not None:
+                    self._data.move_to_end(key)
+                    return png
+                event = self._inflight.get(key)
+                if event is None:
+                    event = self._inflight[key] = threading.Event()
+                    break
+            event.wait()
+        try:
+            png = render()
+            self.put(key, png)
+            return png
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+
+png_cache = PngCache(int(os.getenv("GK_INFOGRAPHIC_CACHE_BYTES", str(64 * 1024 * 1024))))
+
+
+def infographic_bytes(results: dict, fmt: str = "png") -> bytes:
+    """Encoded infographic for ``results`` in ``fmt``, served from the cache when identical."""
+    return png_cache.get_or_render(
+        results_key(results, fmt),
+        lambda: generate_infographic(results, fmt).getvalue(),
+    )
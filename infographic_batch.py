@@ -0,0 +1,128 @@
+"""
+Bulk infographic generation.
+
+Reads many households from a JSON Lines file and writes one infographic per
+household, either as entries of a ZIP archive or as pages of one PDF. Every
+render reuses the same template figure, and each image is written to the
+output as soon as it is drawn, so memory stays flat regardless of batch size.
+
+Each input line is either a results dict as produced by
+``engine.klasifikasi_rumah_tangga`` or its input:
+    {"anggota_data": [...], "pengeluaran_data": [...],
+     "garis_kemiskinan": 600000, "selected_wilayah": "Kota Banda Aceh"}
+An optional "id_rt" is used in the ZIP entry names.
+
+Usage:
+    python infographic_batch.py rumah_tangga.jsonl hasil.zip [--format png-palette]
+    python infographic_batch.py rumah_tangga.jsonl hasil.pdf
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import zipfile
+
+from engine import klasifikasi_rumah_tangga
+from infographic import EXPORT_FORMATS, generate_infographic, write_infographic
+
+
+def iter_results(path: str):
+    """Yield a results dict per non-empty line, classifying raw household input on the fly."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "status" not in record:
+                try:
+                    results = klasifikasi_rumah_tangga(
+                        record["anggota_data"],
+                        record["pengeluaran_data"],
+                        record["garis_kemiskinan"],
+                        record.get("selected_wilayah"),
+                    )
+                except KeyError as e:
+                    raise ValueError(f"Baris {line_no}: kolom {e} tidak ada") from None
+                if "id_rt" in record:
+                    results["id_rt"] = record["id_rt"]
+                record = results
+            yield record
+
+
+def _entry_name(index: int, results: dict, ext: str) -> str:
+    label = results.get("id_rt") or results.get("selected_wilayah") or "rumah_tangga"
+    safe_name = re.sub(r'[^\w\-]', '_', str(label))
+    return f"{index:05d}_{safe_name}.{ext}"
+
+
+def write_zip(results_iter, output, fmt: str = "png", progress=None) -> int:
+    """
+    Write one ``fmt`` image per results dict into the ZIP ``output`` (path or
+    binary file object). Returns the number of images written.
+    """
+    ext, _ = EXPORT_FORMATS[fmt]
+    # PNG is already deflated; compressing it again only costs time
+    compression = zipfile.ZIP_STORED if ext == "png" else zipfile.ZIP_DEFLATED
+    count = 0
+    with zipfile.ZipFile(output, "w", compression=compression) as zf:
+        for results in results_iter:
+            count += 1
+            zf.writestr(_entry_name(count, results, ext), generate_infographic(results, fmt).getvalue())
+            if progress is not None:
+                progress(count)
+    return count
+
+
+def write_pdf(results_iter, output, progress=None) -> int:
+    """
+    Write one page per results dict into the multi-page PDF ``output`` (path
+    or binary file object). Returns the number of pages written.
+    """
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    count = 0
+    with PdfPages(output) as pdf:
+        for results in results_iter:
+            write_infographic(results, pdf, "pdf")
+            count += 1
+            if progress is not None:
+                progress(count)
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Buat infographic untuk banyak rumah tangga sekaligus (ZIP atau PDF multi-halaman)."
+    )
+    parser.add_argument("input", help="file JSON Lines, satu rumah tangga per baris")
+    parser.add_argument("output", help="file hasil (.zip atau .pdf)")
+    parser.add_argument(
+        "--format", choices=list(EXPORT_FORMATS), default="png",
+        help="format gambar di dalam ZIP (diabaikan untuk .pdf)",
+    )
+    parser.add_argument("-q", "--quiet", action="store_true", help="tanpa laporan progres")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+
+    def progress(count):
+        if not args.quiet and count % 50 == 0:
+            rate = count / (time.perf_counter() - t0)
+            print(f"{count:,} gambar, {rate:.1f} gambar/detik", file=sys.stderr)
+
+    results_iter = iter_results(args.input)
+    ext = os.path.splitext(args.output)[1].lower()
+    if ext == ".pdf":
+        count = write_pdf(results_iter, args.output, progress)
+    elif ext == ".zip":
+        count = write_zip(results_iter, args.output, args.format, progress)
+    else:
+        sys.exit("File hasil harus berakhiran .zip atau .pdf")
+    if not args.quiet:
+        print(f"Selesai: {count:,} gambar dalam {time.perf_counter() - t0:.1f} detik", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Hot-path timings and counters, exported in Prometheus text format.
+
+Off unless ``GK_METRICS`` is set; when off every call returns at the first
+check, so the instrumented code pays one attribute lookup per call.
+
+    with metrics.timer("gk_load_data_seconds") as t:
+        df, status = load_data()
+        t.labels["source"] = status["source"]
+
+``render_text`` gives the exposition text, served at ``/metrics`` by
+``start_http_server`` (``GK_METRICS_PORT``) and by ``api.py``. With
+``GK_METRICS_LOG`` each observation is also logged as one JSON line on the
+``metrics`` logger. Worker processes call ``forward_to_parent`` and send
+``drain()`` back with their results; the parent feeds it to ``replay``.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_ENABLED = os.getenv("GK_METRICS", "") not in ("", "0")
+METRICS_PORT = int(os.getenv("GK_METRICS_PORT", "0"))     # 0: no standalone endpoint
+METRICS_LOG = os.getenv("GK_METRICS_LOG", "") not in ("", "0")
+
+# Histogram buckets: seconds, and bytes for image sizes
+BUCKETS_SECONDS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_BYTES = (10_000, 25_000, 50_000, 100_000, 250_000, 500_000, 1_000_000, 2_500_000)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# name → (type, help, buckets)
+METRICS = {
+    "gk_load_data_seconds": (
+        "histogram", "Durasi load_data per sumber data (API, lokal, dummy)", BUCKETS_SECONDS),
+    "gk_bps_requests_total": (
+        "counter", "Panggilan API BPS per hasil (ok, error, circuit_open)", None),
+    "gk_bps_request_seconds": (
+        "histogram", "Durasi panggilan API BPS termasuk retry", BUCKETS_SECONDS),
+    "gk_bps_retries_total": (
+        "counter", "Percobaan ulang panggilan API BPS", None),
+    "gk_klasifikasi_seconds": (
+        "histogram", "Durasi klasifikasi satu rumah tangga per asal (app, api)", BUCKETS_SECONDS),
+    "gk_infographic_render_seconds": (
+        "histogram", "Durasi generate_infographic per format", BUCKETS_SECONDS),
+    "gk_infographic_savefig_seconds": (
+        "histogram", "Durasi encode/savefig infographic per format", BUCKETS_SECONDS),
+    "gk_infographic_bytes": (
+        "histogram", "Ukuran file infographic per format", BUCKETS_BYTES),
+}
+
+logger = logging.getLogger("metrics")
+
+
+class Registry:
+    """Thread-safe counters and cumulative histograms keyed by (name, labels)."""
+
+    def __init__(self):
+        self._counters = {}     # (name, labels) → value
+        self._histograms = {}   # (name, labels) → [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+        self._forward = None    # events kept for the parent process, see forward_to_parent
+
+    def inc(self, name: str, amount: float = 1.0, labels: tuple = ()):
+        with self._lock:
+            if self._forward is not None:
+                self._forward.append(("inc", name, amount, labels))
+                return
+            key = (name, labels)
+            self._counters[key] = self._counters.get(key, 0.0) + amount
+
+    def observe(self, name: str, value: float, labels: tuple = ()):
+        buckets = METRICS[name][2]
+        with self._lock:
+            if self._forward is not None:
+                self._forward.append(("observe", name, value, labels))
+                return
+            state = self._histograms.get((name, labels))
+            if state is None:
+                state = self._histograms[(name, labels)] = [0] * len(buckets) + [0.0, 0]
+            for i, batas in enumerate(buckets):
+                if value <= batas:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def render(self) -> str:
+        """Prometheus text exposition of every metric seen so far."""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: list(state) for key, state in self._histograms.items()}
+        lines = []
+        for name, (kind, help_text, buckets) in METRICS.items():
+            series = counters if kind == "counter" else histograms
+            keys = sorted(key for key in series if key[0] == name)
+            if not keys:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key in keys:
+                labels = key[1]
+                if kind == "counter":
+                    lines.append(f"{name}{_labels(labels)} {_number(series[key])}")
+                    continue
+                state = series[key]
+                for batas, jumlah in zip(buckets, state):
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', _number(batas)),))} {jumlah}")
+                lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {state[-1]}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(state[-2])}")
+                lines.append(f"{name}_count{_labels(labels)} {state[-1]}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+registry = Registry()
+
+
+def _log(kind: str, name: str, value: float, labels: tuple):
+    if METRICS_LOG:
+        logger.info(json.dumps({"ts": time.time(), "metric": name, kind: value, **dict(labels)}, default=str))
+
+
+def inc(name: str, amount: float = 1.0, **labels):
+    """Add ``amount`` to a counter."""
+    if not METRICS_ENABLED:
+        return
+    key = tuple(sorted(labels.items()))
+    registry.inc(name, amount, key)
+    _log("inc", name, amount, key)
+
+
+def observe(name: str, value: float, **labels):
+    """Record one histogram observation."""
+    if not METRICS_ENABLED:
+        return
+    key = tuple(sorted(labels.items()))
+    registry.observe(name, value, key)
+    _log("value", name, value, key)
+
+
+class _Timer:
+    """Context manager observing its wall time; labels may be filled in inside the block."""
+
+    __slots__ = ("name", "labels", "_t0")
+
+    def __init__(self, name: str, labels: dict):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, time.perf_counter() - self._t0, **self.labels)
+
+
+class _NullTimer:
+    __slots__ = ("labels",)
+
+    def __init__(self):
+        self.labels = {}
+
+    def __enter__(self) -> "_NullTimer":
+        return self
+
+    def __exit__(self, *exc):
+        self.labels.clear()
+
+
+_NULL_TIMER = _NullTimer()
+
+
+def timer(name: str, **labels):
+    """Time a block into histogram ``name``; a shared no-op when metrics are off."""
+    if not METRICS_ENABLED:
+        return _NULL_TIMER
+    return _Timer(name, labels)
+
+
+def render_text() -> str:
+    return registry.render()
+
+
+# ---------- Worker processes ----------
+def forward_to_parent():
+    """Keep this process's observations as events for ``drain`` instead of aggregating them."""
+    with registry._lock:
+        registry._forward = []
+
+
+def drain() -> list:
+    """Events recorded since the last call (worker side)."""
+    with registry._lock:
+        events = registry._forward or []
+        if registry._forward is not None:
+            registry._forward = []
+    return events
+
+
+def replay(events: list):
+    """Record events drained in a worker process (parent side)."""
+    for kind, name, value, labels in events:
+        if kind == "inc":
+            registry.inc(name, value, labels)
+        else:
+            registry.observe(name, value, labels)
+
+
+# ---------- Standalone endpoint ----------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.split("?")[0].rstrip("/") != "/metrics":
+            self.send_error(404)
+            return
+        body = render_text().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_http_server(port: int = METRICS_PORT, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve ``/metrics`` from a daemon thread on a local port."""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="gk-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,123 @@
+"""
+Opt-in cProfile of one session: a full script rerun or one infographic render.
+
+Enabled for every session with ``GK_PROFILE=rerun|infographic``, or per
+session with ``?profile=rerun`` / ``?profile=infographic`` in the app URL
+once the operator allows it with ``GK_PROFILE_QUERY=1``; the URL switch is
+off by default so visitors cannot slow the server down. A rerun profile
+covers the page sections of full reruns only: a fragment rerun (one input
+section) is not profiled.
+
+Up to Python 3.11 cProfile hooks only the thread that runs the profiled
+code, so other sessions keep running unprofiled. From 3.12 it uses
+``sys.monitoring``, which is process-wide, so every session's calls would
+land in the stats: the rerun mode and the URL switch are refused there with
+a warning, and only ``GK_PROFILE=infographic`` (one render at a time, for
+the whole server) remains. A result holds the top functions by cumulative
+time and the raw stats in ``.prof`` format (``pstats`` / snakeviz). The
+process id is reported alongside so a live session can also be sampled
+with ``py-spy record --pid``.
+"""
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import sys
+import time
+from typing import NamedTuple
+
+PROFILE_MODES = ("rerun", "infographic")
+PROFILE_ENV = os.getenv("GK_PROFILE", "")
+PROFILE_QUERY = os.getenv("GK_PROFILE_QUERY", "") == "1"
+# cProfile on sys.monitoring: one hook for the whole process, not per thread
+PROFILE_PROCESS_WIDE = sys.version_info >= (3, 12)
+PROFILE_TOP = int(os.getenv("GK_PROFILE_TOP", "25"))
+
+
+class HasilProfil(NamedTuple):
+    label: str
+    durasi: float            # wall seconds
+    top: list[dict]          # rows sorted by cumulative time
+    prof: bytes              # marshalled stats, as written by ``pstats.Stats.dump_stats``
+    pid: int
+
+
+class ModeProfil(NamedTuple):
+    mode: str | None
+    peringatan: str | None   # why a requested mode was refused
+
+
+def mode_profil(query_value: str | None = None, process_wide: bool = PROFILE_PROCESS_WIDE) -> ModeProfil:
+    """
+    Profiling mode from the query parameter (only with GK_PROFILE_QUERY=1),
+    else GK_PROFILE; "1" means a rerun. With a process-wide profiler the
+    per-session modes are refused.
+    """
+    if not PROFILE_QUERY:
+        query_value = None
+    for value, dari_query in ((query_value, True), (PROFILE_ENV, False)):
+        if value:
+            value = "rerun" if value == "1" else value
+            if value in PROFILE_MODES:
+                break
+    else:
+        return ModeProfil(None, None)
+    if process_wide and (dari_query or value == "rerun"):
+        return ModeProfil(None, (
+            f"Profil '{value}' tidak tersedia pada Python {sys.version_info.major}.{sys.version_info.minor}: "
+            "cProfile di sini mencatat seluruh proses, termasuk sesi lain. "
+            f"Gunakan `py-spy record --pid {os.getpid()}`."
+        ))
+    return ModeProfil(value, None)
+
+
+class Profiler:
+    """cProfile wrapper that may be stopped from a later rerun if the first never finished."""
+
+    def __init__(self, label: str):
+        self.label = label
+        self._profile = cProfile.Profile()
+        self._t0 = None
+        self.hasil = None
+
+    def start(self) -> bool:
+        """Enable profiling; False when another profiler already holds the hook (Python 3.12+)."""
+        try:
+            self._profile.enable()
+        except ValueError:
+            return False
+        self._t0 = time.perf_counter()
+        return True
+
+    def stop(self, top: int = PROFILE_TOP) -> HasilProfil | None:
+        if self._t0 is None:
+            return None
+        self._profile.disable()
+        durasi = time.perf_counter() - self._t0
+        self._t0 = None
+        return ringkas(self._profile, self.label, durasi, top)
+
+    def __enter__(self) -> "Profiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.hasil = self.stop()
+
+
+def ringkas(profile: cProfile.Profile, label: str, durasi: float, top: int = PROFILE_TOP) -> HasilProfil:
+    """Top-N rows by cumulative time plus the ``.prof`` bytes of a finished profile."""
+    stats = pstats.Stats(profile, stream=io.StringIO())
+    stats.sort_stats(pstats.SortKey.CUMULATIVE)
+    rows = []
+    for func in stats.fcn_list[:top]:
+        primitive, ncalls, tottime, cumtime, _ = stats.stats[func]
+        filename, line, name = func
+        rows.append({
+            "fungsi": f"{os.path.basename(filename)}:{line}({name})" if line else name,
+            "ncalls": str(ncalls) if primitive == ncalls else f"{ncalls}/{primitive}",
+            "tottime_ms": round(tottime * 1000, 3),
+            "cumtime_ms": round(cumtime * 1000, 3),
+        })
+    return HasilProfil(label, durasi, rows, marshal.dumps(stats.stats), os.getpid())
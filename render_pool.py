@@ -0,0 +1,150 @@
+"""
+Process pool for infographic rendering.
+
+Renders run in worker processes (Agg backend, own Matplotlib state), so
+renders from different sessions use separate cores and never block a
+Streamlit script thread. Callers submit a job and poll for its image bytes.
+The queue is bounded (backpressure) and every job has a deadline.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import NamedTuple
+
+import metrics
+from infographic import EXPORT_FORMATS, generate_infographic, png_cache, results_key, warm_up
+
+RENDER_WORKERS = int(os.getenv("GK_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+RENDER_QUEUE = int(os.getenv("GK_RENDER_QUEUE", str(4 * RENDER_WORKERS)))
+RENDER_TIMEOUT = float(os.getenv("GK_RENDER_TIMEOUT", "30"))
+
+
+class RenderQueueFull(RuntimeError):
+    """Raised by ``submit`` when the number of pending jobs hits the limit."""
+
+
+class JobStatus(NamedTuple):
+    state: str                 # "pending" | "done" | "error" | "timeout" | "unknown"
+    data: bytes | None = None
+    error: str | None = None
+
+
+def _init_worker():
+    # Pay the Matplotlib import, font cache and template drawing once per worker
+    warm_up()
+    # Render timings are recorded by the parent, which serves the metrics
+    metrics.forward_to_parent()
+
+
+def _render(results: dict, fmt: str) -> tuple[bytes, list]:
+    return generate_infographic(results, fmt).getvalue(), metrics.drain()
+
+
+class RenderPool:
+    """
+    Bounded job queue in front of a ``ProcessPoolExecutor``.
+
+    Job ids are the content hash of the results plus the export format, so
+    identical requests share one job and a finished render is served from
+    the image cache. A job that
+    exceeds ``timeout`` is reported as "timeout" and its result discarded;
+    a render already running keeps counting towards ``max_pending`` until
+    its worker is free again. When a worker dies (e.g. OOM-killed) the
+    executor is rebuilt and the affected jobs report "error".
+    """
+
+    def __init__(
+        self,
+        workers: int = RENDER_WORKERS,
+        max_pending: int = RENDER_QUEUE,
+        timeout: float = RENDER_TIMEOUT,
+    ):
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.workers = workers
+        self._pool = self._new_pool()
+        self._jobs = {}        # job_id → (future, deadline, pool)
+        self._abandoned = []   # timed-out futures still occupying a worker
+        self._lock = threading.Lock()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+
+    def _rebuild(self, broken: ProcessPoolExecutor):
+        """Replace a broken executor (caller holds the lock); a no-op if it was already replaced."""
+        if self._pool is broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+            self._pool = self._new_pool()
+
+    def _pending(self) -> int:
+        self._abandoned = [future for future in self._abandoned if not future.done()]
+        return len(self._abandoned) + sum(not future.done() for future, _, _ in self._jobs.values())
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._pending()
+
+    def submit(self, results: dict, fmt: str = "png") -> str:
+        """Queue a render in ``fmt`` and return its job id. Raises RenderQueueFull under load."""
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Format tidak dikenal: {fmt!r}")
+        job_id = results_key(results, fmt)
+        if png_cache.get(job_id) is not None:
+            return job_id
+        with self._lock:
+            if job_id in self._jobs:
+                return job_id
+            pending = self._pending()
+            if pending >= self.max_pending:
+                raise RenderQueueFull(f"{pending} render sedang antre")
+            try:
+                future = self._pool.submit(_render, results, fmt)
+            except BrokenProcessPool:
+                self._rebuild(self._pool)
+                future = self._pool.submit(_render, results, fmt)
+            self._jobs[job_id] = (future, time.monotonic() + self.timeout, self._pool)
+        return job_id
+
+    def poll(self, job_id: str) -> JobStatus:
+        """Non-blocking status of a job; finished images move into the shared cache."""
+        data = png_cache.get(job_id)
+        if data is not None:
+            return JobStatus("done", data)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return JobStatus("unknown")
+            future, deadline, pool = job
+            if not future.done():
+                if time.monotonic() < deadline:
+                    return JobStatus("pending")
+                if not future.cancel():
+                    # Already running: the worker stays busy until the render ends
+                    self._abandoned.append(future)
+                del self._jobs[job_id]
+                return JobStatus("timeout", error=f"Render melebihi {self.timeout:.0f} detik")
+            # Cache before forgetting the job so concurrent pollers never see "unknown"
+            del self._jobs[job_id]
+            error = future.exception()
+            if isinstance(error, BrokenProcessPool):
+                self._rebuild(pool)
+                return JobStatus("error", error="Proses pembuat gambar berhenti mendadak. Silakan coba lagi.")
+            if error is not None:
+                return JobStatus("error", error=str(error))
+            data, events = future.result()
+            metrics.replay(events)
+            png_cache.put(job_id, data)
+        return JobStatus("done", data)
+
+    def wait(self, job_id: str, interval: float = 0.1) -> JobStatus:
+        """Poll until the job leaves the "pending" state."""
+        while True:
+            status = self.poll(job_id)
+            if status.state != "pending":
+                return status
+            time.sleep(interval)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
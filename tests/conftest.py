@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Modules live at the repository root
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# Tests never reach the real BPS API
+os.environ["BPS_API_KEY"] = ""
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from agregat import AkumulatorKemiskinan
+from engine import STATUS_LABELS
+
+MISKIN = "proporsi_" + STATUS_LABELS[0].lower().replace(" ", "_")
+MENENGAH = "proporsi_" + STATUS_LABELS[3].lower().replace(" ", "_")
+
+# kode, perkapita, garis, anggota, status_idx, bobot
+RUMAH_TANGGA = [
+    (1101, 50, 100, 2, 0, 1.0),
+    (1101, 150, 100, 3, 2, 2.0),
+    (1102, 75, 100, 1, 0, 3.0),
+    (1201, 200, 100, 4, 3, 1.0),
+]
+# Skipped: no poverty line (zero or NaN) or unknown status
+TANPA_GARIS = [
+    (1101, 10, 0, 5, 0, 1.0),
+    (1101, 10, np.nan, 5, 0, 1.0),
+    (1102, 10, 100, 5, -1, 1.0),
+]
+
+
+def _tambah(akumulator: AkumulatorKemiskinan, rumah_tangga: list, bobot: bool = True):
+    kode, y, z, orang, status, w = map(list, zip(*rumah_tangga))
+    akumulator.tambah(kode, y, z, orang, status, w if bobot else None)
+    return akumulator
+
+
+def _baris(df: pd.DataFrame, tingkat: str, kode: int) -> pd.Series:
+    (i,) = np.flatnonzero((df["tingkat"] == tingkat) & (df["kode_wilayah"] == kode))
+    return df.iloc[i]
+
+
+def test_fgt_per_kabupaten_unweighted():
+    df = _tambah(AkumulatorKemiskinan(), RUMAH_TANGGA, bobot=False).hasil(provinsi=False)
+    assert df["kode_wilayah"].tolist() == [1101, 1102, 1201]
+    r = _baris(df, "kabupaten", 1101)
+    # 5 persons: 2 poor with gap 0.5
+    assert (r["n_rumah_tangga"], r["n_individu"], r["populasi_tertimbang"]) == (2, 5, 5.0)
+    assert (r["P0"], r["P1"], r["P2"]) == pytest.approx((2 / 5, 2 * 0.5 / 5, 2 * 0.25 / 5))
+    assert (r[MISKIN], r[MENENGAH]) == pytest.approx((0.4, 0.0))
+    r = _baris(df, "kabupaten", 1201)
+    assert (r["P0"], r["P1"], r["P2"], r[MENENGAH]) == pytest.approx((0.0, 0.0, 0.0, 1.0))
+    # Without weights the weighted columns equal the unweighted ones
+    pd.testing.assert_series_equal(df["P1_tertimbang"], df["P1"], check_names=False)
+
+
+def test_fgt_weighted():
+    df = _tambah(AkumulatorKemiskinan(), RUMAH_TANGGA).hasil(provinsi=False)
+    r = _baris(df, "kabupaten", 1101)
+    # Weighted population 2*1 + 3*2 = 8, of which 2 poor
+    assert r["populasi_tertimbang"] == pytest.approx(8.0)
+    assert (r["P0_tertimbang"], r["P1_tertimbang"], r["P2_tertimbang"]) == pytest.approx((2 / 8, 1 / 8, 0.5 / 8))
+    assert r["P0"] == pytest.approx(2 / 5)
+    r = _baris(df, "kabupaten", 1102)
+    assert (r["populasi_tertimbang"], r["P1_tertimbang"], r["P2_tertimbang"]) == pytest.approx((3.0, 0.25, 0.0625))
+
+
+def test_provinsi_roll_up():
+    df = _tambah(AkumulatorKemiskinan(), RUMAH_TANGGA).hasil({1100: "ACEH", 1101: "Simeulue"})
+    assert df["tingkat"].tolist() == ["kabupaten"] * 3 + ["provinsi"] * 2
+    r = _baris(df, "provinsi", 1100)
+    assert r["nama_wilayah"] == "ACEH"
+    assert (r["n_rumah_tangga"], r["n_individu"]) == (3, 6)
+    assert (r["P0"], r["P1"], r["P2"]) == pytest.approx((3 / 6, 1.25 / 6, 0.5625 / 6))
+    assert r["populasi_tertimbang"] == pytest.approx(11.0)
+    assert (r["P0_tertimbang"], r["P1_tertimbang"], r["P2_tertimbang"]) == pytest.approx(
+        (5 / 11, 1.75 / 11, 0.6875 / 11)
+    )
+    r = _baris(df, "provinsi", 1200)
+    assert (r["n_individu"], r["P0"], r[MENENGAH]) == (4, 0.0, 1.0)
+    assert pd.isna(_baris(df, "kabupaten", 1102)["nama_wilayah"])
+
+
+def test_households_without_a_poverty_line_are_dropped():
+    df = _tambah(AkumulatorKemiskinan(), RUMAH_TANGGA + TANPA_GARIS).hasil()
+    pd.testing.assert_frame_equal(df, _tambah(AkumulatorKemiskinan(), RUMAH_TANGGA).hasil())
+    assert _tambah(AkumulatorKemiskinan(), TANPA_GARIS).hasil().empty
+
+
+def test_gabung_equals_one_accumulator():
+    satu = _tambah(AkumulatorKemiskinan(), RUMAH_TANGGA).hasil()
+    # The second accumulator reaches a higher kode than the first
+    kiri = _tambah(AkumulatorKemiskinan(), RUMAH_TANGGA[:1])
+    kanan = _tambah(AkumulatorKemiskinan(), RUMAH_TANGGA[1:])
+    pd.testing.assert_frame_equal(kiri.gabung(kanan).hasil(), satu)
+    kiri = _tambah(AkumulatorKemiskinan(), RUMAH_TANGGA[1:])
+    kanan = _tambah(AkumulatorKemiskinan(), RUMAH_TANGGA[:1])
+    pd.testing.assert_frame_equal(kiri.gabung(kanan).hasil(), satu, check_exact=False)
@@ -0,0 +1,97 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+import api
+from api import ApiError, KlasifikasiService
+
+
+def _rumah_tangga(**ubah):
+    body = {
+        "garis_kemiskinan": 600000,
+        "anggota_data": [{"hubungan": "Saya", "umur": 40, "pendidikan": "SMA", "pekerjaan": "Petani"}],
+        "pengeluaran_data": [{"rentang": "Bulanan", "kategori": "Makanan", "nilai": 1500000}],
+    }
+    body.update(ubah)
+    return body
+
+
+@pytest.fixture
+def service():
+    # Every body carries garis_kemiskinan, so the refresher is never consulted
+    return KlasifikasiService(refresher=None)
+
+
+@pytest.fixture
+def server(service):
+    srv = api.make_server("127.0.0.1", 0, refresher=object())
+    srv.RequestHandlerClass.service = service
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_klasifikasi_valid(service):
+    results = service.klasifikasi(_rumah_tangga())
+    assert results["total_pengeluaran"] == 1500000
+    assert results["anggota_data"][0]["umur"] == 40
+
+
+@pytest.mark.parametrize("nilai", [-1, -0.5, float("nan"), float("inf")])
+def test_nilai_negatif_ditolak(service, nilai):
+    body = _rumah_tangga(pengeluaran_data=[{"rentang": "Bulanan", "kategori": "Makanan", "nilai": nilai}])
+    with pytest.raises(ApiError) as e:
+        service.klasifikasi(body)
+    assert e.value.status == 400
+    assert "pengeluaran_data[0].nilai" in str(e.value)
+
+
+@pytest.mark.parametrize("umur", ["empat puluh", None, [40], True, -1, 40.5])
+def test_umur_tidak_valid_ditolak(service, umur):
+    body = _rumah_tangga(anggota_data=[{"hubungan": "Saya", "umur": umur}])
+    with pytest.raises(ApiError) as e:
+        service.klasifikasi(body)
+    assert e.value.status == 400
+    assert "anggota_data[0].umur" in str(e.value)
+
+
+def test_umur_angka_string_diterima(service):
+    results = service.klasifikasi(_rumah_tangga(anggota_data=[{"hubungan": "Saya", "umur": "40"}]))
+    assert results["anggota_data"][0]["umur"] == 40
+
+
+def _post(conn, path, body: bytes):
+    conn.request("POST", path, body=body, headers={"Content-Type": "application/json"})
+    response = conn.getresponse()
+    return response.status, response.getheader("Connection"), response.read()
+
+
+def test_body_terlalu_besar_menutup_koneksi(server, monkeypatch):
+    monkeypatch.setattr(api, "API_MAX_BODY", 400)
+    host, port = server.server_address[:2]
+    conn = http.client.HTTPConnection(host, port, timeout=5)
+    status, connection, body = _post(conn, "/klasifikasi", json.dumps(_rumah_tangga(padding="x" * 500)).encode())
+    assert status == 413
+    assert connection == "close"
+    assert "error" in json.loads(body)
+
+    # The client reconnects; the next request is not parsed from the leftover body
+    status, _, body = _post(conn, "/klasifikasi", json.dumps(_rumah_tangga()).encode())
+    assert status == 200
+    assert json.loads(body)["total_pengeluaran"] == 1500000
+    conn.close()
+
+
+def test_keep_alive_setelah_400(server):
+    host, port = server.server_address[:2]
+    conn = http.client.HTTPConnection(host, port, timeout=5)
+    body = _rumah_tangga(pengeluaran_data=[{"rentang": "Bulanan", "nilai": -5}])
+    status, connection, _ = _post(conn, "/klasifikasi", json.dumps(body).encode())
+    assert status == 400
+    assert connection is None   # body was read, the connection stays usable
+    status, _, _ = _post(conn, "/klasifikasi", json.dumps(_rumah_tangga()).encode())
+    assert status == 200
+    conn.close()
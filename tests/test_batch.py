@@ -0,0 +1,124 @@
+import functools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import batch_cli
+from batch import ParallelClassifier, classify_frame, household_ranges
+from engine import RENTANG_OPTIONS, STATUS_LADDER, klasifikasi_rumah_tangga
+
+COLUMNS = ["id_rt", "kode_wilayah", "jumlah_anggota", "rentang", "nilai"]
+
+
+def _pengeluaran(n_rt: int, seed: int = 0) -> pd.DataFrame:
+    # Households of 1..9 contiguous expense lines
+    rng = np.random.default_rng(seed)
+    baris = rng.integers(1, 10, n_rt)
+    rt = np.repeat(np.arange(n_rt), baris)
+    return pd.DataFrame({
+        "id_rt": np.char.add("RT", rt.astype(str)).astype(object),
+        "kode_wilayah": np.repeat(rng.choice([1101, 1171, 3201, 9471], n_rt), baris),
+        "jumlah_anggota": np.repeat(rng.integers(1, 8, n_rt), baris),
+        "rentang": np.array(RENTANG_OPTIONS, dtype=object)[rng.integers(0, 3, len(rt))],
+        "nilai": rng.integers(0, 2_000_000, len(rt)),
+    })
+
+
+LOOKUP = np.full(10_000, np.nan)
+LOOKUP[[1101, 1171, 3201]] = [550_000.0, 650_000.0, 500_000.0]
+
+
+def test_household_ranges_cut_between_households():
+    id_rt = np.array(["a", "a", "a", "b", "c", "c", "c", "c", "d"])
+    ranges = household_ranges(id_rt, 4)
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(id_rt)
+    for (_, stop), (start, _) in zip(ranges, ranges[1:]):
+        assert stop == start and id_rt[start] != id_rt[start - 1]
+
+
+def test_household_ranges_more_parts_than_households():
+    assert household_ranges(np.array(["a"] * 5), 3) == [(0, 5)]
+    assert household_ranges(np.array([], dtype=object), 3) == []
+
+
+def test_csv_ranges_align_to_households(tmp_path):
+    df = _pengeluaran(500)
+    path = tmp_path / "input.csv"
+    df.to_csv(path, index=False)
+    header, ranges = batch_cli.csv_ranges(str(path), chunksize=200, parts=3)
+    assert header == COLUMNS and len(ranges) > 3
+
+    parts = [batch_cli.read_csv_range(str(path), start, stop, header, COLUMNS) for start, stop in ranges]
+    pd.testing.assert_frame_equal(pd.concat(parts, ignore_index=True), df)
+    for before, after in zip(parts, parts[1:]):
+        assert before["id_rt"].iat[-1] != after["id_rt"].iat[0]
+
+
+def test_parallel_classify_matches_serial():
+    df = _pengeluaran(2_000)
+    with ParallelClassifier(LOOKUP, workers=2) as classifier:
+        pd.testing.assert_frame_equal(classifier.classify(df), classify_frame(df, LOOKUP))
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_parallel_tasks_match_serial(tmp_path, suffix):
+    pytest.importorskip("pyarrow")
+    df = _pengeluaran(2_000, seed=1)
+    path = str(tmp_path / f"input{suffix}")
+    if suffix == ".csv":
+        df.to_csv(path, index=False)
+    else:
+        df.to_parquet(path, index=False)
+    finish = functools.partial(batch_cli._siapkan_output, csv_output=True, agregat=True, bobot=None)
+
+    serial = list(batch_cli._classify_serial(path, 3_000, COLUMNS, LOOKUP, finish))
+    with ParallelClassifier(LOOKUP, workers=2) as classifier:
+        parallel = list(classifier.classify_tasks(batch_cli.parallel_tasks(path, 3_000, COLUMNS, 2), finish))
+
+    assert sum(n for n, _ in parallel) == len(df)
+    assert "".join(out for _, (_, out, _) in parallel) == "".join(out for _, (_, out, _) in serial)
+    kode = np.concatenate([args[0] for _, (_, _, args) in parallel])
+    np.testing.assert_array_equal(kode, np.concatenate([args[0] for _, (_, _, args) in serial]))
+
+
+def _rumah_tangga_acak(rng: np.random.Generator, n_rt: int) -> tuple[list[tuple], dict]:
+    """
+    Households as (kode, jumlah anggota, pengeluaran rows) plus the poverty
+    lines: random expenses, or per-capita spend exactly on or just under a threshold.
+    """
+    garis = {1101: 550_000, 1171: 650_000, 3201: 500_000}
+    rumah_tangga = []
+    for i in range(n_rt):
+        kode = int(rng.choice(list(garis)))
+        anggota = int(rng.integers(0, 8))
+        if i % 2:
+            rows = [
+                {"rentang": str(rng.choice(RENTANG_OPTIONS)), "nilai": float(rng.choice([0, rng.integers(0, 5_000_000),
+                                                                                          rng.uniform(0, 5_000_000)]))}
+                for _ in range(rng.integers(1, 10))
+            ]
+        else:
+            batas = rng.choice([b for b, _, _ in STATUS_LADDER if b is not None])
+            nilai = batas * garis[kode] * max(anggota, 1) - rng.choice([0, 1])
+            rows = [{"rentang": "Bulanan", "nilai": float(nilai)}]
+        rumah_tangga.append((kode, anggota, rows))
+    return rumah_tangga, garis
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_classify_frame_matches_engine(seed):
+    rumah_tangga, garis = _rumah_tangga_acak(np.random.default_rng(seed), 400)
+    df = pd.DataFrame([
+        {"id_rt": f"RT{i}", "kode_wilayah": kode, "jumlah_anggota": anggota, **row}
+        for i, (kode, anggota, rows) in enumerate(rumah_tangga)
+        for row in rows
+    ])
+    result = classify_frame(df, garis)
+    assert len(result) == len(rumah_tangga)
+    for (kode, anggota, rows), batch_row in zip(rumah_tangga, result.itertuples()):
+        expected = klasifikasi_rumah_tangga([{}] * anggota, rows, garis[kode])
+        assert batch_row.status == expected["status"]
+        assert batch_row.color == expected["color"]
+        for field in ("total_pengeluaran", "pengeluaran_perkapita", "rasio"):
+            assert getattr(batch_row, field) == expected[field], field
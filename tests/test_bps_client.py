@@ -0,0 +1,140 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from bps_client import BpsClient, CircuitBreaker, CircuitOpen
+
+OK_BODY = {"status": "OK", "last_update": "2025-01-01", "datacontent": {}}
+
+
+class MockBps:
+    """
+    Scripted BPS API: each request to .../var/<var>/... pops the next reply of
+    that var, ``(status, body)``; an empty script answers 200. A request
+    whose If-None-Match equals ``etag`` gets 304.
+    """
+
+    def __init__(self):
+        self.replies = {}
+        self.requests = []
+        self.etag = '"v1"'
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = self.path.split("/")
+                var = int(parts[parts.index("var") + 1])
+                mock.requests.append((var, self.headers.get("If-None-Match")))
+                if self.headers.get("If-None-Match") == mock.etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                script = mock.replies.get(var, [])
+                status, body = script.pop(0) if script else (200, OK_BODY)
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.send_header("ETag", mock.etag)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/v1/api/list"
+
+
+@pytest.fixture
+def mock():
+    mock = MockBps()
+    threading.Thread(target=mock.server.serve_forever, daemon=True).start()
+    yield mock
+    mock.server.shutdown()
+    mock.server.server_close()
+
+
+def _client(mock, **kwargs):
+    kwargs.setdefault("breaker", CircuitBreaker(failure_threshold=2, reset_timeout=0.2))
+    return BpsClient(mock.url, "kunci", timeout=2, backoff=0.001, backoff_max=0.001, **kwargs)
+
+
+def test_retries_transient_errors(mock):
+    mock.replies[1] = [(503, {}), (502, {})]
+    client = _client(mock, retries=3)
+    api_data, etag = client.get(1, 2025)
+    assert api_data == OK_BODY and etag == '"v1"'
+    assert len(mock.requests) == 3
+    assert client.metrics()["retries"] == 2 and client.breaker.state == "closed"
+
+
+def test_gives_up_after_retries_and_skips_other_4xx(mock):
+    mock.replies[1] = [(503, {})] * 3
+    mock.replies[2] = [(404, {})]
+    client = _client(mock, retries=2)
+    with pytest.raises(Exception):
+        client.get(1, 2025)
+    assert len(mock.requests) == 3
+    with pytest.raises(Exception):
+        client.get(2, 2025)
+    assert len(mock.requests) == 4
+    assert client.breaker.failures == 0   # the 404 was an answer, not an outage
+
+
+def test_not_modified(mock):
+    client = _client(mock)
+    assert client.get(1, 2025, etag='"v1"') == (None, '"v1"')
+    assert mock.requests == [(1, '"v1"')]
+    assert client.get(1, 2025, etag='"v0"') == (OK_BODY, '"v1"')
+
+
+def test_breaker_open_half_open_closed(mock):
+    mock.replies[1] = [(503, {})] * 2
+    client = _client(mock, retries=0)
+    for _ in range(2):
+        with pytest.raises(Exception):
+            client.get(1, 2025)
+    assert client.breaker.state == "open"
+
+    with pytest.raises(CircuitOpen):
+        client.get(1, 2025)
+    assert len(mock.requests) == 2   # rejected without calling the API
+
+    time.sleep(0.25)
+    assert client.breaker.state == "half-open"
+    assert client.get(1, 2025)[0] == OK_BODY
+    assert client.breaker.state == "closed" and len(mock.requests) == 3
+
+
+def test_failed_half_open_trial_reopens(mock):
+    mock.replies[1] = [(503, {})] * 3
+    client = _client(mock, retries=0)
+    for _ in range(2):
+        with pytest.raises(Exception):
+            client.get(1, 2025)
+    time.sleep(0.25)
+    with pytest.raises(Exception):
+        client.get(1, 2025)
+    assert client.breaker.state == "open"
+
+
+def test_fetch_many_counts_failures_per_batch(mock):
+    client = _client(mock, retries=0)
+    for _ in range(2):
+        mock.replies[2] = [(503, {})]
+        ok, failed = client.get_many([(1, 2025, None), (2, 2025, None)])
+        assert ok[0] == OK_BODY and isinstance(failed, Exception)
+    # A succeeding key no longer resets the failures of the other one
+    assert client.breaker.state == "open"
+
+    n = len(mock.requests)
+    results = client.get_many([(1, 2025, None), (2, 2025, None)])
+    assert all(isinstance(r, CircuitOpen) for r in results) and len(mock.requests) == n
+
+    time.sleep(0.25)
+    assert [r[0] for r in client.get_many([(1, 2025, None), (2, 2025, None)])] == [OK_BODY, OK_BODY]
+    assert client.breaker.state == "closed"
@@ -0,0 +1,181 @@
+import os
+import time
+
+import pandas as pd
+import pytest
+
+import data_loader
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_loader, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(data_loader, "GARIS_TAHUNAN_PATH", str(tmp_path / "tahunan.npy"))
+    return tmp_path
+
+
+def _tulis_tahun(tahun: int, garis: float, mtime: float):
+    path = data_loader._cache_path(data_loader.BPS_VAR, tahun)
+    df = pd.DataFrame({"kode_wilayah": [1101, 1102], "nama_wilayah": ["A", "B"], "garis_kemiskinan": [garis, garis]})
+    data_loader._write_cache(path, df, source="API", last_update="x", checked_at=mtime)
+    os.utime(path, (mtime, mtime))
+
+
+def test_garis_tahunan_rebuilt_when_a_cache_is_newer(cache_dir):
+    lama, baru = data_loader.BPS_TAHUN_LIST[:2]
+    _tulis_tahun(lama, 500_000, mtime=1_000)
+    data_loader.build_garis_tahunan()
+    os.utime(data_loader.GARIS_TAHUNAN_PATH, (2_000, 2_000))
+
+    # Unchanged caches: the saved store is opened as is
+    assert not data_loader._garis_tahunan_usang()
+    assert set(data_loader.load_garis_tahunan().tahun_tersedia()) == {lama + 1900}
+
+    # A year refreshed (or added) after the store was saved triggers a rebuild
+    _tulis_tahun(baru, 550_000, mtime=3_000)
+    assert data_loader._garis_tahunan_usang()
+    assert set(data_loader.load_garis_tahunan().tahun_tersedia()) == {lama + 1900, baru + 1900}
+    assert not data_loader._garis_tahunan_usang()
+
+
+@pytest.mark.parametrize("response", [
+    (None, '"v2"'),                                   # 304 Not Modified
+    ({"status": "OK", "last_update": "x"}, '"v2"'),    # same last_update
+    RuntimeError("API down"),
+])
+def test_unchanged_revalidation_keeps_mtime(cache_dir, response):
+    tahun = data_loader.BPS_TAHUN_LIST[0]
+    _tulis_tahun(tahun, 500_000, mtime=1_000)
+    path = data_loader._cache_path(data_loader.BPS_VAR, tahun)
+    cached = data_loader._read_cache(path)
+    meta = {k: v for k, v in cached.items() if k != "df"}
+    meta.update(checked_at=5_000)
+
+    entry = data_loader._apply_response(path, cached, meta, response)
+    assert os.stat(path).st_mtime == 1_000
+    assert data_loader._read_cache(path)["checked_at"] == 5_000
+    assert entry["df"].equals(cached["df"])
+
+
+class _Client:
+    """Stands in for the BPS client: answers every revalidation with ``response``."""
+
+    def __init__(self, response):
+        self.response = response
+        self.calls = 0
+
+    def get_many(self, keys):
+        self.calls += len(keys)
+        return [self.response] * len(keys)
+
+
+def _tulis_segar(tahun: int, **meta):
+    path = data_loader._cache_path(data_loader.BPS_VAR, tahun)
+    df = pd.DataFrame({"kode_wilayah": [1101], "nama_wilayah": ["A"], "garis_kemiskinan": [500_000]})
+    meta = {"source": "API", "last_update": "x", "etag": None, "fetched_at": 1.0,
+            "checked_at": time.time(), "error": None, **meta}
+    data_loader._write_cache(path, df, var=data_loader.BPS_VAR, tahun=tahun, **meta)
+
+
+def test_refresher_poll_skips_unchanged_files(cache_dir, monkeypatch):
+    tahun_list = data_loader.BPS_TAHUN_LIST[-3:]
+    for tahun in tahun_list:
+        _tulis_segar(tahun)
+    client = _Client(RuntimeError("tidak dipanggil"))
+    monkeypatch.setattr(data_loader, "get_client", lambda: client)
+    refresher = data_loader.PovertyLineRefresher(tahun_list=tahun_list)
+    refresher.refresh()
+
+    reads = []
+    read_cache = data_loader._read_cache
+    monkeypatch.setattr(data_loader, "_read_cache", lambda path: reads.append(path) or read_cache(path))
+    refresher.refresh()
+    assert reads == [] and client.calls == 0
+
+    # Another replica rewrote one year: only that file is read again
+    lama = refresher.snapshot()
+    _tulis_segar(tahun_list[0])
+    refresher.refresh()
+    assert reads[0] == data_loader._cache_path(data_loader.BPS_VAR, tahun_list[0])
+    assert refresher.snapshot() is not lama
+
+
+@pytest.mark.parametrize("response", [(None, '"v2"'), ({"status": "OK", "last_update": "x"}, '"v2"')])
+def test_refresher_clears_the_error_after_an_unchanged_revalidation(cache_dir, monkeypatch, response):
+    tahun = data_loader.BPS_TAHUN
+    # Due for the refresher, not yet for load_data's own background revalidation
+    _tulis_segar(tahun, error="API down", checked_at=time.time() - 0.9 * data_loader.CACHE_MAX_AGE)
+    path = data_loader._cache_path(data_loader.BPS_VAR, tahun)
+    mtime = os.stat(path).st_mtime_ns
+    monkeypatch.setattr(data_loader, "get_client", lambda: _Client(response))
+    refresher = data_loader.PovertyLineRefresher(tahun_list=[tahun])
+    lama = refresher.snapshot()
+    assert lama.status["error"] == "API down"
+
+    refresher.refresh()
+    assert os.stat(path).st_mtime_ns == mtime
+    baru = refresher.snapshot()
+    assert baru.status["error"] is None
+    assert baru.status["checked_at"] > lama.status["checked_at"]
+    assert baru.wilayah_data is lama.wilayah_data
+
+
+def _parse_per_row(api_data: dict) -> pd.DataFrame:
+    """The per-row parser ``_parse_api_response`` replaced, kept as the reference."""
+    suffix = "".join(str(api_data[field][0]["val"]) for field in ("var", "turvar", "tahun", "turtahun"))
+    rows = [
+        {"kode_wilayah": int(region["val"]), "nama_wilayah": region["label"],
+         "garis_kemiskinan": api_data["datacontent"][f"{region['val']}{suffix}"]}
+        for region in api_data["vervar"]
+        if not region["label"].startswith("<b>") and f"{region['val']}{suffix}" in api_data["datacontent"]
+    ]
+    return pd.DataFrame(rows)
+
+
+def _dump(datacontent: dict, tahun: int = 125) -> dict:
+    return {
+        "var": [{"val": 624}], "turvar": [{"val": 0}], "tahun": [{"val": tahun}], "turtahun": [{"val": 0}],
+        "vervar": [
+            {"val": 1100, "label": "<b>ACEH</b>"},
+            {"val": 1101, "label": "Simeulue"},
+            {"val": 1102, "label": "Aceh Singkil"},
+            {"val": 1171, "label": "Kota Banda Aceh"},
+            {"val": 1200, "label": "<b>SUMATERA UTARA</b>"},
+            {"val": 1201, "label": "Nias"},
+        ],
+        "datacontent": datacontent,
+    }
+
+
+@pytest.mark.parametrize("datacontent", [
+    {"110062401250": 600_000, "110162401250": 610_000, "110262401250": 620_000,
+     "117162401250": 630_000, "120062401250": 640_000, "120162401250": 650_000},
+    # Kabupaten/kota and a provinsi without a cell, values out of vervar order
+    {"120162401250": 650_000, "110162401250": 610_000, "110062401250": 600_000},
+    {"110162401250": 610_000.5, "117162401250": 630_000},
+    {},
+])
+def test_parse_api_response_matches_the_per_row_parser(datacontent):
+    dump = _dump(datacontent)
+    expected = _parse_per_row(dump)
+    parsed = data_loader._parse_api_response(dump)
+    if expected.empty:
+        assert parsed.empty
+    else:
+        pd.testing.assert_frame_equal(parsed, expected)
+
+
+def test_parse_provinsi_keeps_missing_values_as_nan():
+    dump = _dump({"110062401250": 600_000, "110162401250": 610_000})
+    provinsi = data_loader.parse_provinsi(dump)
+    assert provinsi["nama_wilayah"].tolist() == ["ACEH", "SUMATERA UTARA"]
+    assert provinsi["garis_kemiskinan"].iloc[0] == 600_000
+    assert pd.isna(provinsi["garis_kemiskinan"].iloc[1])
+
+
+def test_parse_api_response_matches_the_per_row_parser_on_the_bundled_dump():
+    import json
+
+    with open(data_loader.LOCAL_JSON_PATH, encoding="utf-8-sig") as f:
+        dump = json.load(f)
+    pd.testing.assert_frame_equal(data_loader._parse_api_response(dump), _parse_per_row(dump))
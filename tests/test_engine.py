@@ -0,0 +1,55 @@
+import random
+
+import pytest
+
+from engine import RENTANG_OPTIONS, HasilKlasifikasi, ModelRumahTangga, kolom_pengeluaran
+
+ANGGOTA = [{"hubungan": "Saya", "umur": 40, "pendidikan": "SMA/Sederajat", "pekerjaan": "Petani"}] * 3
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_model_matches_full_recompute_after_every_edit(seed):
+    rng = random.Random(seed)
+    model = ModelRumahTangga(600_000)
+    model.set_anggota(ANGGOTA)
+    rows = []
+    for _ in range(60):
+        if rows and rng.random() < 0.1:
+            n = rng.randrange(len(rows))
+            rows = rows[:n]
+            model.potong(n)
+            continue
+        i = rng.randrange(len(rows) + 1)
+        p = {
+            "rentang": rng.choice(RENTANG_OPTIONS),
+            "kategori": rng.choice(["Makanan", "Listrik", ""]),
+            "nilai": rng.choice([0, 5_000, 5_000, rng.randrange(10_000_000)]),
+        }
+        rows[i:i + 1] = [p]
+        model.set_baris(i, p["rentang"], p["kategori"], p["nilai"])
+        assert model.hasil("Kota Banda Aceh", 2025) == HasilKlasifikasi.dari_input(
+            ANGGOTA, rows, 600_000, "Kota Banda Aceh", 2025
+        )
+
+
+def test_model_totals_have_no_residue():
+    model = ModelRumahTangga(600_000)
+    for i, nilai in enumerate([0.1, 0.2, 1e-7, 12_345.67]):
+        model.set_baris(i, "Mingguan", "", nilai)
+    for i in range(4):
+        model.set_baris(i, "Mingguan", "", 0)
+    assert model.totals()["total_mingguan"] == 0
+    assert model.total_pengeluaran == 0
+
+
+def test_unknown_rentang_counts_as_bulanan():
+    pengeluaran = [{"rentang": "Harian", "kategori": "Makanan", "nilai": 90_000}]
+    assert kolom_pengeluaran(pengeluaran)[0].tolist() == [0]
+
+    model = ModelRumahTangga(600_000)
+    model.set_anggota(ANGGOTA)
+    assert model.sinkronkan(pengeluaran) == 1
+    assert model.totals()["total_bulanan"] == 90_000
+    hasil = model.hasil("Kota Banda Aceh")
+    assert hasil.tabel_pengeluaran["rentang"] == ("Bulanan",)
+    assert hasil == HasilKlasifikasi.dari_input(ANGGOTA, pengeluaran, 600_000, "Kota Banda Aceh")
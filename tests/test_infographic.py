@@ -0,0 +1,83 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+from PIL import Image
+
+import infographic
+from engine import klasifikasi_rumah_tangga
+from infographic import generate_infographic, generate_infographic_full
+
+
+class _Jam(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2025, 1, 2, 3, 4)
+
+
+@pytest.fixture(autouse=True)
+def jam_tetap(monkeypatch):
+    # The footer timestamp must not tick between the two renders being compared
+    monkeypatch.setattr(infographic, "datetime", _Jam)
+
+
+def _results(n_anggota: int, pengeluaran=True) -> dict:
+    anggota = [
+        {"hubungan": "Kepala Rumah Tangga" if j == 0 else "Anak", "umur": 40 - j,
+         "pendidikan": "SMA", "pekerjaan": "Petani" if j == 0 else ""}
+        for j in range(n_anggota)
+    ]
+    rows = [
+        {"kategori": k, "nilai": 100_000 * (j + 1), "rentang": "Bulanan"}
+        for j, k in enumerate(["Makanan", "Listrik", "Pendidikan", "Transportasi"])
+    ] if pengeluaran else []
+    return klasifikasi_rumah_tangga(anggota, rows, 600_000, "Kota Banda Aceh")
+
+
+def _rgb(buf) -> np.ndarray:
+    return np.asarray(Image.open(buf).convert("RGB")).astype(int)
+
+
+def _accent_pixels(rgb: np.ndarray) -> int:
+    accent = np.array([int(infographic.ACCENT[i:i + 2], 16) for i in (1, 3, 5)])
+    return int((np.abs(rgb - accent).sum(axis=2) < 30).sum())
+
+
+def test_large_household_is_not_clipped():
+    results = _results(20)
+    template, full = _rgb(generate_infographic(results)), _rgb(generate_infographic_full(results))
+    assert template.shape == full.shape
+    assert (template == full).all()
+
+
+def test_footer_url_stays_over_a_long_table():
+    results = _results(13)
+    template, full = _rgb(generate_infographic(results)), _rgb(generate_infographic_full(results))
+    assert abs(template.shape[0] - full.shape[0]) <= 1
+    # The URL is the only accent-coloured text at the bottom of the image
+    assert _accent_pixels(template[-300:]) == pytest.approx(_accent_pixels(full[-300:]), rel=0.05)
+
+
+def test_empty_pie_after_a_pie_matches_a_fresh_template(monkeypatch):
+    kosong = _results(3, pengeluaran=False)
+    monkeypatch.setattr(infographic, "_templates", {})
+    fresh = _rgb(generate_infographic(kosong))
+    monkeypatch.setattr(infographic, "_templates", {})
+    generate_infographic(_results(3))
+    assert (_rgb(generate_infographic(kosong)) == fresh).all()
+
+
+def test_empty_pie_placeholder_is_centred_on_a_reused_axes():
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(9, 16))
+    FigureCanvasAgg(fig)
+    ax_pie = infographic._draw_static(fig)["pie"]
+    for artist in infographic._draw_pie(ax_pie, ["Makanan", "Listrik"], [3.0, 1.0]):
+        artist.remove()
+    (text,) = infographic._draw_pie(ax_pie, [], [])
+    fig.canvas.draw()
+    extent, box = text.get_window_extent(), ax_pie.get_window_extent()
+    assert extent.x0 + extent.x1 == pytest.approx(box.x0 + box.x1, abs=2)
+    assert extent.y0 + extent.y1 == pytest.approx(box.y0 + box.y1, abs=2)
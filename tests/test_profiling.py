@@ -0,0 +1,44 @@
+import pytest
+
+import profiling
+from profiling import ModeProfil, mode_profil
+
+
+@pytest.fixture
+def env(monkeypatch):
+    def atur(profile="", query=False):
+        monkeypatch.setattr(profiling, "PROFILE_ENV", profile)
+        monkeypatch.setattr(profiling, "PROFILE_QUERY", query)
+    return atur
+
+
+@pytest.mark.parametrize("process_wide", [False, True])
+def test_query_parameter_is_ignored_unless_allowed(env, process_wide):
+    env()
+    assert mode_profil("rerun", process_wide) == ModeProfil(None, None)
+    assert mode_profil("infographic", process_wide) == ModeProfil(None, None)
+
+
+def test_per_thread_profiler_allows_every_mode(env):
+    env(query=True)
+    assert mode_profil("1", process_wide=False) == ModeProfil("rerun", None)
+    assert mode_profil("infographic", process_wide=False) == ModeProfil("infographic", None)
+    env(profile="rerun")
+    assert mode_profil(None, process_wide=False) == ModeProfil("rerun", None)
+
+
+@pytest.mark.parametrize("profile, query, query_value", [
+    ("rerun", False, None),
+    ("", True, "infographic"),
+    ("infographic", True, "rerun"),
+])
+def test_process_wide_profiler_refuses_per_session_modes(env, profile, query, query_value):
+    env(profile=profile, query=query)
+    hasil = mode_profil(query_value, process_wide=True)
+    assert hasil.mode is None
+    assert "py-spy" in hasil.peringatan
+
+
+def test_process_wide_profiler_keeps_the_server_wide_render_profile(env):
+    env(profile="infographic")
+    assert mode_profil(None, process_wide=True) == ModeProfil("infographic", None)